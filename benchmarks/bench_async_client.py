@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Async client benchmark: AsyncLibreTranslateAPI against LibreTranslateAPI on the mock server.
+
+Translates the same strings with both clients while the mock server varies
+its response framing (Content-Length, chunked, gzip, Connection: close),
+rate-limits and fails requests, and checks that the asyncio client and its
+hand-written HTTP/1.1 pool return exactly what the blocking client does.
+Exits with status 1 on any difference.
+
+Usage: python benchmarks/bench_async_client.py [--strings N] [--latency S] [--jobs N]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from mock_server import MockServer  # noqa: E402
+from libretranslate_gui.api import LibreTranslateAPI  # noqa: E402
+from libretranslate_gui.async_api import AsyncLibreTranslateAPI  # noqa: E402
+
+MODES = [
+    ("content-length", {}),
+    ("chunked", {"chunked": True}),
+    ("gzip", {"gzip": True}),
+    ("gzip+chunked", {"gzip": True, "chunked": True}),
+    ("connection-close", {"close": True}),
+    ("rate-limited", {"max_rps": 25}),
+    # 5xx answers fail over to a second, healthy server.
+    ("errors+failover", {"error_rate": 0.05, "mirror": True}),
+]
+
+
+def _texts(n):
+    # Long enough strings that gzip request bodies are exercised too.
+    return [f"Delete {i} files from %s? This cannot be undone. <b>Item {i % 37}</b>" for i in range(n)]
+
+
+def bench_mode(options, texts, latency, jobs):
+    options = dict(options)
+    mirror = MockServer(latency=latency) if options.pop("mirror", False) else None
+    mirrors = [(mirror.start(), "")] if mirror else []
+    server = MockServer(latency=latency, seed=1, **options)
+    server.start()
+    use_gzip = options.get("gzip", False)
+    try:
+        api = LibreTranslateAPI(server.url, max_workers=jobs, use_gzip=use_gzip, mirrors=mirrors)
+        start = time.perf_counter()
+        expected = api.translate_batch(texts, "en", "sv")
+        sync_s = time.perf_counter() - start
+        sync_requests = server.stats.as_dict()["requests"]
+        api.scheduler.shutdown()
+        api.pool.close()
+
+        server.stats.reset()
+        api = LibreTranslateAPI(server.url, max_workers=jobs, use_gzip=use_gzip, mirrors=mirrors)
+        aio = AsyncLibreTranslateAPI(api)
+        start = time.perf_counter()
+        got = aio.submit(aio.translate_batch(texts, "en", "sv")).result()
+        async_s = time.perf_counter() - start
+        singles = aio.submit(aio.translate(texts[0], "en", "sv")).result()
+        languages = aio.submit(aio.get_languages()).result()
+        pool = aio.pool.stats()
+        aio.close()
+        api.scheduler.shutdown()
+    finally:
+        server.stop()
+        if mirror:
+            mirror.stop()
+    problems = []
+    if got != expected:
+        wrong = sum(1 for a, b in zip(got, expected) if a != b)
+        problems.append(f"{wrong} of {len(texts)} batch results differ")
+    if singles != expected[0]:
+        problems.append(f"translate() returned {singles!r}, expected {expected[0]!r}")
+    if not languages or "code" not in languages[0]:
+        problems.append("get_languages() returned no languages")
+    return {
+        "sync_s": round(sync_s, 3),
+        "async_s": round(async_s, 3),
+        "sync_requests": sync_requests,
+        "async_requests": server.stats.as_dict()["requests"],
+        "async_pool": pool,
+        "problems": problems,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--strings", type=int, default=2000, help="strings per run")
+    ap.add_argument("--latency", type=float, default=0.02, help="mock server seconds per request")
+    ap.add_argument("--jobs", type=int, default=4, help="parallel requests of the blocking client")
+    args = ap.parse_args()
+    texts = _texts(args.strings)
+    failed = False
+    for name, options in MODES:
+        result = bench_mode(options, texts, args.latency, args.jobs)
+        status = "ok" if not result["problems"] else "FAIL: " + "; ".join(result["problems"])
+        print(f"{name:<17} sync {result['sync_s']:6.3f} s  async {result['async_s']:6.3f} s"
+              f"  requests {result['sync_requests']}/{result['async_requests']}"
+              f"  reused {result['async_pool']['hits']}  {status}")
+        failed = failed or bool(result["problems"])
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Throughput benchmark: streaming .po parser vs. the previous split/regex parser.
+
+Usage: python benchmarks/bench_po_parser.py [--entries N] [--repeat R]
+"""
+
+import argparse
+import os
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from libretranslate_gui.po_parser import iter_po  # noqa: E402
+
+
+def legacy_parse_po(filepath):
+    """The original implementation: read everything, split on blank lines, regex per block."""
+    entries = []
+    with open(filepath, "r", encoding="utf-8") as f:
+        content = f.read()
+    for block in re.split(r"\n\n+", content):
+        msgid_match = re.search(r'msgid\s+"((?:[^"\\]|\\.)*)"', block)
+        msgstr_match = re.search(r'msgstr\s+"((?:[^"\\]|\\.)*)"', block)
+        if msgid_match:
+            msgid = msgid_match.group(1)
+            msgstr = msgstr_match.group(1) if msgstr_match else ""
+            if msgid:
+                entries.append({"msgid": msgid, "msgstr": msgstr, "untranslated": msgstr == ""})
+    return entries
+
+
+def write_catalog(path, n):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('msgid ""\nmsgstr ""\n"Content-Type: text/plain; charset=UTF-8\\n"\n\n')
+        for i in range(n):
+            f.write(f"#: src/file{i % 97}.c:{i}\n")
+            if i % 5 == 0:
+                f.write("#, fuzzy, c-format\n")
+            if i % 7 == 0:
+                f.write(f'msgid ""\n"Long message number {i} that wraps "\n"over two lines\\n"\n')
+            else:
+                f.write(f'msgid "Delete %d files in folder {i}"\n')
+            if i % 11 == 0:
+                f.write(f'msgid_plural "Plural {i}"\nmsgstr[0] ""\nmsgstr[1] ""\n\n')
+            else:
+                f.write(f'msgstr "{"" if i % 3 else f"Ta bort {i}"}"\n\n')
+
+
+def measure(label, fn, path, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = fn(path)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    fn(path)
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<22} {count:>8} entries  {best * 1000:9.1f} ms  "
+          f"{count / best:>10.0f} entries/s  peak {peak / 1024:9.0f} KiB")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--entries", type=int, default=100000)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.po")
+        write_catalog(path, args.entries)
+        print(f"{args.entries} entries, {os.path.getsize(path) / 1e6:.1f} MB")
+        measure("legacy (split+regex)", lambda p: len(legacy_parse_po(p)), path, args.repeat)
+        # Streaming: entries are consumed one at a time, never held in a list.
+        measure("iter_po (streaming)", lambda p: sum(1 for _ in iter_po(p)), path, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Time and peak-memory benchmark: iterparse .ts parser vs. the previous ET.parse parser.
+
+Usage: python benchmarks/bench_ts_parser.py [--messages N] [--repeat R]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+from xml.sax.saxutils import escape
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from libretranslate_gui.po_parser import iter_ts  # noqa: E402
+
+
+def legacy_parse_ts(filepath):
+    """The original implementation: whole tree in memory, two lookups per message."""
+    entries = []
+    root = ET.parse(filepath).getroot()
+    for msg in root.iter("message"):
+        src = msg.findtext("source", "")
+        tr = msg.findtext("translation", "")
+        tr_elem = msg.find("translation")
+        unfinished = tr_elem is not None and tr_elem.get("type") == "unfinished"
+        entries.append({"msgid": src, "msgstr": tr, "untranslated": tr == "" or unfinished})
+    return entries
+
+
+def write_ts(path, n, per_context=200):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('<?xml version="1.0" encoding="utf-8"?>\n<!DOCTYPE TS>\n<TS version="2.1" language="sv">\n')
+        for i in range(n):
+            if i % per_context == 0:
+                if i:
+                    f.write("</context>\n")
+                f.write(f"<context>\n    <name>Context{i // per_context}</name>\n")
+            numerus = ' numerus="yes"' if i % 10 == 0 else ""
+            f.write(f"    <message{numerus}>\n")
+            f.write(f'        <location filename="src/file{i % 97}.cpp" line="{i}"/>\n')
+            f.write(f"        <source>{escape(f'Delete %n files & folders in view {i}')}</source>\n")
+            if numerus:
+                f.write('        <translation type="unfinished">\n'
+                        "            <numerusform></numerusform>\n"
+                        "            <numerusform></numerusform>\n"
+                        "        </translation>\n")
+            elif i % 3:
+                f.write('        <translation type="unfinished"></translation>\n')
+            else:
+                f.write(f"        <translation>Ta bort {i}</translation>\n")
+            f.write("    </message>\n")
+        f.write("</context>\n</TS>\n")
+
+
+def measure(label, fn, path, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = fn(path)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    fn(path)
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<22} {count:>8} messages  {best * 1000:9.1f} ms  "
+          f"{count / best:>10.0f} msg/s  peak {peak / 1024:9.0f} KiB")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--messages", type=int, default=100000)
+    ap.add_argument("--repeat", type=int, default=3)
+    args = ap.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.ts")
+        write_ts(path, args.messages)
+        print(f"{args.messages} messages, {os.path.getsize(path) / 1e6:.1f} MB")
+        measure("legacy (ET.parse)", lambda p: len(legacy_parse_ts(p)), path, args.repeat)
+        # Streaming: messages are consumed one at a time, never held in a list.
+        measure("iter_ts (iterparse)", lambda p: sum(1 for _ in iter_ts(p)), path, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""Synthetic .po and .ts catalogs for benchmarks.
+
+Entries mix plain strings, printf/brace placeholders, markup, plurals,
+fuzzy flags and multi-line msgids. About one string in duplicate_every
+repeats an earlier one (under another msgctxt/context), as real projects do.
+
+Usage: python benchmarks/generate.py OUT.po|OUT.ts [--entries N] [--translated-ratio R]
+"""
+
+import argparse
+import os
+from xml.sax.saxutils import escape
+
+WORDS = ("file", "folder", "delete", "open", "save", "network", "server", "language",
+         "translation", "settings", "window", "history", "search", "project", "entry")
+
+
+def message(i, duplicate_every=10):
+    """Deterministic source string number i."""
+    if duplicate_every and i % duplicate_every == duplicate_every - 1:
+        i //= 2
+    a, b, c = WORDS[i % len(WORDS)], WORDS[(i // 7) % len(WORDS)], WORDS[(i // 13) % len(WORDS)]
+    kind = i % 6
+    if kind == 0:
+        return f"{a.capitalize()} {b} {c} {i}"
+    if kind == 1:
+        return f"Could not {a} the {b} %s ({i})"
+    if kind == 2:
+        return f"<b>{a.capitalize()}</b> {b} number {{0}} of {i}"
+    if kind == 3:
+        return f"_{a.capitalize()} {b} {i}…"
+    if kind == 4:
+        return f"{a.capitalize()} {b}: %(count)d {c} items, id {i}"
+    return f"{a.capitalize()} the {b} and every {c} that belongs to it, then continue with {i}."
+
+
+def _po_quote(text):
+    return '"' + text.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def write_po(path, entries, translated_ratio=0.2, duplicate_every=10):
+    """Write a .po catalog with the given number of entries."""
+    translated_every = int(1 / translated_ratio) if translated_ratio else 0
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('msgid ""\nmsgstr ""\n"Content-Type: text/plain; charset=UTF-8\\n"\n'
+                '"Plural-Forms: nplurals=2; plural=(n != 1);\\n"\n"Language: sv\\n"\n\n')
+        for i in range(entries):
+            text = message(i, duplicate_every)
+            done = translated_every and i % translated_every == 0
+            f.write(f"#: src/module{i % 97}.c:{i}\n")
+            if i % 5 == 0:
+                f.write("#, fuzzy, c-format\n" if done else "#, c-format\n")
+            f.write(f'msgctxt "ctx{i}"\n')
+            if i % 17 == 0:
+                half = len(text) // 2
+                f.write(f'msgid ""\n{_po_quote(text[:half])}\n{_po_quote(text[half:])}\n')
+            else:
+                f.write(f"msgid {_po_quote(text)}\n")
+            if i % 11 == 0:
+                f.write(f"msgid_plural {_po_quote(text + 's')}\n")
+                value = _po_quote(f"sv: {text}" if done else "")
+                f.write(f"msgstr[0] {value}\nmsgstr[1] {value}\n\n")
+            else:
+                f.write(f"msgstr {_po_quote(f'sv: {text}' if done else '')}\n\n")
+
+
+def write_ts(path, entries, translated_ratio=0.2, duplicate_every=10, per_context=50):
+    """Write a Qt .ts catalog with the given number of messages."""
+    translated_every = int(1 / translated_ratio) if translated_ratio else 0
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('<?xml version="1.0" encoding="utf-8"?>\n<!DOCTYPE TS>\n'
+                '<TS version="2.1" language="sv_SE">\n')
+        for i in range(entries):
+            if i % per_context == 0:
+                if i:
+                    f.write("</context>\n")
+                f.write(f"<context>\n    <name>Context{i // per_context}</name>\n")
+            text = escape(message(i, duplicate_every))
+            done = translated_every and i % translated_every == 0
+            f.write(f'    <message>\n        <location filename="src/widget{i % 53}.cpp" line="{i}"/>\n'
+                    f"        <source>{text}</source>\n")
+            if done:
+                f.write(f"        <translation>sv: {text}</translation>\n")
+            else:
+                f.write('        <translation type="unfinished"></translation>\n')
+            f.write("    </message>\n")
+        if entries:
+            f.write("</context>\n")
+        f.write("</TS>\n")
+
+
+def write_catalog(path, entries, **kwargs):
+    """Write a .po or .ts catalog depending on the extension."""
+    if os.path.splitext(path)[1] == ".ts":
+        write_ts(path, entries, **kwargs)
+    else:
+        write_po(path, entries, **kwargs)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("output")
+    ap.add_argument("--entries", type=int, default=10000)
+    ap.add_argument("--translated-ratio", type=float, default=0.2)
+    args = ap.parse_args()
+    write_catalog(args.output, args.entries, translated_ratio=args.translated_ratio)
+
+
+if __name__ == "__main__":
+    main()
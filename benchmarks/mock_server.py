@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""Local stand-in for a LibreTranslate server, for benchmarks and manual testing.
+
+"Translates" by prefixing the target code, so placeholders and sentinels
+survive. Latency, a throughput cap and an error rate are configurable, as
+are the response framing (gzip, chunked, Connection: close) that HTTP
+clients must cope with.
+
+Usage: python benchmarks/mock_server.py [--port 5000] [--latency 0.05] [--max-rps 20] [--error-rate 0.01]
+       [--gzip] [--chunked] [--close]
+"""
+
+import argparse
+import gzip
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+NAMES = {"en": "English", "sv": "Swedish", "de": "German", "fr": "French", "es": "Spanish"}
+LANGUAGES = [{"code": code, "name": name, "targets": [t for t in NAMES if t != code]}
+             for code, name in NAMES.items()]
+LANGUAGES_ETAG = '"mock-1"'
+
+
+class MockStats:
+    """Request counters, safe to read while the server runs."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.requests = 0
+            self.strings = 0
+            self.characters = 0
+            self.rate_limited = 0
+            self.errors = 0
+            self.not_modified = 0
+            self.by_endpoint = {}
+
+    def count(self, endpoint, strings=0, characters=0):
+        with self._lock:
+            self.requests += 1
+            self.strings += strings
+            self.characters += characters
+            self.by_endpoint[endpoint] = self.by_endpoint.get(endpoint, 0) + 1
+
+    def add(self, field):
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+    def as_dict(self):
+        with self._lock:
+            return {"requests": self.requests, "strings": self.strings, "characters": self.characters,
+                    "rate_limited": self.rate_limited, "errors": self.errors,
+                    "not_modified": self.not_modified, "by_endpoint": dict(self.by_endpoint)}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # Headers and body go out in separate writes; without this, delayed ACKs
+    # add ~40 ms to every kept-alive request and swamp what is measured.
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, code, obj=None, headers=None):
+        server = self.server
+        body = json.dumps(obj).encode("utf-8") if obj is not None else b""
+        self.send_response(code)
+        if obj is not None:
+            self.send_header("Content-Type", "application/json")
+        if body and server.gzip and "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body)
+            self.send_header("Content-Encoding", "gzip")
+        chunked = server.chunked and code != 304
+        if chunked:
+            self.send_header("Transfer-Encoding", "chunked")
+        else:
+            self.send_header("Content-Length", str(len(body)))
+        if server.close_connections:
+            self.send_header("Connection", "close")
+            self.close_connection = True
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        if chunked:
+            # Two chunks, so clients have to join them.
+            half = len(body) // 2
+            for part in (body[:half], body[half:]):
+                if part:
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(part), part))
+            self.wfile.write(b"0\r\n\r\n")
+        else:
+            self.wfile.write(body)
+
+    def _admit(self):
+        """Apply latency, throughput cap and error rate; return False if answered already."""
+        server = self.server
+        if server.latency or server.jitter:
+            time.sleep(max(0.0, server.latency + random.uniform(-server.jitter, server.jitter)))
+        if server.max_rps:
+            with server.lock:
+                now = time.monotonic()
+                if now - server.window_start >= 1.0:
+                    server.window_start, server.window_count = now, 0
+                server.window_count += 1
+                over = server.window_count > server.max_rps
+            if over:
+                server.stats.add("rate_limited")
+                self._send(429, {"error": "Too many requests"}, {"Retry-After": "1"})
+                return False
+        if server.error_rate and random.random() < server.error_rate:
+            server.stats.add("errors")
+            self._send(500, {"error": "Simulated failure"})
+            return False
+        return True
+
+    def do_GET(self):
+        self.server.stats.count(self.path)
+        if self.path != "/languages":
+            self._send(404, {"error": "Not found"})
+            return
+        if self.headers.get("If-None-Match") == LANGUAGES_ETAG:
+            self.server.stats.add("not_modified")
+            self._send(304, headers={"ETag": LANGUAGES_ETAG})
+            return
+        if self._admit():
+            self._send(200, LANGUAGES, {"ETag": LANGUAGES_ETAG})
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = self.rfile.read(length)
+        if self.headers.get("Content-Encoding") == "gzip":
+            body = gzip.decompress(body)
+        data = json.loads(body or b"{}")
+        q = data.get("q", "")
+        items = q if isinstance(q, list) else [q]
+        self.server.stats.count(self.path, len(items), sum(len(t) for t in items))
+        if not self._admit():
+            return
+        if self.path == "/translate":
+            target = data.get("target", "xx")
+            out = [f"{target}: {t}" for t in items]
+            self._send(200, {"translatedText": out if isinstance(q, list) else out[0]})
+        elif self.path == "/detect":
+            out = [[{"language": "sv" if any(c in t for c in "åäö") else "en", "confidence": 90.0}]
+                   for t in items]
+            self._send(200, out if isinstance(q, list) else out[0])
+        else:
+            self._send(404, {"error": "Not found"})
+
+
+class MockServer(ThreadingHTTPServer):
+    """Threaded mock server; start() serves in a daemon thread and returns the base URL."""
+
+    daemon_threads = True
+    # socketserver's default backlog of 5 drops the SYNs of concurrent clients
+    # opening many connections at once, which then wait a second to retry.
+    request_queue_size = 128
+
+    def __init__(self, port=0, latency=0.0, jitter=0.0, max_rps=0, error_rate=0.0, seed=None,
+                 gzip=False, chunked=False, close=False):
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.latency = latency
+        self.jitter = jitter
+        self.max_rps = max_rps
+        self.error_rate = error_rate
+        self.gzip = gzip
+        self.chunked = chunked
+        self.close_connections = close
+        self.stats = MockStats()
+        self.lock = threading.Lock()
+        self.window_start = time.monotonic()
+        self.window_count = 0
+        if seed is not None:
+            random.seed(seed)
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self.url
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--port", type=int, default=5000)
+    ap.add_argument("--latency", type=float, default=0.0, help="seconds added to every request")
+    ap.add_argument("--jitter", type=float, default=0.0, help="random +/- seconds on top of --latency")
+    ap.add_argument("--max-rps", type=int, default=0, help="answer 429 above this many requests/s")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with 500")
+    ap.add_argument("--gzip", action="store_true", help="gzip responses for clients that accept it")
+    ap.add_argument("--chunked", action="store_true", help="send bodies with chunked transfer encoding")
+    ap.add_argument("--close", action="store_true", help="close the connection after every response")
+    args = ap.parse_args()
+    server = MockServer(args.port, args.latency, args.jitter, args.max_rps, args.error_rate,
+                        gzip=args.gzip, chunked=args.chunked, close=args.close)
+    print(f"Serving on {server.url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""Benchmark suite: catalog parsing and end-to-end "translate all" against a local mock server.
+
+Writes one JSON document so results of two commits can be compared:
+
+    python benchmarks/run_suite.py -o before.json
+    git checkout other-branch
+    python benchmarks/run_suite.py -o after.json --compare before.json
+
+Usage: python benchmarks/run_suite.py [--sizes 1000,10000,100000] [--formats po,ts]
+       [--latency S] [--max-rps N] [--error-rate R] [--jobs N] [--repeat R] [-o FILE]
+"""
+
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+from generate import write_catalog  # noqa: E402
+from mock_server import MockServer  # noqa: E402
+from libretranslate_gui.api import LibreTranslateAPI  # noqa: E402
+from libretranslate_gui.batch import run  # noqa: E402
+from libretranslate_gui.po_parser import parse_file, iter_po, iter_ts  # noqa: E402
+from libretranslate_gui.translation_memory import TranslationMemory  # noqa: E402
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _log(message):
+    print(message, file=sys.stderr)
+
+
+def bench_parse(path, repeat):
+    """Best-of-repeat wall time and peak traced memory for parse_file and the streaming iterator."""
+    iterate = iter_ts if path.endswith(".ts") else iter_po
+    result = {"bytes": os.path.getsize(path)}
+    for label, fn in (("parse_file", lambda: len(parse_file(path))),
+                      ("streaming", lambda: sum(1 for _ in iterate(path)))):
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            count = fn()
+            best = min(best, time.perf_counter() - start)
+        tracemalloc.start()
+        fn()
+        _current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result[label] = {"entries": count, "ms": round(best * 1000, 2),
+                         "entries_per_s": round(count / best) if best else None,
+                         "peak_kib": round(peak / 1024)}
+    return result
+
+
+def bench_translate(path, size, server, memory, jobs):
+    """One 'translate all' run over a fresh copy of the catalog."""
+    write_catalog(path, size)
+    server.stats.reset()
+    api = LibreTranslateAPI(server.url, max_workers=jobs, memory=memory)
+    before = memory.stats()
+    start = time.perf_counter()
+    summary = run([path], api, "en", "sv", jobs=jobs, quiet=True)
+    elapsed = time.perf_counter() - start
+    api.scheduler.shutdown()
+    api.pool.close()
+    after = memory.stats()
+    hits, misses = after["hits"] - before["hits"], after["misses"] - before["misses"]
+    info = summary["files"][0]
+    return {
+        "wall_s": round(elapsed, 3),
+        "strings": summary["strings"],
+        "unique_strings": summary["unique_strings"],
+        "translated": info["translated"],
+        "failed": info["failed"],
+        "error": info["error"],
+        "client_requests": summary["requests"],
+        "server": server.stats.as_dict(),
+        "memory_hits": hits,
+        "memory_misses": misses,
+        "memory_hit_rate": round(hits / (hits + misses), 3) if hits + misses else None,
+    }
+
+
+def run_suite(args):
+    results = {
+        "commit": _git_commit(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {"sizes": args.sizes, "formats": args.formats, "latency": args.latency,
+                     "max_rps": args.max_rps, "error_rate": args.error_rate, "jobs": args.jobs,
+                     "repeat": args.repeat},
+        "parse": {},
+        "translate": {},
+    }
+    server = MockServer(latency=args.latency, max_rps=args.max_rps, error_rate=args.error_rate, seed=1)
+    server.start()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            for fmt in args.formats:
+                for size in args.sizes:
+                    key = f"{fmt}/{size}"
+                    path = os.path.join(tmp, f"bench.{fmt}")
+                    write_catalog(path, size)
+                    results["parse"][key] = bench_parse(path, args.repeat)
+                    _log(f"parse {key}: {results['parse'][key]['parse_file']['ms']} ms")
+                    if args.no_translate:
+                        continue
+                    memory = TranslationMemory(os.path.join(tmp, f"tm-{fmt}-{size}.sqlite3"))
+                    cold = bench_translate(path, size, server, memory, args.jobs)
+                    # Same catalog again: everything should come from the translation memory.
+                    warm = bench_translate(path, size, server, memory, args.jobs)
+                    memory.close()
+                    results["translate"][key] = {"cold": cold, "warm": warm}
+                    _log(f"translate {key}: cold {cold['wall_s']} s / {cold['server']['requests']} requests,"
+                         f" warm {warm['wall_s']} s / hit rate {warm['memory_hit_rate']}")
+    finally:
+        server.stop()
+    return results
+
+
+def _metrics(results):
+    """Flatten the comparable timings of a result document."""
+    out = {}
+    for key, value in results.get("parse", {}).items():
+        for label in ("parse_file", "streaming"):
+            if label in value:
+                out[f"parse {key} {label} ms"] = value[label]["ms"]
+                out[f"parse {key} {label} peak KiB"] = value[label]["peak_kib"]
+    for key, value in results.get("translate", {}).items():
+        for run_name in ("cold", "warm"):
+            out[f"translate {key} {run_name} s"] = value[run_name]["wall_s"]
+            out[f"translate {key} {run_name} requests"] = value[run_name]["server"]["requests"]
+    return out
+
+
+def compare(baseline, current):
+    """Print metric changes relative to a baseline result document."""
+    old, new = _metrics(baseline), _metrics(current)
+    print(f"{'metric':<48} {baseline.get('commit') or 'baseline':>12} {current.get('commit') or 'current':>12}"
+          f" {'change':>9}")
+    for name in sorted(set(old) & set(new)):
+        change = f"{(new[name] - old[name]) / old[name] * 100:+.1f}%" if old[name] else ""
+        print(f"{name:<48} {old[name]:>12} {new[name]:>12} {change:>9}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--sizes", default="1000,10000,100000",
+                    type=lambda s: [int(x) for x in s.split(",") if x])
+    ap.add_argument("--formats", default="po,ts", type=lambda s: [x for x in s.split(",") if x])
+    ap.add_argument("--latency", type=float, default=0.02, help="mock server seconds per request")
+    ap.add_argument("--max-rps", type=int, default=0, help="mock server requests/s before HTTP 429")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="mock server fraction of HTTP 500")
+    ap.add_argument("--jobs", type=int, default=4, help="parallel requests")
+    ap.add_argument("--repeat", type=int, default=3, help="parse runs; the best is reported")
+    ap.add_argument("--no-translate", action="store_true", help="only benchmark parsing")
+    ap.add_argument("-o", "--output", default="-", help="JSON output file (default: stdout)")
+    ap.add_argument("--compare", metavar="BASELINE", help="print changes against an earlier JSON result")
+    args = ap.parse_args()
+
+    results = run_suite(args)
+    text = json.dumps(results, indent=2)
+    if args.output == "-":
+        print(text)
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(json.load(f), results)
+
+
+if __name__ == "__main__":
+    main()
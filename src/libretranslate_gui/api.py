@@ -1,51 +1,233 @@
 """LibreTranslate API client."""
 
-import json
 import threading
-from urllib import request, error, parse
+from concurrent.futures import CancelledError
+
+from libretranslate_gui import protocol
+from libretranslate_gui.http_pool import ConnectionPool
+from libretranslate_gui.languages import LanguageIndex, DetectionCache
+from libretranslate_gui.scheduler import RequestScheduler, DEFAULT_WORKERS
+from libretranslate_gui.servers import ServerPool
 
 DEFAULT_URL = "https://libretranslate.com"
 
 
 class LibreTranslateAPI:
-    def __init__(self, server_url=None, api_key=None):
-        self.server_url = (server_url or DEFAULT_URL).rstrip("/")
-        self.api_key = api_key or ""
-
-    def _post(self, endpoint, data):
-        url = f"{self.server_url}{endpoint}"
-        payload = json.dumps(data).encode("utf-8")
-        req = request.Request(url, data=payload, headers={"Content-Type": "application/json"})
-        with request.urlopen(req, timeout=30) as resp:
-            return json.loads(resp.read().decode("utf-8"))
-
-    def _get(self, endpoint):
-        url = f"{self.server_url}{endpoint}"
-        req = request.Request(url)
-        with request.urlopen(req, timeout=15) as resp:
-            return json.loads(resp.read().decode("utf-8"))
-
-    def get_languages(self):
-        """Return list of dicts with code/name."""
-        return self._get("/languages")
-
-    def translate(self, text, source="en", target="sv"):
-        data = {"q": text, "source": source, "target": target, "format": "text"}
-        if self.api_key:
-            data["api_key"] = self.api_key
-        result = self._post("/translate", data)
-        return result.get("translatedText", "")
+    """Client for one LibreTranslate server, or several replicas of one.
+
+    mirrors is a list of (url, api_key) pairs for additional servers that
+    serve the same models. Requests go to the healthy server with the least
+    expected wait and fail over to the next one on connection errors and
+    5xx responses; see servers.ServerPool. server_url is the primary server
+    and also keys the translation memory and the language cache.
+
+    Once the language list is known (from language_cache or the server),
+    translations between unsupported languages fail with
+    UnsupportedPairError without sending a request.
+
+    With source "auto" (AUTO_DETECT) the language of every text is
+    detected first, with results cached in detections; see
+    detect_languages().
+    """
+
+    def __init__(self, server_url=None, api_key=None, max_workers=DEFAULT_WORKERS,
+                 requests_per_minute=0, use_gzip=False, memory=None, protect_placeholders=True,
+                 mirrors=None, language_cache=None):
+        self.memory = memory
+        self.language_cache = language_cache
+        self.language_index = None
+        self.protect_placeholders = protect_placeholders
+        self.detections = DetectionCache()
+        # HTTP requests sent per endpoint by this client and AsyncLibreTranslateAPIs on it.
+        self.requests = {}
+        self._requests_lock = threading.Lock()
+        self.scheduler = RequestScheduler(max_workers, requests_per_minute)
+        self.pool = ConnectionPool(max_idle=max(max_workers, 1), use_gzip=use_gzip)
+        self.servers = ServerPool([(server_url or DEFAULT_URL, api_key)] + list(mirrors or []),
+                                  probe=self._probe)
+
+    @property
+    def server_url(self):
+        return self.servers.nodes[0].url
+
+    @server_url.setter
+    def server_url(self, url):
+        self.set_servers(url, self.api_key, self.mirrors)
+
+    @property
+    def api_key(self):
+        return self.servers.nodes[0].api_key
+
+    @api_key.setter
+    def api_key(self, key):
+        self.set_servers(self.server_url, key, self.mirrors)
+
+    @property
+    def mirrors(self):
+        return [(n.url, n.api_key) for n in self.servers.nodes[1:]]
+
+    def set_servers(self, server_url, api_key="", mirrors=()):
+        self.servers.set_servers([((server_url or DEFAULT_URL), api_key)] + list(mirrors))
+        self.language_index = None
+
+    def _probe(self, node):
+        """Health check for an open circuit: the server must list its languages."""
+        self.pool.request("GET", f"{node.url}/languages", timeout=10)
+
+    def count_request(self, endpoint):
+        """Count one request sent to endpoint, including retries; see requests."""
+        with self._requests_lock:
+            self.requests[endpoint] = self.requests.get(endpoint, 0) + 1
+
+    def _run(self, steps, parallel=False):
+        """Drive a protocol generator with blocking calls and return its result.
+
+        PARALLEL steps run on the worker pool when parallel is set and one
+        after another otherwise, so that work already running on a worker
+        never waits for the pool.
+        """
+        value = failure = None
+        while True:
+            try:
+                step = steps.send(value) if failure is None else steps.throw(failure)
+            except StopIteration as stop:
+                return stop.value
+            value = failure = None
+            try:
+                value = self._perform(step, parallel)
+            except BaseException as e:
+                failure = e
+
+    def _perform(self, step, parallel):
+        kind = step[0]
+        if kind == protocol.HTTP:
+            return self.pool.request(*step[1:])
+        if kind == protocol.WAIT:
+            return self.scheduler.bucket.acquire()
+        if kind == protocol.CALL:
+            return step[1](*step[2:])
+        if kind == protocol.REQUEST:
+            return self._run(protocol.request(self, *step[1:]))
+        if parallel and len(step[1]) > 1:
+            futures = [self.scheduler.submit(self._run, steps) for steps in step[1]]
+            return [f.result() for f in futures]
+        return [self._run(steps) for steps in step[1]]
+
+    def get_languages(self, refresh=False):
+        """Return list of dicts with code/name/targets.
+
+        With a language_cache, a list younger than its TTL is returned without
+        a request and an older one is revalidated with If-None-Match /
+        If-Modified-Since. refresh forces the revalidation.
+        """
+        return self._run(protocol.get_languages(self, refresh))
+
+    def cached_languages(self):
+        """Return the cached language list for server_url without any request, or None."""
+        entry = self.language_cache.get(self.server_url) if self.language_cache else None
+        if entry is None:
+            return None
+        if self.language_index is None:
+            self.language_index = LanguageIndex(entry["languages"])
+        return entry["languages"]
+
+    def needs_language_refresh(self):
+        return not (self.language_cache and self.language_cache.is_fresh(self.server_url))
+
+    def detect(self, q):
+        """Detect the language of a string (or of each string in a list).
+
+        Returns LibreTranslate's candidate list [{"language", "confidence"}],
+        or one such list per string.
+        """
+        return self._run(protocol.detect(q))
+
+    def detect_languages(self, texts):
+        """Return the detected language code of each text (None if unknown).
+
+        Cached detections are reused; the remaining unique texts are sent in
+        /detect requests of up to BATCH_MAX_ITEMS strings, in parallel on the
+        worker pool. Must not be called from a scheduler worker itself.
+        """
+        return self._run(protocol.detect_languages(self, texts), parallel=True)
+
+    def translate(self, text, source="en", target="sv", accelerators=False):
+        return self._run(protocol.translate(self, text, source, target, accelerators=accelerators))
+
+    def _submit_batch(self, texts, source, target, on_result, accelerators):
+        results, chunks = self._run(protocol.plan_batch(self, texts, source, target, on_result, accelerators),
+                                    parallel=True)
+        return results, [self.scheduler.submit(self._run, chunk) for chunk in chunks]
+
+    def translate_batch(self, texts, source="en", target="sv", on_result=None, accelerators=False):
+        """Translate a list of strings with one request per chunk.
+
+        Strings found in the translation memory are not sent. Chunks run in
+        parallel on the scheduler's worker pool. Returns a list of
+        translations in input order; entries that failed even as single
+        requests are None. A chunk the server rejects (HTTP 400) is retried
+        one entry at a time; connection errors and other HTTP errors are
+        raised. on_result(index, result, error) is called from a worker
+        thread for every entry as soon as it is known. Must not be called
+        from a scheduler worker itself.
+
+        With source "auto", texts are grouped by detected language and each
+        group is batched on its own; the translation memory is keyed by the
+        detected language. Set accelerators for catalog entries, so that
+        their keyboard accelerators are kept out of the request.
+        """
+        results, futures = self._submit_batch(texts, source, target, on_result, accelerators)
+        for f in futures:
+            f.result()
+        return results
+
+    def translate_batch_async(self, texts, source, target, callback, on_result=None, accelerators=False):
+        """Non-blocking translate_batch: callback(results, error) runs once all chunks finish.
+
+        Returns the chunk futures; cancelling them drops chunks that have not
+        started yet, and callback then receives a CancelledError. With source
+        "auto", detection finishes before this returns; if it fails, callback
+        receives the error and nothing is submitted.
+        """
+        try:
+            results, futures = self._submit_batch(texts, source, target, on_result, accelerators)
+        except Exception as e:
+            callback([None] * len(texts), e)
+            return []
+        if not futures:
+            callback(results, None)
+            return futures
+        remaining = [len(futures)]
+        lock = threading.Lock()
+
+        def _done(_future):
+            with lock:
+                remaining[0] -= 1
+                if remaining[0]:
+                    return
+            err = None
+            for f in futures:
+                if f.cancelled():
+                    err = CancelledError()
+                    break
+                if f.exception() is not None:
+                    err = f.exception()
+                    break
+            callback(results, err)
+
+        for f in futures:
+            f.add_done_callback(_done)
+        return futures
 
     def translate_async(self, text, source, target, callback):
-        """Run translation in background thread, call callback(result, error) on finish."""
+        """Run translation on the worker pool, call callback(result, error) on finish."""
         def _worker():
             try:
                 result = self.translate(text, source, target)
                 callback(result, None)
             except Exception as e:
                 callback(None, e)
-        t = threading.Thread(target=_worker, daemon=True)
-        t.start()
+        self.scheduler.submit(_worker)
 
     def get_languages_async(self, callback):
         def _worker():
@@ -54,5 +236,4 @@ class LibreTranslateAPI:
                 callback(langs, None)
             except Exception as e:
                 callback(None, e)
-        t = threading.Thread(target=_worker, daemon=True)
-        t.start()
+        self.scheduler.submit(_worker)
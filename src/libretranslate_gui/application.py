@@ -0,0 +1,76 @@
+"""The Adw.Application: actions, shortcuts and the About dialog."""
+
+import gettext
+
+import gi
+gi.require_version("Gtk", "4.0")
+gi.require_version("Adw", "1")
+from gi.repository import Gtk, Adw, Gio, GLib
+
+from libretranslate_gui import startup
+
+_ = gettext.gettext
+
+
+class LibreTranslateApp(Adw.Application):
+    def __init__(self):
+        super().__init__(
+            application_id="se.danielnylander.LibreTranslateAssistant",
+            flags=Gio.ApplicationFlags.DEFAULT_FLAGS,
+        )
+        GLib.set_application_name(_("LibreTranslate Assistant"))
+        about_action = Gio.SimpleAction.new("about", None)
+        about_action.connect("activate", self._on_about)
+        self.add_action(about_action)
+
+    def do_startup(self):
+        Adw.Application.do_startup(self)
+        self.set_accels_for_action("app.quit", ["<Control>q"])
+        self.set_accels_for_action("app.refresh", ["F5"])
+        self.set_accels_for_action("app.shortcuts", ["<Control>slash"])
+        for n, cb in [("quit", lambda *_: self.quit()),
+                      ("refresh", lambda *_: self._do_refresh()),
+                      ("shortcuts", self._show_shortcuts_window)]:
+            a = Gio.SimpleAction.new(n, None); a.connect("activate", cb); self.add_action(a)
+
+    def _do_refresh(self):
+        w = self.get_active_window()
+        if w and hasattr(w, '_load_data'): w._load_data(force=True)
+        elif w and hasattr(w, '_on_refresh'): w._on_refresh(None)
+
+    def _show_shortcuts_window(self, *_args):
+        win = Gtk.ShortcutsWindow(transient_for=self.get_active_window(), modal=True)
+        section = Gtk.ShortcutsSection(visible=True, max_height=10)
+        group = Gtk.ShortcutsGroup(visible=True, title="General")
+        for accel, title in [("<Control>q", "Quit"), ("F5", "Refresh"), ("<Control>slash", "Keyboard shortcuts")]:
+            s = Gtk.ShortcutsShortcut(visible=True, accelerator=accel, title=title)
+            group.append(s)
+        section.append(group)
+        win.add_child(section)
+        win.present()
+
+    def do_activate(self):
+        win = self.props.active_window
+        if not win:
+            from libretranslate_gui.window import LibreTranslateWindow
+            startup.mark("imports")
+            win = LibreTranslateWindow(application=self)
+            startup.mark("window")
+        win.present()
+
+    def _on_about(self, *_args):
+        about = Adw.AboutDialog(
+            application_name=_("LibreTranslate Assistant"),
+            application_icon="libretranslate-gui",
+            version="0.2.2",
+            developer_name="Daniel Nylander",
+            developers=["Daniel Nylander <daniel@danielnylander.se>"],
+            copyright="© 2026 Daniel Nylander",
+            license_type=Gtk.License.GPL_3_0,
+            website="https://github.com/yeager/libretranslate-gui",
+            issue_url="https://github.com/yeager/libretranslate-gui/issues",
+            translator_credits=_("Translate this app: https://www.transifex.com/danielnylander/libretranslate-gui/"),
+            comments=_("Translation assistant powered by LibreTranslate"),
+        )
+        about.add_link(_("Help translate"), "https://app.transifex.com/danielnylander/libretranslate-gui/")
+        about.present(self.props.active_window)
@@ -0,0 +1,149 @@
+"""asyncio client for LibreTranslate.
+
+Kept apart from api so that importing the synchronous client (and starting
+the GUI) does not load asyncio; the window imports this module on first use.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import CancelledError
+
+from libretranslate_gui import protocol
+from libretranslate_gui.http_pool import AsyncConnectionPool
+
+# Sockets the asyncio client keeps open at once; further requests queue as
+# coroutines, not threads.
+ASYNC_MAX_CONNECTIONS = 16
+
+
+class AsyncLibreTranslateAPI:
+    """asyncio client with the operations of LibreTranslateAPI.
+
+    Servers, rate limit, translation memory, language cache and placeholder
+    protection are taken from api, so settings changes apply to both
+    clients. The coroutines can be awaited on any event loop; submit() runs
+    them on one shared background loop thread, so thousands of requests can
+    be in flight without a thread each. timeout limits every single HTTP
+    request; submit(timeout=...) limits a whole job.
+    """
+
+    def __init__(self, api, max_connections=ASYNC_MAX_CONNECTIONS, timeout=30, dispatch=None):
+        self.api = api
+        self.timeout = timeout
+        # dispatch(callback, result, error) delivers results, e.g. GLib.idle_add.
+        self.dispatch = dispatch
+        self.max_connections = max_connections
+        self.pool = AsyncConnectionPool(max_connections, use_gzip=api.pool.use_gzip)
+        self._slots = None
+        self._lock = threading.Lock()
+        self._loop = None
+
+    def _get_loop(self):
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="libretranslate-async",
+                                 daemon=True).start()
+            return self._loop
+
+    def submit(self, coro, callback=None, timeout=None):
+        """Run coro on the background loop and return a concurrent.futures.Future.
+
+        callback(result, error) is passed to dispatch when the job ends;
+        error is a CancelledError after future.cancel() (which aborts the
+        requests in flight) and a TimeoutError after timeout seconds.
+        """
+        if timeout:
+            coro = asyncio.wait_for(coro, timeout)
+        future = asyncio.run_coroutine_threadsafe(coro, self._get_loop())
+        if callback:
+            future.add_done_callback(lambda f: self._deliver(callback, f))
+        return future
+
+    def _deliver(self, callback, future):
+        if future.cancelled():
+            result, err = None, CancelledError()
+        elif future.exception() is not None:
+            result, err = None, future.exception()
+        else:
+            result, err = future.result(), None
+        if self.dispatch:
+            self.dispatch(callback, result, err)
+        else:
+            callback(result, err)
+
+    def close(self):
+        """Stop the background loop; idle connections are dropped with it."""
+        with self._lock:
+            loop, self._loop = self._loop, None
+        if loop is not None:
+            loop.call_soon_threadsafe(self.pool.close)
+            loop.call_soon_threadsafe(loop.stop)
+
+    async def _run(self, steps):
+        """Drive a protocol generator on the event loop and return its result."""
+        value = failure = None
+        while True:
+            try:
+                step = steps.send(value) if failure is None else steps.throw(failure)
+            except StopIteration as stop:
+                return stop.value
+            value = failure = None
+            try:
+                value = await self._perform(step)
+            except BaseException as e:
+                # Includes cancellation, so request() can release its server.
+                failure = e
+
+    async def _perform(self, step):
+        kind = step[0]
+        if kind == protocol.HTTP:
+            method, url, body, headers, _timeout = step[1:]
+            self.pool.use_gzip = self.api.pool.use_gzip
+            try:
+                return await self.pool.request(method, url, body, headers, self.timeout)
+            except OSError:
+                raise
+            except (asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError) as e:
+                # Transport failures, reported like those of the blocking pool.
+                raise ConnectionError(str(e) or type(e).__name__) from e
+        if kind == protocol.WAIT:
+            return await self.api.scheduler.bucket.acquire_async()
+        if kind == protocol.CALL:
+            return await asyncio.get_running_loop().run_in_executor(None, step[1], *step[2:])
+        if kind == protocol.REQUEST:
+            # At most max_connections requests are on the wire; the rest wait
+            # here before a server is chosen, so routing sees only real load.
+            if self._slots is None:
+                self._slots = asyncio.Semaphore(self.max_connections)
+            async with self._slots:
+                return await self._run(protocol.request(self.api, *step[1:]))
+        return await asyncio.gather(*(self._run(steps) for steps in step[1]))
+
+    async def get_languages(self, refresh=False):
+        """See LibreTranslateAPI.get_languages()."""
+        return await self._run(protocol.get_languages(self.api, refresh))
+
+    async def detect(self, q):
+        """Detect the language of a string (or of each string in a list).
+
+        Returns LibreTranslate's candidate list [{"language", "confidence"}],
+        or one such list per string.
+        """
+        return await self._run(protocol.detect(q))
+
+    async def detect_languages(self, texts):
+        """See LibreTranslateAPI.detect_languages(); shares its detection cache."""
+        return await self._run(protocol.detect_languages(self.api, texts))
+
+    async def translate(self, text, source="en", target="sv", accelerators=False):
+        """See LibreTranslateAPI.translate()."""
+        return await self._run(protocol.translate(self.api, text, source, target, accelerators=accelerators))
+
+    async def translate_batch(self, texts, source="en", target="sv", on_result=None, accelerators=False):
+        """See LibreTranslateAPI.translate_batch(); on_result runs on the loop thread.
+
+        Translation memory lookups run on the loop's default executor.
+        Cancelling the job cancels every chunk request still in flight.
+        """
+        return await self._run(protocol.translate_batch(self.api, texts, source, target, on_result, accelerators))
@@ -0,0 +1,204 @@
+"""Headless batch translation of .po/.ts catalogs (no GTK required).
+
+Examples:
+    libretranslate-batch --server https://lt.example.org -t sv po/*.po
+    libretranslate-batch --template po/app.pot --targets sv,de,fr
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+from libretranslate_gui import metrics
+from libretranslate_gui.api import LibreTranslateAPI, DEFAULT_URL
+from libretranslate_gui.fanout import fan_out
+from libretranslate_gui.languages import LanguageCache
+from libretranslate_gui.project import Project, find_catalogs
+from libretranslate_gui.scheduler import DEFAULT_WORKERS
+
+EXIT_OK = 0
+EXIT_FAILED_ENTRIES = 1
+EXIT_ERROR = 2
+
+
+class _Progress:
+    """Prints throttled progress lines to stderr."""
+
+    def __init__(self, total, label, quiet=False):
+        self.total = total
+        self.label = label
+        self.quiet = quiet
+        self.done = 0
+        self._lock = threading.Lock()
+        self._last = 0.0
+
+    def step(self, *_args):
+        with self._lock:
+            self.done += 1
+            now = time.monotonic()
+            if self.quiet or (now - self._last < 0.5 and self.done != self.total):
+                return
+            self._last = now
+        print(f"{self.label}: {self.done}/{self.total}", file=sys.stderr)
+
+
+def run(files, api, source, target=None, fuzzy=True, dry_run=False, jobs=DEFAULT_WORKERS, quiet=False):
+    """Translate untranslated entries in files; return a summary dict.
+
+    Each unique string is translated once per target language across all
+    files. The summary's "requests" counts the /translate requests sent
+    (including retries) and its "dedup" entry the requests this saved
+    compared with translating file by file; see Project.stats().
+    """
+    started = time.monotonic()
+    project = Project(files, target, jobs)
+    project.translate(api, source, lambda tgt, total: _Progress(total, f"{source}→{tgt}", quiet).step)
+    stats = project.stats()
+    summary = {
+        "files": project.write(fuzzy, dry_run, jobs),
+        "strings": stats["strings"],
+        "unique_strings": stats["unique_strings"],
+        "requests": project.requests,
+        "dedup": {k: stats[k] for k in ("requests_per_file", "requests_deduplicated", "requests_saved")},
+        "elapsed": round(time.monotonic() - started, 3),
+    }
+    if api.mirrors:
+        summary["servers"] = api.servers.stats()
+    if api.memory:
+        summary["memory"] = api.memory.stats()
+    return summary
+
+
+def run_fan_out(api, template, targets, source, output=None, fuzzy=True, quiet=False, dry_run=False,
+                jobs=DEFAULT_WORKERS):
+    """Translate template into every target language; return a summary dict like run()."""
+    started = time.monotonic()
+    sent = api.requests.get("/translate", 0)
+    progress = {}
+    lock = threading.Lock()
+
+    def _progress(lang, done, total):
+        with lock:
+            bar = progress.setdefault(lang, _Progress(total, f"{source}→{lang}", quiet))
+        bar.step()
+
+    runs = fan_out(api, template, targets, source, output, fuzzy, _progress, dry_run, jobs)
+    files = [{"path": r["path"], "target": r["language"], "untranslated": r["strings"],
+              "translated": r["translated"], "failed": r["failed"], "error": r["error"]} for r in runs]
+    summary = {
+        "files": files,
+        "strings": sum(f["untranslated"] for f in files),
+        "requests": api.requests.get("/translate", 0) - sent,
+        "elapsed": round(time.monotonic() - started, 3),
+    }
+    if api.mirrors:
+        summary["servers"] = api.servers.stats()
+    if api.memory:
+        summary["memory"] = api.memory.stats()
+    return summary
+
+
+def exit_code(summary):
+    if any(f["error"] for f in summary["files"]):
+        return EXIT_ERROR
+    if any(f["failed"] for f in summary["files"]):
+        return EXIT_FAILED_ENTRIES
+    return EXIT_OK
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="libretranslate-batch",
+        description="Translate untranslated entries in .po/.ts files with LibreTranslate.")
+    parser.add_argument("paths", nargs="*", help="files, directories or glob patterns")
+    parser.add_argument("-s", "--source", default="en",
+                        help="source language, or auto to detect it per string (default: en)")
+    parser.add_argument("-t", "--target", help="target language (default: from each file's header)")
+    parser.add_argument("--template", help="translate this .pot/.po/.ts template into --targets")
+    parser.add_argument("--targets", help="comma-separated target languages for --template")
+    parser.add_argument("-o", "--output",
+                        help="output path pattern for --template, with {lang} (default: next to the template)")
+    parser.add_argument("--server", default=os.environ.get("LIBRETRANSLATE_URL", DEFAULT_URL),
+                        help="server URL (default: $LIBRETRANSLATE_URL or %(default)s)")
+    parser.add_argument("--api-key", default=os.environ.get("LIBRETRANSLATE_API_KEY", ""),
+                        help="API key (default: $LIBRETRANSLATE_API_KEY)")
+    parser.add_argument("--mirror", action="append", default=[], metavar="URL[,KEY]",
+                        help="additional server with the same models; may be repeated")
+    parser.add_argument("-j", "--jobs", type=int, default=DEFAULT_WORKERS,
+                        help="parallel requests and file workers (default: %(default)s)")
+    parser.add_argument("--rate", type=int, default=0, help="max requests per minute, 0 = unlimited")
+    parser.add_argument("--no-fuzzy", action="store_true", help="do not mark machine translations fuzzy")
+    parser.add_argument("--no-protect", action="store_true",
+                        help="send placeholders and markup to the server unmasked")
+    parser.add_argument("--no-memory", action="store_true", help="do not use the local translation memory")
+    parser.add_argument("--dry-run", action="store_true", help="translate but do not write files")
+    parser.add_argument("--json", metavar="FILE", help="write a JSON summary to FILE ('-' for stdout)")
+    parser.add_argument("--metrics", metavar="FILE",
+                        help="write request/parse metrics to FILE (.json, otherwise Prometheus text)")
+    parser.add_argument("-q", "--quiet", action="store_true", help="no progress output")
+    args = parser.parse_args(argv)
+    if args.metrics:
+        metrics.enable()
+
+    if args.template:
+        if not args.targets:
+            parser.error("--template requires --targets")
+        files = []
+    else:
+        files = find_catalogs(args.paths)
+        if not files:
+            print("libretranslate-batch: no .po/.ts files found", file=sys.stderr)
+            return EXIT_ERROR
+
+    memory = None
+    if not args.no_memory:
+        from libretranslate_gui.translation_memory import TranslationMemory
+        try:
+            memory = TranslationMemory()
+        except Exception as e:
+            print(f"libretranslate-batch: translation memory disabled: {e}", file=sys.stderr)
+    api = LibreTranslateAPI(args.server, args.api_key, max_workers=args.jobs,
+                            requests_per_minute=args.rate, memory=memory,
+                            protect_placeholders=not args.no_protect,
+                            mirrors=[tuple(m.split(",", 1)) if "," in m else (m, args.api_key)
+                                     for m in args.mirror],
+                            language_cache=LanguageCache())
+    # Reject unsupported language pairs up front when the server's list is cached.
+    api.cached_languages()
+    if args.template:
+        summary = run_fan_out(api, args.template, [t.strip() for t in args.targets.split(",") if t.strip()],
+                              args.source, args.output, fuzzy=not args.no_fuzzy, quiet=args.quiet,
+                              dry_run=args.dry_run, jobs=args.jobs)
+    else:
+        summary = run(files, api, args.source, args.target, fuzzy=not args.no_fuzzy,
+                      dry_run=args.dry_run, jobs=args.jobs, quiet=args.quiet)
+    api.scheduler.shutdown()
+
+    for f in summary["files"]:
+        if f["error"]:
+            print(f"{f['path']}: error: {f['error']}", file=sys.stderr)
+        elif not args.quiet:
+            print(f"{f['path']}: {f['translated']}/{f['untranslated']} translated"
+                  + (f", {f['failed']} failed" if f["failed"] else ""), file=sys.stderr)
+    if "dedup" in summary and not args.quiet:
+        print(f"{summary['strings']} strings, {summary['unique_strings']} unique: "
+              f"{summary['dedup']['requests_deduplicated']} requests instead of "
+              f"{summary['dedup']['requests_per_file']} file by file", file=sys.stderr)
+    if args.json:
+        text = json.dumps(summary, ensure_ascii=False, indent=2)
+        if args.json == "-":
+            print(text)
+        else:
+            with open(args.json, "w", encoding="utf-8") as fh:
+                fh.write(text + "\n")
+    if args.metrics:
+        with open(args.metrics, "w", encoding="utf-8") as fh:
+            fh.write(metrics.to_json() + "\n" if args.metrics.endswith(".json") else metrics.to_prometheus())
+    return exit_code(summary)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""Translate one template catalog into many target languages in one job."""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from libretranslate_gui.po_parser import parse_file
+from libretranslate_gui.po_writer import entry_key, new_catalog, write_file
+from libretranslate_gui.project import entry_texts
+from libretranslate_gui.scheduler import DEFAULT_WORKERS
+
+
+def default_output(template, language):
+    """Output path for a language next to the template: po/app.pot -> po/sv.po, app.ts -> app_sv.ts."""
+    directory, name = os.path.split(template)
+    base, ext = os.path.splitext(name)
+    if ext == ".ts":
+        return os.path.join(directory, f"{base}_{language}.ts")
+    return os.path.join(directory, f"{language}.po")
+
+
+def fan_out(api, template, targets, source="en", output=None, fuzzy=True, progress=None, dry_run=False,
+            jobs=DEFAULT_WORKERS):
+    """Translate template into every language in targets.
+
+    Source strings are parsed and deduplicated once; the batches of all
+    languages share the API's worker pool. output is a path pattern with
+    {lang} (default: see default_output()); existing output files keep
+    their translations and only their untranslated entries are sent and
+    filled in, by up to jobs files at a time. With dry_run nothing is
+    written. progress(language, done, total) is called from worker threads.
+    Returns a list of per-language summary dicts; "strings" counts the
+    entries to fill in and "translated" the entries written (or that
+    would be, with dry_run).
+    """
+    entries = [e for e in parse_file(template) if e["msgid"]]
+    runs = []
+    for lang in targets:
+        info = {"language": lang, "path": output.format(lang=lang) if output else default_output(template, lang),
+                "strings": len(entries), "translated": 0, "failed": 0, "error": None,
+                "done": threading.Event(), "results": None, "entries": entries, "texts": []}
+        runs.append(info)
+        if os.path.exists(info["path"]):
+            try:
+                open_keys = {entry_key(e["msgid"], e.get("msgctxt"))
+                             for e in parse_file(info["path"]) if e["msgid"] and e["untranslated"]}
+            except Exception as e:
+                info["error"] = str(e)
+                info["done"].set()
+                continue
+            info["entries"] = [e for e in entries if entry_key(e["msgid"], e.get("msgctxt")) in open_keys]
+            info["strings"] = len(info["entries"])
+        texts = info["texts"] = list(dict.fromkeys(t for e in info["entries"] for t in entry_texts(e)))
+        counter = {"n": 0}
+        lock = threading.Lock()
+
+        def _on_result(_i, _result, _err, lang=lang, texts=texts, counter=counter, lock=lock):
+            with lock:
+                counter["n"] += 1
+                n = counter["n"]
+            if progress:
+                progress(lang, n, len(texts))
+
+        def _on_done(results, err, info=info):
+            info["results"] = results
+            if err:
+                info["error"] = str(err)
+            info["done"].set()
+
+        api.translate_batch_async(texts, source, lang, _on_done, on_result=_on_result, accelerators=True)
+
+    def _write(info):
+        info["done"].wait()
+        results = info.pop("results")
+        texts = info.pop("texts")
+        todo = info.pop("entries")
+        del info["done"]
+        if results is None:
+            return info
+        translated = dict(zip(texts, results))
+        merged = {}
+        count = 0
+        for entry in todo:
+            values = [translated.get(t) for t in entry_texts(entry)]
+            if any(v is None for v in values):
+                info["failed"] += 1
+                continue
+            merged[entry_key(entry["msgid"], entry.get("msgctxt"))] = values if len(values) > 1 else values[0]
+            # Entries that share a key (same source in one .ts context) are counted each.
+            count += 1
+        info["translated"] = count
+        if dry_run or not merged:
+            return info
+        try:
+            if not os.path.exists(info["path"]):
+                new_catalog(template, info["path"], info["language"])
+            info["translated"] = write_file(info["path"], merged, fuzzy)
+        except Exception as e:
+            info["error"] = str(e)
+            info["translated"] = 0
+        return info
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        return list(executor.map(_write, runs))
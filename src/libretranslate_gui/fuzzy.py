@@ -0,0 +1,141 @@
+"""Fuzzy translation-memory lookup using a character trigram index."""
+
+import math
+import threading
+from collections import Counter
+
+from libretranslate_gui.placeholders import generalize
+
+DEFAULT_THRESHOLD = 0.6
+DEFAULT_LIMIT = 3
+# Work caps per lookup: posting-list entries scanned and candidates scored.
+# They keep lookups under a millisecond on 100k+ entries, at the cost of
+# occasionally missing a weak match built only from very common trigrams.
+MAX_POSTINGS = 2000
+MAX_CANDIDATES = 100
+# Removed entries stay in the posting lists until this share of the index
+# is dead; then the index is rebuilt from the live entries.
+MAX_DEAD_RATIO = 0.25
+
+
+def _grams(text):
+    """Return the set of character trigrams of a normalised string.
+
+    Placeholders count as one character, whatever their type or width.
+    """
+    s = f" {' '.join(generalize(text).lower().split())} "
+    if len(s) < 3:
+        return frozenset((s,))
+    return frozenset(s[i:i + 3] for i in range(len(s) - 2))
+
+
+class FuzzyIndex:
+    """Inverted trigram index over (source, translation) pairs.
+
+    Lookups use prefix filtering: query grams are sorted by how rare they
+    are, and only the rarest few need to be scanned to find every candidate
+    that can still reach the threshold. The candidates sharing the most of
+    those grams are then scored exactly with the Dice coefficient.
+    """
+
+    def __init__(self, pairs=()):
+        self._lock = threading.Lock()
+        self._reset()
+        self.add_many(pairs)
+
+    def _reset(self):
+        self._sources = []
+        self._translations = []
+        self._gram_sets = []
+        self._sizes = []
+        self._postings = {}
+        self._ids = {}
+        self._dead = 0
+
+    def __len__(self):
+        return len(self._ids)
+
+    def add_many(self, pairs):
+        with self._lock:
+            self._add(pairs)
+
+    def _add(self, pairs):
+        for source, translation in pairs:
+            if not source or not translation:
+                continue
+            entry_id = self._ids.get(source)
+            if entry_id is not None:
+                self._translations[entry_id] = translation
+                continue
+            entry_id = len(self._sources)
+            grams = _grams(source)
+            self._ids[source] = entry_id
+            self._sources.append(source)
+            self._translations.append(translation)
+            self._gram_sets.append(grams)
+            self._sizes.append(len(grams))
+            for g in grams:
+                posting = self._postings.get(g)
+                if posting is None:
+                    self._postings[g] = [entry_id]
+                else:
+                    posting.append(entry_id)
+
+    def add(self, source, translation):
+        self.add_many([(source, translation)])
+
+    def remove_many(self, sources):
+        """Drop entries, e.g. after the translation memory evicted them."""
+        with self._lock:
+            for source in sources:
+                entry_id = self._ids.pop(source, None)
+                if entry_id is None:
+                    continue
+                self._gram_sets[entry_id] = None
+                self._translations[entry_id] = None
+                self._dead += 1
+            if self._dead > MAX_DEAD_RATIO * len(self._sources):
+                live = [(self._sources[i], self._translations[i]) for i in self._ids.values()]
+                self._reset()
+                self._add(live)
+
+    def lookup(self, text, limit=DEFAULT_LIMIT, threshold=DEFAULT_THRESHOLD):
+        """Return up to limit (score, source, translation) tuples, best first."""
+        query = _grams(text)
+        qn = len(query)
+        # A candidate reaching the threshold has between min_size and
+        # max_size grams and shares at least min_overlap of them, so it
+        # appears in one of the first qn - min_overlap + 1 (rarest) posting
+        # lists.
+        min_size = threshold * qn / (2 - threshold)
+        max_size = qn * (2 - threshold) / threshold
+        min_overlap = max(1, math.ceil(min_size))
+        with self._lock:
+            postings = self._postings
+            ordered = sorted(query, key=lambda g: len(postings.get(g, ())))
+            prefix = qn - min_overlap + 1
+            counts = Counter()
+            scanned = 0
+            for g in ordered[:prefix]:
+                posting = postings.get(g, ())
+                if scanned and scanned + len(posting) > MAX_POSTINGS:
+                    break
+                counts.update(posting)
+                scanned += len(posting)
+            if len(counts) > MAX_CANDIDATES:
+                candidates = sorted(counts, key=counts.__getitem__, reverse=True)[:MAX_CANDIDATES]
+            else:
+                candidates = counts
+            gram_sets = self._gram_sets
+            sizes = self._sizes
+            scored = []
+            for entry_id in candidates:
+                cn = sizes[entry_id]
+                grams = gram_sets[entry_id]
+                if grams is None or cn < min_size or cn > max_size:
+                    continue
+                score = 2 * len(query & grams) / (qn + cn)
+                if score >= threshold:
+                    scored.append((score, entry_id))
+            scored.sort(reverse=True)
+            return [(score, self._sources[i], self._translations[i]) for score, i in scored[:limit]]
@@ -1,41 +1,297 @@
-"""Translation history manager."""
+"""Translation history manager.
 
+History is an append-only SQLite log in the XDG data directory. Reads are
+served from an in-process cache that is reloaded only when another process
+has written to the log; writes happen on a background thread, and old rows
+are compacted away periodically. An FTS5 index over source and translation
+text backs search_history().
+"""
+
+import atexit
 import json
 import os
+import queue
+import re
+import sqlite3
+import threading
+import time
 from pathlib import Path
 
-MAX_HISTORY = 100
+from libretranslate_gui import metrics
 
+MAX_HISTORY = 10000
+# Trim the log back to MAX_HISTORY rows after this many appends.
+COMPACT_EVERY = 200
+SEARCH_LIMIT = 200
 
-def _history_path():
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def data_dir():
+    """Return (and create) the XDG data directory used for local state."""
     d = Path(os.environ.get("XDG_DATA_HOME", Path.home() / ".local/share")) / "libretranslate-gui"
     d.mkdir(parents=True, exist_ok=True)
-    return d / "history.json"
+    return d
 
 
-def load_history():
-    p = _history_path()
-    if p.exists():
+def _history_path():
+    return data_dir() / "history.sqlite3"
+
+
+def _legacy_history_path():
+    return data_dir() / "history.json"
+
+
+class HistoryStore:
+    """Append-only history log with a cached, newest-first index."""
+
+    def __init__(self, path=None, max_entries=MAX_HISTORY):
+        self.path = str(path or _history_path())
+        self.max_entries = max_entries
+        self._lock = threading.RLock()
+        self._db = None
+        self._entries = None
+        self._data_version = None
+        self._appends = 0
+        self._queue = queue.Queue()
+        self._writer = None
+        self._has_fts = False
+
+    def _connect(self):
+        if self._db is None:
+            self._db = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS history ("
+                " id INTEGER PRIMARY KEY AUTOINCREMENT, time REAL NOT NULL,"
+                " source_lang TEXT, target_lang TEXT, source TEXT, translation TEXT)")
+            self._db.commit()
+            self._has_fts = self._create_fts()
+            self._migrate_json()
+        return self._db
+
+    def _create_fts(self):
+        """Create the full-text index and its triggers; False if FTS5 is unavailable."""
+        db = self._db
+        try:
+            exists = db.execute(
+                "SELECT 1 FROM sqlite_master WHERE name='history_fts'").fetchone()
+            if exists:
+                return True
+            db.executescript("""
+                CREATE VIRTUAL TABLE history_fts USING fts5(
+                    source, translation, content='history', content_rowid='id',
+                    tokenize='unicode61 remove_diacritics 2');
+                CREATE TRIGGER history_ai AFTER INSERT ON history BEGIN
+                    INSERT INTO history_fts(rowid, source, translation)
+                    VALUES (new.id, new.source, new.translation);
+                END;
+                CREATE TRIGGER history_ad AFTER DELETE ON history BEGIN
+                    INSERT INTO history_fts(history_fts, rowid, source, translation)
+                    VALUES ('delete', old.id, old.source, old.translation);
+                END;
+                INSERT INTO history_fts(history_fts) VALUES ('rebuild');
+            """)
+            db.commit()
+            return True
+        except sqlite3.OperationalError:
+            return False
+
+    def _migrate_json(self):
+        legacy = _legacy_history_path()
+        if not legacy.exists() or str(legacy) == self.path:
+            return
         try:
-            return json.loads(p.read_text("utf-8"))
+            old = json.loads(legacy.read_text("utf-8"))
         except Exception:
-            return []
-    return []
+            old = []
+        now = time.time()
+        # The JSON file is newest first; insert oldest first so ids keep the order.
+        rows = [(now, e.get("source_lang"), e.get("target_lang"), e.get("source"), e.get("translation"))
+                for e in reversed(old) if isinstance(e, dict)]
+        self._db.executemany(
+            "INSERT INTO history (time, source_lang, target_lang, source, translation)"
+            " VALUES (?, ?, ?, ?, ?)", rows)
+        self._db.commit()
+        legacy.rename(legacy.with_suffix(".json.migrated"))
+
+    def _refresh(self):
+        """Reload the cache if it is missing or another connection wrote to the log."""
+        db = self._connect()
+        version = db.execute("PRAGMA data_version").fetchone()[0]
+        if self._entries is not None and version == self._data_version:
+            return
+        rows = db.execute(
+            "SELECT id, time, source_lang, target_lang, source, translation FROM history"
+            " ORDER BY id DESC LIMIT ?", (self.max_entries,))
+        entries = [{"id": r[0], "time": r[1], "source_lang": r[2], "target_lang": r[3],
+                    "source": r[4], "translation": r[5]} for r in rows]
+        # Keep appends that are still queued for the writer thread.
+        pending = [e for e in (self._entries or []) if e.get("id") is None]
+        self._entries = (pending + entries)[:self.max_entries]
+        self._data_version = version
+
+    def load(self):
+        """Return history entries, newest first."""
+        if self._entries is None:
+            self.flush()
+        started = time.perf_counter()
+        with self._lock:
+            self._refresh()
+            entries = list(self._entries)
+        metrics.observe("history_seconds", time.perf_counter() - started, op="load")
+        return entries
+
+    def append(self, source_lang, target_lang, source_text, translated_text):
+        entry = {"id": None, "time": time.time(), "source_lang": source_lang,
+                 "target_lang": target_lang, "source": source_text, "translation": translated_text}
+        with self._lock:
+            if self._entries is not None:
+                self._entries.insert(0, entry)
+                del self._entries[self.max_entries:]
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, daemon=True)
+                self._writer.start()
+        self._queue.put(entry)
+
+    def _write_loop(self):
+        while True:
+            batch = [self._queue.get()]
+            while True:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._write(batch)
+            except sqlite3.Error:
+                pass
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _write(self, batch):
+        started = time.perf_counter()
+        with self._lock:
+            db = self._connect()
+            for entry in batch:
+                cur = db.execute(
+                    "INSERT INTO history (time, source_lang, target_lang, source, translation)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (entry["time"], entry["source_lang"], entry["target_lang"],
+                     entry["source"], entry["translation"]))
+                entry["id"] = cur.lastrowid
+            self._appends += len(batch)
+            if self._appends >= COMPACT_EVERY:
+                self._compact(db)
+            db.commit()
+        metrics.observe("history_seconds", time.perf_counter() - started, op="write")
+        metrics.inc("history_writes_total", len(batch))
+
+    def _compact(self, db):
+        db.execute(
+            "DELETE FROM history WHERE id <= (SELECT id FROM history ORDER BY id DESC LIMIT 1 OFFSET ?)",
+            (self.max_entries,))
+        self._appends = 0
+
+    def flush(self):
+        """Wait until queued appends are written."""
+        self._queue.join()
+
+    def search(self, text="", source_lang=None, target_lang=None, since=None, until=None,
+               limit=SEARCH_LIMIT):
+        """Return matching entries, best match first (newest first without text).
+
+        Every word in text must occur in the source or translation, as a
+        word prefix. since/until are Unix timestamps.
+        """
+        self.flush()
+        started = time.perf_counter()
+        where, params = [], []
+        tokens = _TOKEN_RE.findall(text or "")
+        with self._lock:
+            db = self._connect()
+            if tokens and self._has_fts:
+                match = " ".join('"%s"*' % t for t in tokens)
+                sql = ("SELECT h.id, h.time, h.source_lang, h.target_lang, h.source, h.translation"
+                       " FROM history_fts JOIN history h ON h.id = history_fts.rowid"
+                       " WHERE history_fts MATCH ?")
+                params.append(match)
+                order = " ORDER BY bm25(history_fts), h.id DESC"
+            else:
+                sql = ("SELECT h.id, h.time, h.source_lang, h.target_lang, h.source, h.translation"
+                       " FROM history h WHERE 1")
+                for t in tokens:
+                    where.append("(h.source LIKE ? OR h.translation LIKE ?)")
+                    params.extend([f"%{t}%", f"%{t}%"])
+                order = " ORDER BY h.id DESC"
+            if source_lang:
+                where.append("h.source_lang = ?")
+                params.append(source_lang)
+            if target_lang:
+                where.append("h.target_lang = ?")
+                params.append(target_lang)
+            if since is not None:
+                where.append("h.time >= ?")
+                params.append(since)
+            if until is not None:
+                where.append("h.time < ?")
+                params.append(until)
+            for clause in where:
+                sql += " AND " + clause
+            rows = db.execute(sql + order + " LIMIT ?", (*params, limit)).fetchall()
+        metrics.observe("history_seconds", time.perf_counter() - started, op="search")
+        return [{"id": r[0], "time": r[1], "source_lang": r[2], "target_lang": r[3],
+                 "source": r[4], "translation": r[5]} for r in rows]
+
+    def language_pairs(self):
+        """Return the distinct (source_lang, target_lang) pairs in the log."""
+        self.flush()
+        with self._lock:
+            return self._connect().execute(
+                "SELECT DISTINCT source_lang, target_lang FROM history"
+                " ORDER BY source_lang, target_lang").fetchall()
+
+    def clear(self):
+        self.flush()
+        with self._lock:
+            db = self._connect()
+            db.execute("DELETE FROM history")
+            db.commit()
+            self._entries = []
+            self._data_version = db.execute("PRAGMA data_version").fetchone()[0]
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_store():
+    """Return the process-wide HistoryStore."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = HistoryStore()
+            atexit.register(_store.flush)
+        return _store
+
+
+def set_max_history(n):
+    get_store().max_entries = max(1, int(n))
+
+
+def load_history():
+    return get_store().load()
 
 
 def save_entry(source_lang, target_lang, source_text, translated_text):
-    history = load_history()
-    history.insert(0, {
-        "source_lang": source_lang,
-        "target_lang": target_lang,
-        "source": source_text,
-        "translation": translated_text,
-    })
-    history = history[:MAX_HISTORY]
-    _history_path().write_text(json.dumps(history, ensure_ascii=False, indent=2), "utf-8")
+    get_store().append(source_lang, target_lang, source_text, translated_text)
+
+
+def search_history(text="", source_lang=None, target_lang=None, since=None, until=None,
+                   limit=SEARCH_LIMIT):
+    return get_store().search(text, source_lang, target_lang, since, until, limit)
 
 
 def clear_history():
-    p = _history_path()
-    if p.exists():
-        p.unlink()
+    get_store().clear()
@@ -0,0 +1,298 @@
+"""Keep-alive HTTP connection pools used by the API clients."""
+
+import gzip
+import http.client
+import ssl
+import threading
+import time
+from email.parser import BytesHeaderParser
+from urllib import error, parse
+
+DEFAULT_MAX_IDLE = 8
+DEFAULT_IDLE_TIMEOUT = 60.0
+# Request bodies smaller than this are not worth compressing.
+GZIP_MIN_SIZE = 1024
+
+# Errors that mean a kept-alive connection was closed by the server.
+_STALE_ERRORS = (http.client.RemoteDisconnected, http.client.BadStatusLine,
+                 BrokenPipeError, ConnectionResetError, ConnectionAbortedError)
+
+
+class ConnectionPool:
+    """Reusable HTTP(S) connections keyed by (scheme, host, port).
+
+    Idle connections older than idle_timeout seconds are evicted, and a reused
+    connection that the server has closed is transparently replaced once.
+    """
+
+    def __init__(self, max_idle=DEFAULT_MAX_IDLE, idle_timeout=DEFAULT_IDLE_TIMEOUT, use_gzip=False):
+        self.max_idle = max_idle
+        self.idle_timeout = idle_timeout
+        self.use_gzip = use_gzip
+        self._idle = {}
+        self._lock = threading.Lock()
+        self._ssl_context = None
+        self.hits = 0
+        self.misses = 0
+        self.reconnects = 0
+        self.evictions = 0
+
+    def stats(self):
+        """Return pool counters as a dict."""
+        with self._lock:
+            idle = sum(len(v) for v in self._idle.values())
+            return {"hits": self.hits, "misses": self.misses, "reconnects": self.reconnects,
+                    "evictions": self.evictions, "idle": idle}
+
+    def _new_connection(self, key, timeout):
+        scheme, host, port = key
+        if scheme == "https":
+            if self._ssl_context is None:
+                self._ssl_context = ssl.create_default_context()
+            return http.client.HTTPSConnection(host, port, timeout=timeout, context=self._ssl_context)
+        return http.client.HTTPConnection(host, port, timeout=timeout)
+
+    def _acquire(self, key, timeout):
+        now = time.monotonic()
+        with self._lock:
+            conns = self._idle.get(key, [])
+            while conns:
+                conn, last_used = conns.pop()
+                if now - last_used > self.idle_timeout:
+                    conn.close()
+                    self.evictions += 1
+                    continue
+                self.hits += 1
+                if conn.sock is not None:
+                    conn.sock.settimeout(timeout)
+                conn.timeout = timeout
+                return conn, True
+            self.misses += 1
+        return self._new_connection(key, timeout), False
+
+    def _release(self, key, conn):
+        with self._lock:
+            conns = self._idle.setdefault(key, [])
+            if len(conns) >= self.max_idle:
+                conn.close()
+                return
+            conns.append((conn, time.monotonic()))
+
+    def close(self):
+        """Close all idle connections."""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn, _last_used in conns:
+                conn.close()
+
+    def request(self, method, url, body=None, headers=None, timeout=30):
+        """Send a request and return (status, headers, body bytes).
+
+        Raises urllib.error.HTTPError for status codes >= 400 so callers see
+        the same exceptions as with urllib.request.urlopen.
+        """
+        parts = parse.urlsplit(url)
+        scheme = parts.scheme or "http"
+        port = parts.port or (443 if scheme == "https" else 80)
+        key = (scheme, parts.hostname, port)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+
+        headers = dict(headers or {})
+        if self.use_gzip:
+            headers["Accept-Encoding"] = "gzip"
+            if body is not None and len(body) >= GZIP_MIN_SIZE:
+                body = gzip.compress(body)
+                headers["Content-Encoding"] = "gzip"
+
+        conn, reused = self._acquire(key, timeout)
+        try:
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                resp = conn.getresponse()
+            except _STALE_ERRORS:
+                if not reused:
+                    raise
+                # The server closed the idle connection; retry on a fresh one.
+                conn.close()
+                with self._lock:
+                    self.reconnects += 1
+                conn = self._new_connection(key, timeout)
+                conn.request(method, path, body=body, headers=headers)
+                resp = conn.getresponse()
+            data = resp.read()
+        except Exception:
+            conn.close()
+            raise
+
+        if resp.will_close:
+            conn.close()
+        else:
+            self._release(key, conn)
+
+        if resp.getheader("Content-Encoding", "").lower() == "gzip":
+            data = gzip.decompress(data)
+        if resp.status >= 400:
+            raise error.HTTPError(url, resp.status, resp.reason, resp.headers, None)
+        return resp.status, resp.headers, data
+
+
+class AsyncConnectionPool:
+    """asyncio counterpart of ConnectionPool for the event-loop client.
+
+    Speaks just enough HTTP/1.1 for the LibreTranslate API (Content-Length
+    and chunked bodies, gzip, keep-alive). Callers limit concurrency; up to
+    max_idle connections per host are kept. Must be used from a single
+    event loop. asyncio is imported on first use, so the synchronous client
+    does not pay for it.
+    """
+
+    def __init__(self, max_idle=DEFAULT_MAX_IDLE, idle_timeout=DEFAULT_IDLE_TIMEOUT, use_gzip=False):
+        self.max_idle = max_idle
+        self.idle_timeout = idle_timeout
+        self.use_gzip = use_gzip
+        self._idle = {}
+        self._ssl_context = None
+        self.hits = 0
+        self.misses = 0
+        self.reconnects = 0
+        self.evictions = 0
+
+    def stats(self):
+        idle = sum(len(v) for v in self._idle.values())
+        return {"hits": self.hits, "misses": self.misses, "reconnects": self.reconnects,
+                "evictions": self.evictions, "idle": idle}
+
+    async def _connect(self, key):
+        import asyncio
+        scheme, host, port = key
+        ssl_context = None
+        if scheme == "https":
+            if self._ssl_context is None:
+                self._ssl_context = ssl.create_default_context()
+            ssl_context = self._ssl_context
+        return await asyncio.open_connection(host, port, ssl=ssl_context)
+
+    def _take_idle(self, key):
+        now = time.monotonic()
+        conns = self._idle.get(key, [])
+        while conns:
+            reader, writer, last_used = conns.pop()
+            if now - last_used > self.idle_timeout or reader.at_eof():
+                writer.close()
+                self.evictions += 1
+                continue
+            self.hits += 1
+            return reader, writer
+        self.misses += 1
+        return None
+
+    def _release(self, key, reader, writer):
+        conns = self._idle.setdefault(key, [])
+        if len(conns) >= self.max_idle:
+            writer.close()
+            return
+        conns.append((reader, writer, time.monotonic()))
+
+    def close(self):
+        """Close all idle connections."""
+        idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for _reader, writer, _last_used in conns:
+                writer.close()
+
+    async def request(self, method, url, body=None, headers=None, timeout=30):
+        """Send a request and return (status, headers, body bytes).
+
+        Raises urllib.error.HTTPError for status codes >= 400 and
+        asyncio.TimeoutError when the exchange takes longer than timeout.
+        """
+        import asyncio
+        parts = parse.urlsplit(url)
+        scheme = parts.scheme or "http"
+        port = parts.port or (443 if scheme == "https" else 80)
+        key = (scheme, parts.hostname, port)
+        path = parts.path or "/"
+        if parts.query:
+            path += "?" + parts.query
+
+        headers = dict(headers or {})
+        if self.use_gzip:
+            headers["Accept-Encoding"] = "gzip"
+            if body is not None and len(body) >= GZIP_MIN_SIZE:
+                body = gzip.compress(body)
+                headers["Content-Encoding"] = "gzip"
+        headers["Host"] = parts.netloc
+        headers["Content-Length"] = str(len(body or b""))
+        head = f"{method} {path} HTTP/1.1\r\n" + "".join(f"{k}: {v}\r\n" for k, v in headers.items())
+        message = head.encode("latin-1") + b"\r\n" + (body or b"")
+
+        status, reason, resp_headers, data = await asyncio.wait_for(
+            self._exchange(key, message, method), timeout)
+
+        if resp_headers.get("Content-Encoding", "").lower() == "gzip":
+            data = gzip.decompress(data)
+        if status >= 400:
+            raise error.HTTPError(url, status, reason, resp_headers, None)
+        return status, resp_headers, data
+
+    async def _exchange(self, key, message, method):
+        import asyncio
+        conn = self._take_idle(key)
+        reused = conn is not None
+        reader, writer = conn or await self._connect(key)
+        try:
+            try:
+                writer.write(message)
+                await writer.drain()
+                response = await self._read_response(reader, method)
+            except (asyncio.IncompleteReadError, ConnectionError):
+                if not reused:
+                    raise
+                # The server closed the idle connection; retry on a fresh one.
+                writer.close()
+                self.reconnects += 1
+                reader, writer = await self._connect(key)
+                writer.write(message)
+                await writer.drain()
+                response = await self._read_response(reader, method)
+        except BaseException:
+            # Includes cancellation: a half-read response cannot be reused.
+            writer.close()
+            raise
+        status, reason, resp_headers, data, keep_alive = response
+        if keep_alive:
+            self._release(key, reader, writer)
+        else:
+            writer.close()
+        return status, reason, resp_headers, data
+
+    async def _read_response(self, reader, method):
+        block = await reader.readuntil(b"\r\n\r\n")
+        status_line, _, header_bytes = block.partition(b"\r\n")
+        version, status, reason = (status_line.decode("latin-1").split(" ", 2) + [""])[:3]
+        status = int(status)
+        headers = BytesHeaderParser().parsebytes(header_bytes)
+        keep_alive = version == "HTTP/1.1" and headers.get("Connection", "").lower() != "close"
+        if method == "HEAD" or status in (204, 304) or 100 <= status < 200:
+            data = b""
+        elif headers.get("Transfer-Encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)
+                if not size:
+                    # Skip trailers up to the terminating blank line.
+                    while await reader.readuntil(b"\r\n") != b"\r\n":
+                        pass
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            data = b"".join(chunks)
+        elif headers.get("Content-Length") is not None:
+            data = await reader.readexactly(int(headers["Content-Length"]))
+        else:
+            data = await reader.read()
+            keep_alive = False
+        return status, reason.strip(), headers, data, keep_alive
@@ -0,0 +1,317 @@
+"""Persistent, resumable bulk translation jobs."""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+from libretranslate_gui.history import data_dir
+from libretranslate_gui.po_writer import CatalogWriter
+
+# Entries sent between two checkpoints of the job database; pause and
+# cancel take effect at these boundaries.
+SLICE_ENTRIES = 200
+
+STATE_PENDING = "pending"
+STATE_RUNNING = "running"
+STATE_PAUSED = "paused"
+STATE_DONE = "done"
+STATE_FAILED = "failed"
+STATE_CANCELLED = "cancelled"
+UNFINISHED = (STATE_PENDING, STATE_RUNNING, STATE_PAUSED, STATE_FAILED)
+
+
+def _jobs_path():
+    return data_dir() / "jobs.sqlite3"
+
+
+def source_fingerprint(entries):
+    """Hash of the source side of a catalog: msgctxt, msgid and msgid_plural of every entry.
+
+    Translations written by a job do not change it; edits to the source
+    strings do, and make an interrupted job for the file stale.
+    """
+    digest = hashlib.sha1()
+    for e in entries:
+        for part in (e.get("msgctxt") or "", e["msgid"], e.get("msgid_plural") or ""):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class JobQueue:
+    """Jobs and their entries, one row per entry, in an SQLite database.
+
+    A job translates the entries of one file for one language pair. Entry
+    state is committed after every slice, so a job that was interrupted by a
+    crash or by closing the app can be resumed from its pending entries.
+    With path ":memory:" nothing is kept after the queue is closed.
+    """
+
+    def __init__(self, path=None):
+        self.path = str(path or _jobs_path())
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, timeout=10, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, path TEXT NOT NULL,
+                source TEXT NOT NULL, target TEXT NOT NULL, server TEXT,
+                state TEXT NOT NULL, created REAL NOT NULL, updated REAL NOT NULL);
+            CREATE INDEX IF NOT EXISTS jobs_path ON jobs(path, source, target);
+            CREATE TABLE IF NOT EXISTS job_entries (
+                job_id INTEGER NOT NULL REFERENCES jobs(id) ON DELETE CASCADE,
+                idx INTEGER NOT NULL, msgctxt TEXT, msgid TEXT NOT NULL,
+                state TEXT NOT NULL, translation TEXT, error TEXT,
+                PRIMARY KEY (job_id, idx));
+        """)
+        if "fingerprint" not in [r[1] for r in self._db.execute("PRAGMA table_info(jobs)")]:
+            self._db.execute("ALTER TABLE jobs ADD COLUMN fingerprint TEXT")
+        if "msgid_plural" not in [r[1] for r in self._db.execute("PRAGMA table_info(job_entries)")]:
+            self._db.execute("ALTER TABLE job_entries ADD COLUMN msgid_plural TEXT")
+            self._db.execute("ALTER TABLE job_entries ADD COLUMN translation_plural TEXT")
+        self._db.execute("PRAGMA foreign_keys=ON")
+        self._db.commit()
+
+    def create(self, path, source, target, entries, server=None, fingerprint=None):
+        """Start a job for entries (dicts with msgid, optional msgctxt and msgid_plural); return its id.
+
+        Unfinished jobs for the same file and language pair are replaced.
+        fingerprint is the file's source_fingerprint() when the job starts.
+        """
+        path = os.path.abspath(path)
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                f"DELETE FROM jobs WHERE path=? AND source=? AND target=? AND state IN ({_marks(UNFINISHED)})",
+                (path, source, target, *UNFINISHED))
+            job_id = self._db.execute(
+                "INSERT INTO jobs (path, source, target, server, state, created, updated, fingerprint)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (path, source, target, server, STATE_PENDING, now, now, fingerprint)).lastrowid
+            self._db.executemany(
+                "INSERT INTO job_entries (job_id, idx, msgctxt, msgid, msgid_plural, state)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                [(job_id, i, e.get("msgctxt"), e["msgid"], e.get("msgid_plural") or None, STATE_PENDING)
+                 for i, e in enumerate(entries)])
+            self._db.commit()
+        return job_id
+
+    def find_unfinished(self, path, source, target, fingerprint=None):
+        """Return the newest unfinished job for the file and pair, or None.
+
+        With a fingerprint, a job started on a different version of the file
+        is not returned; creating a new job replaces it.
+        """
+        with self._lock:
+            row = self._db.execute(
+                f"SELECT id, fingerprint FROM jobs WHERE path=? AND source=? AND target=?"
+                f" AND state IN ({_marks(UNFINISHED)}) ORDER BY id DESC LIMIT 1",
+                (os.path.abspath(path), source, target, *UNFINISHED)).fetchone()
+        if row is None or (fingerprint is not None and row[1] != fingerprint):
+            return None
+        return self.get(row[0])
+
+    def get(self, job_id):
+        """Return the job as a dict with entry counts (total, done, failed, pending)."""
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, path, source, target, server, state, created, updated FROM jobs WHERE id=?",
+                (job_id,)).fetchone()
+            if row is None:
+                return None
+            counts = dict(self._db.execute(
+                "SELECT state, COUNT(*) FROM job_entries WHERE job_id=? GROUP BY state", (job_id,)))
+        job = dict(zip(("id", "path", "source", "target", "server", "state", "created", "updated"), row))
+        job["done"] = counts.get(STATE_DONE, 0)
+        job["failed"] = counts.get(STATE_FAILED, 0)
+        job["pending"] = counts.get(STATE_PENDING, 0)
+        job["total"] = job["done"] + job["failed"] + job["pending"]
+        return job
+
+    def jobs(self, states=UNFINISHED):
+        with self._lock:
+            ids = [r[0] for r in self._db.execute(
+                f"SELECT id FROM jobs WHERE state IN ({_marks(states)}) ORDER BY id", states)]
+        return [self.get(i) for i in ids]
+
+    def entries(self, job_id, state=STATE_PENDING):
+        """Return [(idx, msgctxt, msgid, msgid_plural, translation)] of the job's entries in the given state.
+
+        translation of a plural entry is [singular, plural].
+        """
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT idx, msgctxt, msgid, msgid_plural, translation, translation_plural FROM job_entries"
+                " WHERE job_id=? AND state=? ORDER BY idx", (job_id, state)).fetchall()
+        return [(idx, msgctxt, msgid, msgid_plural, [t, plural] if plural is not None else t)
+                for idx, msgctxt, msgid, msgid_plural, t, plural in rows]
+
+    def retry_failed(self, job_id):
+        """Put failed entries back into the pending state."""
+        with self._lock:
+            self._db.execute("UPDATE job_entries SET state=?, error=NULL WHERE job_id=? AND state=?",
+                             (STATE_PENDING, job_id, STATE_FAILED))
+            self._db.commit()
+
+    def record(self, job_id, done=(), failed=()):
+        """Store finished entries: done as (idx, translation), failed as (idx, error).
+
+        The translation of a plural entry is [singular, plural].
+        """
+        with self._lock:
+            self._db.executemany(
+                "UPDATE job_entries SET state=?, translation=?, translation_plural=?, error=NULL"
+                " WHERE job_id=? AND idx=?",
+                [(STATE_DONE, *(t if isinstance(t, list) else (t, None)), job_id, i) for i, t in done])
+            self._db.executemany(
+                "UPDATE job_entries SET state=?, error=? WHERE job_id=? AND idx=?",
+                [(STATE_FAILED, str(e), job_id, i) for i, e in failed])
+            self._db.execute("UPDATE jobs SET updated=? WHERE id=?", (time.time(), job_id))
+            self._db.commit()
+
+    def set_state(self, job_id, state):
+        with self._lock:
+            self._db.execute("UPDATE jobs SET state=?, updated=? WHERE id=?", (state, time.time(), job_id))
+            self._db.commit()
+
+    def delete(self, job_id):
+        with self._lock:
+            self._db.execute("DELETE FROM jobs WHERE id=?", (job_id,))
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def _marks(values):
+    return ",".join("?" * len(values))
+
+
+class JobRunner:
+    """Runs one job from a JobQueue to completion, pause or cancel.
+
+    Translations are written to the file through a CatalogWriter; on start,
+    entries that were finished before an interruption are written again in
+    case the last checkpoint did not reach the file. on_result(msgctxt,
+    msgid, translation, error) and on_progress(progress) are called from the
+    runner's thread (translation is [singular, plural] for plural entries,
+    whose two source strings are both translated); progress is a dict with
+    state, total, done, failed, rate (entries/s measured in this run) and
+    eta (seconds or None).
+    """
+
+    def __init__(self, api, queue, job_id, on_result=None, on_progress=None, fuzzy=True,
+                 slice_entries=SLICE_ENTRIES):
+        self.api = api
+        self.queue = queue
+        self.job_id = job_id
+        self.on_result = on_result
+        self.on_progress = on_progress
+        self.fuzzy = fuzzy
+        self.slice_entries = slice_entries
+        self._stop = None
+        self.progress = None
+
+    def pause(self):
+        """Stop after the current slice; the job stays resumable."""
+        self._stop = STATE_PAUSED
+
+    def cancel(self):
+        """Stop after the current slice and mark the job cancelled."""
+        self._stop = STATE_CANCELLED
+
+    def run(self):
+        """Translate all pending entries; return the final progress dict."""
+        job = self.queue.get(self.job_id)
+        self.queue.retry_failed(self.job_id)
+        writer = CatalogWriter(job["path"], self.fuzzy)
+        for _idx, msgctxt, msgid, _plural, translation in self.queue.entries(self.job_id, STATE_DONE):
+            writer.add(msgid, translation, msgctxt)
+        self.queue.set_state(self.job_id, STATE_RUNNING)
+
+        pending = self.queue.entries(self.job_id)
+        done, failed = job["done"], 0
+        started = time.monotonic()
+        translated_now = 0
+        state = STATE_RUNNING
+        finished = False
+        flush_error = None
+        lock = threading.Lock()
+        self._report(state, job["total"], done, failed, 0, started)
+        try:
+            for start in range(0, len(pending), self.slice_entries):
+                if self._stop:
+                    break
+                part = pending[start:start + self.slice_entries]
+                ok, bad = [], []
+                # One text per msgid and msgid_plural; slots maps each to (entry, form).
+                texts, slots = [], []
+                for j, (_idx, _msgctxt, msgid, msgid_plural, _t) in enumerate(part):
+                    for form, text in enumerate((msgid, msgid_plural) if msgid_plural else (msgid,)):
+                        texts.append(text)
+                        slots.append((j, form))
+                remaining = [2 if e[3] else 1 for e in part]
+                forms = [[None] * n for n in remaining]
+                errors = [None] * len(part)
+
+                def _on_result(i, result, err, part=part, ok=ok, bad=bad, slots=slots, forms=forms,
+                               remaining=remaining, errors=errors):
+                    j, form = slots[i]
+                    with lock:
+                        forms[j][form] = result
+                        errors[j] = errors[j] or err
+                        remaining[j] -= 1
+                        if remaining[j]:
+                            return  # the entry's other form is still on its way
+                    idx, msgctxt, msgid, msgid_plural, _t = part[j]
+                    err = errors[j]
+                    if err is None and None not in forms[j]:
+                        translation = forms[j] if msgid_plural else forms[j][0]
+                        ok.append((idx, translation))
+                        writer.add(msgid, translation, msgctxt)
+                    else:
+                        translation = None
+                        bad.append((idx, err or "no translation"))
+                    if self.on_result:
+                        self.on_result(msgctxt, msgid, translation, err)
+
+                try:
+                    self.api.translate_batch(texts, job["source"], job["target"], on_result=_on_result,
+                                             accelerators=True)
+                finally:
+                    # Keep what finished before a connection error ended the run.
+                    self.queue.record(self.job_id, ok, bad)
+                done += len(ok)
+                failed += len(bad)
+                translated_now += len(ok) + len(bad)
+                self._report(state, job["total"], done, failed, translated_now, started)
+            finished = True
+        finally:
+            try:
+                writer.flush()
+            except Exception as e:
+                # Raised below unless an earlier error is already propagating.
+                flush_error = e
+            if self._stop:
+                state = self._stop
+            elif failed or not finished or flush_error:
+                state = STATE_FAILED
+            else:
+                state = STATE_DONE
+            self.queue.set_state(self.job_id, state)
+        if flush_error:
+            raise flush_error
+        return self._report(state, job["total"], done, failed, translated_now, started)
+
+    def _report(self, state, total, done, failed, translated_now, started):
+        elapsed = time.monotonic() - started
+        rate = translated_now / elapsed if elapsed > 0 and translated_now else 0.0
+        remaining = total - done - failed
+        self.progress = {"state": state, "total": total, "done": done, "failed": failed,
+                         "rate": rate, "eta": remaining / rate if rate else None}
+        if self.on_progress:
+            self.on_progress(self.progress)
+        return self.progress
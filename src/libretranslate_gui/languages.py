@@ -0,0 +1,156 @@
+"""On-disk cache of /languages per server, a source/target pair index and a /detect cache."""
+
+import hashlib
+import json
+import os
+import threading
+import time
+
+from collections import OrderedDict
+
+from libretranslate_gui import metrics
+from libretranslate_gui.history import data_dir
+
+# Seconds a cached language list is used without asking the server.
+LANGUAGES_TTL = 24 * 3600
+
+# Source "language" that has the client detect the language of each text.
+AUTO_DETECT = "auto"
+DETECTION_CACHE_SIZE = 20000
+
+
+class UnsupportedPairError(ValueError):
+    """The server does not translate between the requested languages."""
+
+
+class DetectionError(ValueError):
+    """The language of a text could not be detected."""
+
+
+class LanguageIndex:
+    """Set of language codes and the targets reachable from each source.
+
+    Servers older than LibreTranslate 1.3 do not list targets; every code is
+    then assumed to translate into every other code.
+    """
+
+    def __init__(self, languages):
+        self.codes = frozenset(l["code"] for l in languages)
+        self.pairs = {}
+        for lang in languages:
+            targets = lang.get("targets")
+            self.pairs[lang["code"]] = frozenset(targets) if targets is not None else self.codes
+
+    def targets(self, source):
+        return self.pairs.get(source, frozenset())
+
+    def supports(self, source, target):
+        if source == AUTO_DETECT:
+            return target in self.codes
+        return target in self.pairs.get(source, ())
+
+    def check(self, source, target):
+        """Raise UnsupportedPairError unless source -> target can be translated."""
+        if not self.supports(source, target):
+            raise UnsupportedPairError(f"{source} → {target} is not supported by this server")
+
+
+class LanguageCache:
+    """Language lists keyed by server URL, stored as JSON in the data directory.
+
+    Each entry keeps the ETag and Last-Modified validators of the response
+    so a stale entry can be revalidated with a conditional request.
+    """
+
+    def __init__(self, path=None, ttl=LANGUAGES_TTL):
+        self.path = path or data_dir() / "languages.json"
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                self._entries = json.load(f)
+        except (OSError, ValueError):
+            self._entries = {}
+
+    def get(self, server):
+        """Return the cached entry dict (languages, etag, last_modified, fetched) or None."""
+        with self._lock:
+            return self._entries.get(server)
+
+    def is_fresh(self, server):
+        entry = self.get(server)
+        return entry is not None and time.time() - entry["fetched"] < self.ttl
+
+    def put(self, server, languages, etag=None, last_modified=None):
+        with self._lock:
+            self._entries[server] = {"languages": languages, "etag": etag,
+                                     "last_modified": last_modified, "fetched": time.time()}
+            self._save()
+
+    def touch(self, server):
+        """Mark an entry as fresh again after a 304 Not Modified."""
+        with self._lock:
+            if server in self._entries:
+                self._entries[server]["fetched"] = time.time()
+                self._save()
+
+    def invalidate(self, server=None):
+        with self._lock:
+            if server is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(server, None)
+            self._save()
+
+    def _save(self):
+        tmp = f"{self.path}.tmp"
+        try:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+        except OSError:
+            pass
+
+
+class DetectionCache:
+    """In-memory LRU of detected languages keyed by a SHA-1 of the text.
+
+    Only the digest is kept, so long segments are not held in memory twice.
+    Safe to use from several worker threads.
+    """
+
+    def __init__(self, max_entries=DETECTION_CACHE_SIZE):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._data = OrderedDict()
+
+    @staticmethod
+    def _key(text):
+        return hashlib.sha1(text.encode("utf-8")).digest()
+
+    def get_many(self, texts):
+        """Return {text: language} for the texts with a cached detection."""
+        found = {}
+        with self._lock:
+            for text in texts:
+                key = self._key(text)
+                language = self._data.get(key)
+                if language is not None:
+                    self._data.move_to_end(key)
+                    found[text] = language
+        hits = sum(1 for t in texts if t in found)
+        metrics.inc("detect_lookups_total", hits, result="hit")
+        metrics.inc("detect_lookups_total", len(texts) - hits, result="miss")
+        return found
+
+    def put(self, text, language):
+        key = self._key(text)
+        with self._lock:
+            self._data[key] = language
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
@@ -0,0 +1,150 @@
+"""Lightweight counters and latency histograms for the hot paths.
+
+Collection is off by default; while disabled, inc() and observe() return
+after one global check. Enable it with enable() (the window does so from
+the "metrics_enabled" setting or LIBRETRANSLATE_GUI_METRICS=1).
+"""
+
+import json
+import os
+import threading
+
+# Upper bounds in seconds of the latency histogram buckets (plus +Inf).
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PREFIX = "libretranslate_gui_"
+
+ENABLED = os.environ.get("LIBRETRANSLATE_GUI_METRICS", "") not in ("", "0")
+
+_lock = threading.Lock()
+_counters = {}
+_histograms = {}
+
+
+class Histogram:
+    """Cumulative-bucket histogram of durations in seconds."""
+
+    __slots__ = ("counts", "count", "sum")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        i = 0
+        for bound in BUCKETS:
+            if value <= bound:
+                break
+            i += 1
+        self.counts[i] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q):
+        """Approximate quantile: upper bound of the bucket holding rank q * count."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(BUCKETS + (float("inf"),), self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def as_dict(self):
+        return {"count": self.count, "sum": round(self.sum, 6),
+                "mean": round(self.sum / self.count, 6) if self.count else None,
+                "p50": self.quantile(0.5), "p95": self.quantile(0.95), "buckets": list(self.counts)}
+
+
+def enable(on=True):
+    global ENABLED
+    ENABLED = bool(on)
+
+
+def _key(name, labels):
+    # Label values are kept as strings, so keys of one metric always sort.
+    return (name, tuple(sorted((k, str(v)) for k, v in labels.items()))) if labels else (name, ())
+
+
+def inc(name, value=1, **labels):
+    """Add value to a counter."""
+    if not ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def observe(name, seconds, **labels):
+    """Record one duration in a histogram."""
+    if not ENABLED:
+        return
+    key = _key(name, labels)
+    with _lock:
+        hist = _histograms.get(key)
+        if hist is None:
+            hist = _histograms[key] = Histogram()
+        hist.observe(seconds)
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _histograms.clear()
+
+
+def _label_text(labels):
+    return "{" + ",".join(f'{k}="{v}"' for k, v in labels) + "}" if labels else ""
+
+
+def snapshot():
+    """Return {"counters": [...], "histograms": [...]} with name, labels and values."""
+    with _lock:
+        counters = [{"name": name, "labels": dict(labels), "value": value}
+                    for (name, labels), value in sorted(_counters.items())]
+        histograms = [dict(hist.as_dict(), name=name, labels=dict(labels))
+                      for (name, labels), hist in sorted(_histograms.items())]
+    return {"enabled": ENABLED, "counters": counters, "histograms": histograms}
+
+
+def to_json():
+    return json.dumps(snapshot(), indent=2)
+
+
+def to_prometheus():
+    """Text exposition format as served on a Prometheus /metrics endpoint.
+
+    >>> enable(); reset()
+    >>> inc("api_requests_total", endpoint="/translate", status=200)
+    >>> inc("api_requests_total", endpoint="/translate", status="error")
+    >>> print(to_prometheus(), end="")
+    # TYPE libretranslate_gui_api_requests_total counter
+    libretranslate_gui_api_requests_total{endpoint="/translate",status="200"} 1
+    libretranslate_gui_api_requests_total{endpoint="/translate",status="error"} 1
+    >>> [c["labels"]["status"] for c in snapshot()["counters"]]
+    ['200', 'error']
+    >>> reset(); enable(False)
+    """
+    lines = []
+    with _lock:
+        counters = sorted(_counters.items())
+        histograms = [(key, list(h.counts), h.count, h.sum) for key, h in sorted(_histograms.items())]
+    typed = set()
+    for (name, labels), value in counters:
+        if name not in typed:
+            typed.add(name)
+            lines.append(f"# TYPE {PREFIX}{name} counter")
+        lines.append(f"{PREFIX}{name}{_label_text(labels)} {value}")
+    for (name, labels), counts, count, total in histograms:
+        if name not in typed:
+            typed.add(name)
+            lines.append(f"# TYPE {PREFIX}{name} histogram")
+        cumulative = 0
+        for bound, n in zip(BUCKETS + ("+Inf",), counts):
+            cumulative += n
+            lines.append(f"{PREFIX}{name}_bucket{_label_text(labels + (('le', bound),))} {cumulative}")
+        lines.append(f"{PREFIX}{name}_sum{_label_text(labels)} {total:.6f}")
+        lines.append(f"{PREFIX}{name}_count{_label_text(labels)} {count}")
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,103 @@
+"""GObject list items for the virtualized entry and history views."""
+
+import gi
+gi.require_version("Gtk", "4.0")
+from gi.repository import GObject, Gtk, Pango
+
+STATUS_UNTRANSLATED = "untranslated"
+STATUS_FUZZY = "fuzzy"
+STATUS_TRANSLATED = "translated"
+
+
+def entry_status(entry):
+    """Map a parsed catalog entry to one of the STATUS_* values."""
+    if entry.get("fuzzy"):
+        return STATUS_FUZZY
+    if entry["untranslated"]:
+        return STATUS_UNTRANSLATED
+    return STATUS_TRANSLATED
+
+
+class EntryItem(GObject.Object):
+    """One row of a list: title, subtitle, tooltip, a short suffix and a status.
+
+    data holds the underlying dict (catalog entry or history record).
+    """
+
+    __gtype_name__ = "LibreTranslateEntryItem"
+
+    title = GObject.Property(type=str, default="")
+    subtitle = GObject.Property(type=str, default="")
+    tooltip = GObject.Property(type=str, default="")
+    suffix = GObject.Property(type=str, default="")
+    status = GObject.Property(type=str, default=STATUS_UNTRANSLATED)
+
+    def __init__(self, data, title, subtitle="", status=STATUS_UNTRANSLATED, suffix=""):
+        super().__init__(title=title, subtitle=subtitle, status=status, suffix=suffix)
+        self.data = data
+        # Lower-cased text used by the search filter.
+        self.search_text = f"{title}\n{subtitle}".lower()
+
+    def set_subtitle(self, text):
+        self.props.subtitle = text
+        self.search_text = f"{self.props.title}\n{text}".lower()
+
+    def set_tooltip(self, text):
+        self.props.tooltip = text
+
+    def set_status(self, status):
+        self.props.status = status
+
+
+def _on_setup(_factory, list_item):
+    box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=12,
+                  margin_top=6, margin_bottom=6, margin_start=12, margin_end=12)
+    labels = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=2, hexpand=True)
+    title = Gtk.Label(xalign=0, ellipsize=Pango.EllipsizeMode.END, single_line_mode=True)
+    subtitle = Gtk.Label(xalign=0, ellipsize=Pango.EllipsizeMode.END, single_line_mode=True)
+    subtitle.add_css_class("dim-label")
+    subtitle.add_css_class("caption")
+    suffix = Gtk.Label()
+    suffix.add_css_class("dim-label")
+    labels.append(title)
+    labels.append(subtitle)
+    box.append(labels)
+    box.append(suffix)
+    list_item.set_child(box)
+    list_item.widgets = (box, title, subtitle, suffix)
+
+
+def _on_bind(_factory, list_item):
+    item = list_item.get_item()
+    box, title, subtitle, suffix = list_item.widgets
+    flags = GObject.BindingFlags.SYNC_CREATE
+    list_item.bindings = [
+        item.bind_property("title", title, "label", flags),
+        item.bind_property("subtitle", subtitle, "label", flags),
+        item.bind_property("suffix", suffix, "label", flags),
+        item.bind_property("tooltip", box, "tooltip-text", flags),
+    ]
+
+
+def _on_unbind(_factory, list_item):
+    for binding in getattr(list_item, "bindings", ()):
+        binding.unbind()
+    list_item.bindings = []
+
+
+def make_list_view(store, match):
+    """Return (list_view, filter) showing EntryItems from store.
+
+    Only visible rows get widgets. match(item) decides which items are shown;
+    call filter.changed(Gtk.FilterChange.DIFFERENT) after its inputs change.
+    """
+    item_filter = Gtk.CustomFilter.new(match)
+    filtered = Gtk.FilterListModel.new(store, item_filter)
+    selection = Gtk.NoSelection.new(filtered)
+    factory = Gtk.SignalListItemFactory()
+    factory.connect("setup", _on_setup)
+    factory.connect("bind", _on_bind)
+    factory.connect("unbind", _on_unbind)
+    view = Gtk.ListView.new(selection, factory)
+    view.add_css_class("rich-list")
+    return view, item_filter
@@ -0,0 +1,137 @@
+"""Protect placeholders, markup and accelerators from machine translation.
+
+mask() replaces printf/brace/Qt placeholders, XML tags and entities with
+numbered sentinel tokens and, for catalog (UI) strings, strips the keyboard
+accelerator; the returned Masked object restores them in the translation
+and raises PlaceholderError if the server dropped, duplicated or mangled
+any of them.
+
+>>> m = mask("Use _underscore_ style", accelerators=True)
+>>> m.text
+'Use underscore_ style'
+>>> m.restore(m.text)
+'Use _underscore_ style'
+>>> m = mask("_Open %s", accelerators=True)
+>>> m.restore("Öppna ⟦0⟧")
+'_Öppna %s'
+>>> m = mask("Save &As <b>now</b>", accelerators=True)
+>>> m.restore(m.text)
+'Save &As <b>now</b>'
+>>> mask("Use _underscore_ style").text
+'Use _underscore_ style'
+"""
+
+import re
+
+# printf (%s, %5.2f, %1$s, %(name)d, %%), Qt (%1, %n, %L1), brace ({0}, {name}, {x:>4}),
+# XML/HTML tags and character entities.
+_PLACEHOLDER_RE = re.compile(
+    r"%(?:\([^)\s]+\)|\d+\$)?[-+#0']*(?:\d+|\*)?(?:\.(?:\d+|\*))?(?:hh|h|ll|l|L|q|j|z|t)?[diouxXeEfFgGaAcspn%]"
+    r"|%L?\d+"
+    r"|\{[\w.\[\]]*(?:![rsa])?(?::[^{}]*)?\}"
+    r"|</?[A-Za-z][\w:-]*(?:\s+[^<>]*?)?/?>"
+    r"|&(?:#\d+|#x[0-9A-Fa-f]+|[A-Za-z]\w*);"
+)
+# GTK (_File) or Qt (&File) accelerator at the start of a word.
+_ACCEL_RE = re.compile(r"(?<![\w&_])([_&])(?=[^\W_])")
+# Cheap pre-check: strings without these characters need no masking.
+_TRIGGER_RE = re.compile(r"[%{<&_]")
+_SENTINEL = "⟦%d⟧"
+_SENTINEL_RE = re.compile(r"⟦\s*(\d+)\s*⟧")
+
+
+class PlaceholderError(ValueError):
+    """The translation does not contain the same placeholders as the source."""
+
+
+class Masked:
+    """A masked string plus what is needed to restore it."""
+
+    __slots__ = ("original", "text", "tokens", "accel")
+
+    def __init__(self, original, text, tokens, accel):
+        self.original = original
+        self.text = text
+        self.tokens = tokens
+        self.accel = accel
+
+    def restore(self, translated):
+        """Put placeholders and the accelerator back into translated."""
+        if not self.tokens and not self.accel:
+            return translated
+        if self.accel:
+            # Before the sentinels are replaced, so offsets match the masked text.
+            translated = _add_accelerator(translated, *self.accel)
+        seen = []
+
+        def _sub(m):
+            i = int(m.group(1))
+            seen.append(i)
+            return self.tokens[i] if i < len(self.tokens) else m.group(0)
+
+        result = _SENTINEL_RE.sub(_sub, translated) if self.tokens else translated
+        if sorted(seen) != list(range(len(self.tokens))):
+            raise PlaceholderError("Placeholders changed in translation of %r" % self.original)
+        return result
+
+
+def _add_accelerator(text, marker, letter, offset):
+    """Insert marker before letter at its original offset if it is still there.
+
+    Otherwise before the first word starting with the same letter (same case
+    first), else before the first letter.
+    """
+    spans = [m.start() for m in re.finditer(r"(?<!\w)[^\W\d_]", text)]
+    if offset in spans and text[offset] == letter:
+        return text[:offset] + marker + text[offset:]
+    for pos in spans:
+        if text[pos] == letter:
+            return text[:pos] + marker + text[pos:]
+    for pos in spans:
+        if text[pos].lower() == letter.lower():
+            return text[:pos] + marker + text[pos:]
+    if spans:
+        return text[:spans[0]] + marker + text[spans[0]:]
+    return text
+
+
+def mask(text, accelerators=False):
+    """Return a Masked version of text for sending to the server.
+
+    With accelerators, a GTK (_File) or Qt (&File) accelerator is stripped
+    and put back on translation; only catalog entries have them, in other
+    text "_" and "&" are left alone.
+    """
+    if not _TRIGGER_RE.search(text):
+        return Masked(text, text, (), None)
+    tokens = []
+
+    def _sub(m):
+        tokens.append(m.group(0))
+        return _SENTINEL % (len(tokens) - 1)
+
+    masked = _PLACEHOLDER_RE.sub(_sub, text)
+    accel = None
+    m = _ACCEL_RE.search(masked) if accelerators else None
+    if m:
+        accel = (m.group(1), masked[m.end()], m.start())
+        masked = masked[:m.start()] + masked[m.end():]
+    return Masked(text, masked, tokens, accel)
+
+
+def placeholders(text):
+    """Return the sorted list of placeholders in text."""
+    return sorted(_PLACEHOLDER_RE.findall(text))
+
+
+def check(source, translated):
+    """Raise PlaceholderError unless translated has the same placeholders as source."""
+    if placeholders(source) != placeholders(translated):
+        raise PlaceholderError("Placeholders changed in translation of %r" % source)
+
+
+def generalize(text, marker="\x00"):
+    """Replace every placeholder with marker, so "Delete %d" and "Delete %s" compare equal."""
+    if not _TRIGGER_RE.search(text):
+        return text
+    return _PLACEHOLDER_RE.sub(marker, text)
@@ -1,52 +1,295 @@
-"""Minimal .po / .ts file parser for translation suggestions."""
+""".po / .ts file parser for translation suggestions."""
 
 import re
-import xml.etree.ElementTree as ET
+import time
 
+from libretranslate_gui import metrics
 
-def parse_po(filepath):
-    """Parse a .po file, return list of dicts {msgid, msgstr, line, untranslated}."""
-    entries = []
+
+_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", '"': '"', "\\": "\\", "a": "\a", "b": "\b",
+            "f": "\f", "v": "\v"}
+# A run of octal or hex escapes is one byte sequence (UTF-8, like the file).
+_ESCAPE_RE = re.compile(r"((?:\\(?:[0-7]{1,3}|x[0-9A-Fa-f]{1,2}))+)|\\(.)")
+_BYTE_RE = re.compile(r"\\(?:([0-7]{1,3})|x([0-9A-Fa-f]{1,2}))")
+# Fallback for keyword lines without a space before the string (msgid"...").
+_KEYWORD_RE = re.compile(r'(msgctxt|msgid_plural|msgid|msgstr(?:\[\d+\])?)\s*"(.*)"\s*$')
+
+
+def _replace_escape(m):
+    if m.group(2) is not None:
+        return _ESCAPES.get(m.group(2), m.group(2))
+    data = bytes(int(octal, 8) & 0xFF if octal else int(hexa, 16)
+                 for octal, hexa in _BYTE_RE.findall(m.group(1)))
+    try:
+        return data.decode("utf-8")
+    except UnicodeDecodeError:
+        return data.decode("latin-1")
+
+
+def _unescape(s):
+    if "\\" not in s:
+        return s
+    return _ESCAPE_RE.sub(_replace_escape, s)
+
+
+class PoEntry:
+    """One catalog entry; msgstr_plural maps plural index to string."""
+
+    __slots__ = ("msgctxt", "msgid", "msgid_plural", "msgstr", "msgstr_plural",
+                 "flags", "comments", "references", "obsolete", "line", "end_line",
+                 "flags_line", "msgid_line", "msgstr_line")
+
+    def __init__(self, line=0):
+        self.msgctxt = None
+        self.msgid = None
+        self.msgid_plural = None
+        self.msgstr = ""
+        self.msgstr_plural = {}
+        self.flags = []
+        self.comments = []
+        self.references = []
+        self.obsolete = False
+        self.line = line
+        self.end_line = line
+        # Line numbers of the "#," flags line, the first msgctxt/msgid line
+        # and the first msgstr line, used when writing translations back.
+        self.flags_line = 0
+        self.msgid_line = 0
+        self.msgstr_line = 0
+
+    @property
+    def fuzzy(self):
+        return "fuzzy" in self.flags
+
+    @property
+    def untranslated(self):
+        if self.msgid_plural is not None:
+            return not self.msgstr_plural or not all(self.msgstr_plural.values())
+        return self.msgstr == ""
+
+    def as_dict(self):
+        return {
+            "msgid": self.msgid,
+            "msgstr": self.msgstr_plural.get(0, "") if self.msgid_plural is not None else self.msgstr,
+            "msgctxt": self.msgctxt,
+            "msgid_plural": self.msgid_plural,
+            "fuzzy": self.fuzzy,
+            "line": self.line,
+            "untranslated": self.untranslated,
+        }
+
+
+def iter_po(filepath):
+    """Yield PoEntry objects from a .po file, reading it line by line.
+
+    Handles multi-line strings, msgctxt, plural forms, flags, comments and
+    obsolete (#~) entries. The header entry (empty msgid) is yielded too.
+    """
+    entry = None
+    field = None  # (attribute, plural index) receiving continuation lines
+    seen_msgstr = False
     with open(filepath, "r", encoding="utf-8") as f:
-        content = f.read()
-
-    # Split on blank lines to get entries
-    blocks = re.split(r"\n\n+", content)
-    for block in blocks:
-        msgid_match = re.search(r'msgid\s+"((?:[^"\\]|\\.)*)"', block)
-        msgstr_match = re.search(r'msgstr\s+"((?:[^"\\]|\\.)*)"', block)
-        if msgid_match:
-            msgid = msgid_match.group(1)
-            msgstr = msgstr_match.group(1) if msgstr_match else ""
-            if msgid:  # skip empty msgid (header)
-                entries.append({
-                    "msgid": msgid,
-                    "msgstr": msgstr,
-                    "untranslated": msgstr == "",
-                })
-    return entries
+        for lineno, raw in enumerate(f, 1):
+            line = raw.strip()
+            if not line:
+                if entry is not None and entry.msgid is not None:
+                    yield entry
+                entry, field, seen_msgstr = None, None, False
+                continue
+
+            first = line[0]
+            obsolete = False
+            if first == "#" and line[1:2] == "~":
+                obsolete = True
+                line = line[2:].lstrip()
+                if not line or line[0] == "|":
+                    continue  # previous msgid of an obsolete entry
+                first = line[0]
+
+            if first == '"':
+                # Continuation of the last string, also as '#~ "..."'.
+                if field is not None:
+                    attr, idx = field
+                    value = _unescape(line[1:-1])
+                    if idx is None:
+                        setattr(entry, attr, getattr(entry, attr) + value)
+                    else:
+                        entry.msgstr_plural[idx] += value
+                    entry.end_line = lineno
+                continue
+
+            if first == "#":
+                if seen_msgstr:
+                    yield entry
+                    entry, field, seen_msgstr = None, None, False
+                if entry is None:
+                    entry = PoEntry(lineno)
+                kind = line[1:2]
+                if kind == ",":
+                    entry.flags_line = lineno
+                    entry.flags.extend(x.strip() for x in line[2:].split(",") if x.strip())
+                elif kind == ":":
+                    entry.references.extend(line[2:].split())
+                elif kind != "|":
+                    entry.comments.append(line)
+                entry.end_line = lineno
+                continue
+
+            keyword, _sep, value = line.partition(" ")
+            value = value.strip()
+            if len(value) < 2 or value[0] != '"' or value[-1] != '"':
+                m = _KEYWORD_RE.match(line)
+                if not m:
+                    continue
+                keyword, value = m.group(1), m.group(2)
+            else:
+                value = value[1:-1]
+            value = _unescape(value)
+            if keyword.startswith("msgstr"):
+                if entry is None:
+                    entry = PoEntry(lineno)
+                if not entry.msgstr_line:
+                    entry.msgstr_line = lineno
+                if keyword == "msgstr":
+                    entry.msgstr = value
+                    field = ("msgstr", None)
+                else:
+                    idx = int(keyword[7:-1])
+                    entry.msgstr_plural[idx] = value
+                    field = ("msgstr_plural", idx)
+                seen_msgstr = True
+            elif keyword in ("msgid", "msgctxt", "msgid_plural"):
+                if seen_msgstr:
+                    yield entry
+                    entry, seen_msgstr = None, False
+                if entry is None:
+                    entry = PoEntry(lineno)
+                if not entry.msgid_line:
+                    entry.msgid_line = lineno
+                setattr(entry, keyword, value)
+                field = (keyword, None)
+            else:
+                continue
+            if obsolete:
+                entry.obsolete = True
+            entry.end_line = lineno
+    if entry is not None and entry.msgid is not None:
+        yield entry
+
+
+def parse_po(filepath):
+    """Parse a .po file, return list of dicts {msgid, msgstr, untranslated, ...}.
+
+    The header and obsolete entries are skipped.
+    """
+    return [e.as_dict() for e in iter_po(filepath) if e.msgid and not e.obsolete]
+
+
+class TsMessage:
+    """One <message> of a Qt .ts file."""
+
+    __slots__ = ("context", "source", "translation", "numerus_forms", "numerus", "type",
+                 "comment", "locations")
+
+    def __init__(self, context):
+        self.context = context
+        self.source = ""
+        self.translation = ""
+        self.numerus_forms = []
+        self.numerus = False
+        self.type = None
+        self.comment = None
+        self.locations = []
+
+    @property
+    def obsolete(self):
+        return self.type in ("obsolete", "vanished")
+
+    @property
+    def untranslated(self):
+        # type="unfinished" with text is kept like a fuzzy .po entry; write_ts() does not replace it.
+        if self.numerus:
+            return not self.numerus_forms or not all(self.numerus_forms)
+        return self.translation == ""
+
+    def as_dict(self):
+        return {
+            "msgid": self.source,
+            "msgstr": self.numerus_forms[0] if self.numerus and self.numerus_forms else self.translation,
+            "msgctxt": self.context,
+            "msgid_plural": None,
+            "numerus": self.numerus,
+            "fuzzy": self.type == "unfinished" and bool(self.translation.strip() or any(self.numerus_forms)),
+            "locations": self.locations,
+            "untranslated": self.untranslated,
+        }
+
+
+def iter_ts(filepath):
+    """Yield TsMessage objects from a Qt .ts file using iterparse.
+
+    Each <message> is removed from the tree once handled, so memory use does
+    not grow with the size of the file.
+    """
+    import xml.etree.ElementTree as ET  # only needed for .ts files
+
+    root = None
+    context_elem = None
+    context_name = None
+    in_message = False
+    for event, elem in ET.iterparse(filepath, events=("start", "end")):
+        tag = elem.tag
+        if event == "start":
+            if root is None:
+                root = elem
+            elif tag == "context":
+                context_elem, context_name = elem, None
+            elif tag == "message":
+                in_message = True
+            continue
+        if tag == "name" and not in_message:
+            context_name = elem.text or ""
+        elif tag == "message":
+            in_message = False
+            msg = TsMessage(context_name)
+            msg.numerus = elem.get("numerus") == "yes"
+            for child in elem:
+                ctag = child.tag
+                if ctag == "source":
+                    msg.source = child.text or ""
+                elif ctag == "translation":
+                    msg.type = child.get("type")
+                    if msg.numerus:
+                        msg.numerus_forms = [f.text or "" for f in child.iter("numerusform")]
+                    else:
+                        msg.translation = child.text or ""
+                elif ctag == "location":
+                    msg.locations.append((child.get("filename"), child.get("line")))
+                elif ctag == "comment":
+                    msg.comment = child.text
+            yield msg
+            if context_elem is not None:
+                context_elem.remove(elem)
+            else:
+                elem.clear()
+        elif tag == "context" and elem is context_elem:
+            root.remove(elem)
+            context_elem = None
 
 
 def parse_ts(filepath):
-    """Parse a Qt .ts file, return list of dicts {source, translation, untranslated}."""
-    entries = []
-    tree = ET.parse(filepath)
-    root = tree.getroot()
-    for msg in root.iter("message"):
-        src = msg.findtext("source", "")
-        tr = msg.findtext("translation", "")
-        tr_elem = msg.find("translation")
-        unfinished = tr_elem is not None and tr_elem.get("type") == "unfinished"
-        entries.append({
-            "msgid": src,
-            "msgstr": tr,
-            "untranslated": tr == "" or unfinished,
-        })
-    return entries
+    """Parse a Qt .ts file, return list of dicts {msgid, msgstr, untranslated, ...}.
+
+    Obsolete and vanished messages are skipped.
+    """
+    return [m.as_dict() for m in iter_ts(filepath) if not m.obsolete]
 
 
 def parse_file(filepath):
     """Auto-detect .po or .ts and parse."""
-    if filepath.endswith(".ts"):
-        return parse_ts(filepath)
-    return parse_po(filepath)
+    started = time.perf_counter()
+    fmt = "ts" if filepath.endswith(".ts") else "po"
+    entries = parse_ts(filepath) if fmt == "ts" else parse_po(filepath)
+    metrics.observe("parse_seconds", time.perf_counter() - started, format=fmt)
+    metrics.inc("parse_entries_total", len(entries), format=fmt)
+    return entries
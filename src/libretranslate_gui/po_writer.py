@@ -0,0 +1,327 @@
+"""Write translations back into .po / .ts files.
+
+Only the msgstr (or <translation>) of entries that receive a translation is
+rewritten; every other byte of the file is copied unchanged. Machine output
+is marked fuzzy (.po) or stays type="unfinished" (.ts) so a human reviews it.
+Files are replaced atomically through a temporary file and os.replace().
+"""
+
+import os
+import re
+import shutil
+import tempfile
+import threading
+import time
+from xml.sax.saxutils import escape as _xml_escape
+
+from libretranslate_gui.po_parser import iter_po
+
+# CatalogWriter saves after this many new translations or seconds.
+CHECKPOINT_ENTRIES = 200
+CHECKPOINT_SECONDS = 30.0
+
+_LINE_RE = re.compile(r"[^\n]*\n|[^\n]+")
+
+
+def entry_key(msgid, msgctxt=None):
+    """Key used to match translations to catalog entries."""
+    return (msgctxt or None, msgid)
+
+
+def _po_escape(s):
+    return (s.replace("\\", "\\\\").replace('"', '\\"').replace("\t", "\\t")
+             .replace("\r", "\\r").replace("\n", "\\n"))
+
+
+def _po_string_lines(keyword, value, newline):
+    """Format keyword "value", splitting multi-line strings like msgmerge does."""
+    if "\n" not in value[:-1]:
+        return [f'{keyword} "{_po_escape(value)}"{newline}']
+    lines = [f'{keyword} ""{newline}']
+    for part in _LINE_RE.findall(value):
+        lines.append(f'"{_po_escape(part)}"{newline}')
+    return lines
+
+
+def _atomic_write(filepath, chunks):
+    """Write an iterable of strings to filepath via a temp file and rename."""
+    directory = os.path.dirname(os.path.abspath(filepath))
+    fd, tmp = tempfile.mkstemp(prefix=".", suffix=".tmp", dir=directory)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+            for chunk in chunks:
+                f.write(chunk)
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            shutil.copymode(filepath, tmp)
+        except OSError:
+            pass
+        os.replace(tmp, filepath)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def _lookup(translations, entry):
+    value = translations.get(entry_key(entry.msgid, entry.msgctxt))
+    if value is None or value == "" or value == []:
+        return None
+    return value
+
+
+def write_po(filepath, translations, fuzzy=True):
+    """Merge translations {entry_key: str or [str, ...]} into a .po file.
+
+    Only untranslated entries are filled in. Returns the number of entries
+    written.
+    """
+    edits = {}
+    written = 0
+    with open(filepath, "r", encoding="utf-8", newline="") as f:
+        first = f.readline()
+    newline = "\r\n" if first.endswith("\r\n") else "\n"
+
+    for entry in iter_po(filepath):
+        if not entry.msgid or entry.obsolete or not entry.untranslated:
+            continue
+        value = _lookup(translations, entry)
+        if value is None:
+            continue
+        if entry.msgid_plural is not None:
+            forms = sorted(entry.msgstr_plural) or [0, 1]
+            values = value if isinstance(value, list) else [value]
+            lines = []
+            for n in forms:
+                # Keep plural forms that are already translated.
+                form = entry.msgstr_plural.get(n) or values[min(n, len(values) - 1)]
+                lines.extend(_po_string_lines(f"msgstr[{n}]", form, newline))
+        else:
+            lines = _po_string_lines("msgstr", value if isinstance(value, str) else value[0], newline)
+        edits[entry.msgstr_line] = ("replace", entry.end_line, lines)
+        if fuzzy and not entry.fuzzy:
+            if entry.flags_line:
+                flags = ["fuzzy"] + entry.flags
+                edits[entry.flags_line] = ("replace", entry.flags_line, [f"#, {', '.join(flags)}{newline}"])
+            else:
+                edits[entry.msgid_line] = ("insert", None, [f"#, fuzzy{newline}"])
+        written += 1
+
+    if not edits:
+        return 0
+
+    def _chunks():
+        skip_until = 0
+        with open(filepath, "r", encoding="utf-8", newline="") as f:
+            for lineno, line in enumerate(f, 1):
+                if lineno <= skip_until:
+                    continue
+                edit = edits.get(lineno)
+                if edit is None:
+                    yield line
+                    continue
+                action, end, lines = edit
+                yield from lines
+                if action == "insert":
+                    yield line
+                else:
+                    skip_until = end
+
+    _atomic_write(filepath, _chunks())
+    return written
+
+
+_TS_TOKEN_RE = re.compile(
+    r"<context>|<name>(?P<name>.*?)</name>|<message(?P<msg_attrs>[^>]*)>(?P<msg>.*?)</message>", re.S)
+_TS_SOURCE_RE = re.compile(r"<source>(.*?)</source>", re.S)
+_TS_TRANSLATION_RE = re.compile(r"<translation(?P<attrs>[^>]*?)(?:/>|>(?P<body>.*?)</translation>)", re.S)
+_TS_NUMERUS_RE = re.compile(r"<numerusform(?:[^>]*?)(?:/>|>.*?</numerusform>)", re.S)
+_XML_ENTITIES = {"&lt;": "<", "&gt;": ">", "&amp;": "&", "&quot;": '"', "&apos;": "'"}
+_XML_ENTITY_RE = re.compile(r"&(?:lt|gt|amp|quot|apos);")
+
+
+def _xml_unescape(s):
+    return _XML_ENTITY_RE.sub(lambda m: _XML_ENTITIES[m.group(0)], s)
+
+
+def write_ts(filepath, translations):
+    """Merge translations into a Qt .ts file, keeping type="unfinished".
+
+    Returns the number of messages written.
+    """
+    with open(filepath, "r", encoding="utf-8", newline="") as f:
+        content = f.read()
+
+    out = []
+    pos = 0
+    written = 0
+    context = None
+    in_context_header = False
+    for m in _TS_TOKEN_RE.finditer(content):
+        if m.group(0) == "<context>":
+            in_context_header = True
+            continue
+        if m.group("name") is not None:
+            if in_context_header:
+                context = _xml_unescape(m.group("name"))
+                in_context_header = False
+            continue
+        in_context_header = False
+        body = m.group("msg")
+        src = _TS_SOURCE_RE.search(body)
+        tr = _TS_TRANSLATION_RE.search(body)
+        if not src or not tr:
+            continue
+        attrs, tr_body = tr.group("attrs"), tr.group("body") or ""
+        numerus = 'numerus="yes"' in m.group("msg_attrs")
+        if numerus:
+            # Same rule as TsMessage.untranslated: every form must be filled.
+            forms = _TS_NUMERUS_RE.findall(tr_body)
+            filled = bool(forms) and all(_xml_unescape(re.sub(r"<[^>]+>", "", f)) for f in forms)
+        else:
+            filled = bool(tr_body.strip())
+        if filled:
+            continue
+        source = _xml_unescape(src.group(1))
+        value = translations.get(entry_key(source, context)) or translations.get(entry_key(source))
+        if not value:
+            continue
+        if "unfinished" not in attrs:
+            attrs = attrs + ' type="unfinished"'
+        if numerus:
+            values = value if isinstance(value, list) else [value]
+            count = max(len(_TS_NUMERUS_RE.findall(tr_body)), 1)
+            inner = "".join(f"<numerusform>{_xml_escape(values[min(i, len(values) - 1)])}</numerusform>"
+                            for i in range(count))
+        else:
+            inner = _xml_escape(value if isinstance(value, str) else value[0])
+        start = m.start("msg") + tr.start()
+        end = m.start("msg") + tr.end()
+        out.append(content[pos:start])
+        out.append(f"<translation{attrs}>{inner}</translation>")
+        pos = end
+        written += 1
+
+    if not written:
+        return 0
+    out.append(content[pos:])
+    _atomic_write(filepath, out)
+    return written
+
+
+def write_file(filepath, translations, fuzzy=True):
+    """Auto-detect .po or .ts and merge translations into it."""
+    if filepath.endswith(".ts"):
+        return write_ts(filepath, translations)
+    return write_po(filepath, translations, fuzzy)
+
+
+_TS_ROOT_RE = re.compile(r"<TS\b[^>]*>")
+_TS_TRANSLATION_ANY_RE = re.compile(r"<translation\b[^>]*?(?:/>|>.*?</translation>)", re.S)
+
+
+def _blank_po(template, language):
+    """Yield the lines of template with msgstrs emptied and the Language header set."""
+    edits = {}
+    with open(template, "r", encoding="utf-8", newline="") as f:
+        first = f.readline()
+    newline = "\r\n" if first.endswith("\r\n") else "\n"
+    header_end = 0
+    for entry in iter_po(template):
+        if entry.msgid == "" and not entry.obsolete:
+            header_end = entry.end_line
+            continue
+        if entry.obsolete or not entry.msgstr_line:
+            continue
+        if entry.msgid_plural is not None:
+            lines = [f'msgstr[{n}] ""{newline}' for n in (sorted(entry.msgstr_plural) or [0, 1])]
+        else:
+            lines = [f'msgstr ""{newline}']
+        edits[entry.msgstr_line] = (entry.end_line, lines)
+        if entry.fuzzy and entry.flags_line:
+            flags = [fl for fl in entry.flags if fl != "fuzzy"]
+            edits[entry.flags_line] = (entry.flags_line, [f"#, {', '.join(flags)}{newline}"] if flags else [])
+
+    has_language = False
+    skip_until = 0
+    with open(template, "r", encoding="utf-8", newline="") as f:
+        for lineno, line in enumerate(f, 1):
+            if lineno <= skip_until:
+                continue
+            if lineno <= header_end and line.startswith('"Language:'):
+                line = f'"Language: {language}\\n"{newline}'
+                has_language = True
+            edit = edits.get(lineno)
+            if lineno == header_end and not has_language:
+                yield line
+                yield f'"Language: {language}\\n"{newline}'
+                continue
+            if edit is None:
+                yield line
+                continue
+            skip_until, lines = edit
+            yield from lines
+
+
+def new_catalog(template, dest, language):
+    """Create dest from a .pot/.po/.ts template with every translation emptied."""
+    if template.endswith(".ts"):
+        with open(template, "r", encoding="utf-8", newline="") as f:
+            content = f.read()
+        content = _TS_TRANSLATION_ANY_RE.sub(_blank_ts_translation, content)
+        root = _TS_ROOT_RE.search(content)
+        if root:
+            tag = re.sub(r'\s+language="[^"]*"', "", root.group(0))
+            tag = tag[:-1] + f' language="{language}">'
+            content = content[:root.start()] + tag + content[root.end():]
+        _atomic_write(dest, [content])
+    else:
+        _atomic_write(dest, _blank_po(template, language))
+
+
+def _blank_ts_translation(m):
+    numerus = _TS_NUMERUS_RE.findall(m.group(0))
+    inner = "<numerusform></numerusform>" * len(numerus)
+    return f'<translation type="unfinished">{inner}</translation>'
+
+
+class CatalogWriter:
+    """Collects translations for one file and saves them in checkpoints.
+
+    add() may be called from worker threads; the file is rewritten once
+    CHECKPOINT_ENTRIES new translations or CHECKPOINT_SECONDS have piled up,
+    so a crash during a long job loses at most one checkpoint of work.
+    """
+
+    def __init__(self, filepath, fuzzy=True, checkpoint_entries=CHECKPOINT_ENTRIES,
+                 checkpoint_seconds=CHECKPOINT_SECONDS):
+        self.filepath = filepath
+        self.fuzzy = fuzzy
+        self.checkpoint_entries = checkpoint_entries
+        self.checkpoint_seconds = checkpoint_seconds
+        self.saved = 0
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._last_save = time.monotonic()
+
+    def add(self, msgid, translation, msgctxt=None):
+        with self._lock:
+            self._pending[entry_key(msgid, msgctxt)] = translation
+            due = (len(self._pending) >= self.checkpoint_entries
+                   or time.monotonic() - self._last_save >= self.checkpoint_seconds)
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Write all pending translations to the file now."""
+        with self._lock:
+            if not self._pending:
+                return 0
+            written = write_file(self.filepath, self._pending, self.fuzzy)
+            self.saved += written
+            self._pending = {}
+            self._last_save = time.monotonic()
+            return written
@@ -0,0 +1,168 @@
+"""Project-wide runs over many catalogs: every unique string is translated once."""
+
+import glob
+import os
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from libretranslate_gui.languages import AUTO_DETECT
+from libretranslate_gui.protocol import chunk_indices
+from libretranslate_gui.po_parser import parse_file, iter_po
+from libretranslate_gui.po_writer import entry_key, write_file
+from libretranslate_gui.scheduler import DEFAULT_WORKERS
+
+_PO_LANGUAGE_RE = re.compile(r"^Language:\s*([\w@-]+)", re.M)
+_TS_LANGUAGE_RE = re.compile(r'<TS[^>]*\blanguage="([\w@-]+)"')
+
+
+def find_catalogs(paths):
+    """Expand files, directories (recursively) and glob patterns into .po/.ts paths."""
+    found = []
+    for p in paths:
+        matches = glob.glob(p, recursive=True) if glob.has_magic(p) else [p]
+        for m in matches:
+            if os.path.isdir(m):
+                for root, dirs, files in os.walk(m):
+                    dirs.sort()
+                    found.extend(os.path.join(root, f) for f in sorted(files) if f.endswith((".po", ".ts")))
+            elif m.endswith((".po", ".ts")) and os.path.isfile(m):
+                found.append(m)
+    return list(dict.fromkeys(os.path.normpath(f) for f in found))
+
+
+def catalog_language(filepath):
+    """Return the language declared in a catalog header, e.g. "sv" for sv_SE."""
+    if filepath.endswith(".ts"):
+        with open(filepath, "r", encoding="utf-8") as f:
+            m = _TS_LANGUAGE_RE.search(f.read(4096))
+    else:
+        header = next((e for e in iter_po(filepath) if e.msgid == ""), None)
+        m = _PO_LANGUAGE_RE.search(header.msgstr) if header else None
+    if not m:
+        return None
+    return re.split(r"[_@.-]", m.group(1))[0].lower()
+
+
+def entry_texts(entry):
+    """Source strings of an entry that need a translation (msgid, and msgid_plural if any)."""
+    if entry.get("msgid_plural"):
+        return [entry["msgid"], entry["msgid_plural"]]
+    return [entry["msgid"]]
+
+
+class Project:
+    """Untranslated entries of many catalogs, with source strings interned.
+
+    Entries are kept per file under their (msgctxt, msgid) key. Strings are
+    interned, so a msgid repeated across hundreds of files is stored once.
+    strings maps each target language to its unique source texts; after
+    translate() every text has one translation, which write() fans out to
+    each occurrence.
+    """
+
+    def __init__(self, files, target=None, jobs=DEFAULT_WORKERS):
+        self.target = target
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            self.files = list(executor.map(self._load, files))
+        self.strings = {}
+        for info in self.files:
+            if info["error"]:
+                continue
+            texts = self.strings.setdefault(info["target"], {})
+            for entry in info["entries"]:
+                for text in entry_texts(entry):
+                    texts[text] = None
+        self.translations = {}
+        # Set by translate(): /translate requests sent, and per target the
+        # texts the translation memory already had.
+        self.requests = None
+        self.cached = {}
+
+    def _load(self, path):
+        info = {"path": path, "target": self.target, "untranslated": 0, "translated": 0, "failed": 0,
+                "error": None, "entries": []}
+        try:
+            info["target"] = self.target or catalog_language(path)
+            if not info["target"]:
+                raise ValueError("no target language given and none found in the file header")
+            entries = []
+            for e in parse_file(path):
+                if not e["untranslated"]:
+                    continue
+                entries.append({"msgid": sys.intern(e["msgid"]),
+                                "msgctxt": sys.intern(e["msgctxt"]) if e.get("msgctxt") else None,
+                                "msgid_plural": sys.intern(e["msgid_plural"]) if e.get("msgid_plural") else None})
+            info["entries"] = entries
+            info["untranslated"] = len(entries)
+        except Exception as e:
+            info["error"] = str(e)
+        return info
+
+    def stats(self):
+        """Occurrence and request counts with and without cross-file deduplication.
+
+        requests_per_file estimates what translating each file on its own
+        would need (still batched and deduplicated within the file, and
+        skipping texts the translation memory had). requests_deduplicated
+        is the number of /translate requests translate() sent, or the same
+        estimate for one batch run per target language before translate().
+        """
+        occurrences = per_file = 0
+        for info in self.files:
+            cached = self.cached.get(info["target"], ())
+            texts = [t for e in info["entries"] for t in entry_texts(e)]
+            occurrences += len(texts)
+            per_file += sum(1 for _ in chunk_indices([t for t in dict.fromkeys(texts) if t not in cached]))
+        if self.requests is not None:
+            deduplicated = self.requests
+        else:
+            deduplicated = sum(sum(1 for _ in chunk_indices(list(texts))) for texts in self.strings.values())
+        return {
+            "files": len(self.files),
+            "entries": sum(info["untranslated"] for info in self.files),
+            "strings": occurrences,
+            "unique_strings": sum(len(t) for t in self.strings.values()),
+            "requests_per_file": per_file,
+            "requests_deduplicated": deduplicated,
+            "requests_saved": per_file - deduplicated,
+        }
+
+    def translate(self, api, source, progress=None):
+        """Translate every unique (text, target) once; progress(target, total) returns an on_result callback."""
+        sent = api.requests.get("/translate", 0)
+        for target, texts in self.strings.items():
+            texts = list(texts)
+            if api.memory and source != AUTO_DETECT:
+                # Not counted as lookups: translate_batch() looks them up again.
+                self.cached[target] = api.memory.get_many(api.server_url, source, target, texts, count=False)
+            on_result = progress(target, len(texts)) if progress else None
+            results = api.translate_batch(texts, source, target, on_result=on_result, accelerators=True)
+            self.translations[target] = dict(zip(texts, results))
+        self.requests = api.requests.get("/translate", 0) - sent
+
+    def write(self, fuzzy=True, dry_run=False, jobs=DEFAULT_WORKERS):
+        """Fan translations out to every file; return the per-file info dicts."""
+        def _write(info):
+            if info["error"]:
+                return info
+            done = self.translations.get(info["target"], {})
+            merged = {}
+            for entry in info["entries"]:
+                values = [done.get(t) for t in entry_texts(entry)]
+                if any(v is None for v in values):
+                    info["failed"] += 1
+                    continue
+                merged[entry_key(entry["msgid"], entry["msgctxt"])] = values if len(values) > 1 else values[0]
+                # Entries that share a key (same source in one .ts context) are counted each.
+                info["translated"] += 1
+            if merged and not dry_run:
+                try:
+                    write_file(info["path"], merged, fuzzy)
+                except Exception as e:
+                    info["error"] = str(e)
+            return info
+
+        with ThreadPoolExecutor(max_workers=jobs) as executor:
+            files = list(executor.map(_write, self.files))
+        return [{k: v for k, v in info.items() if k != "entries"} for info in files]
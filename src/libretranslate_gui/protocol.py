@@ -0,0 +1,451 @@
+"""Client logic shared by LibreTranslateAPI and AsyncLibreTranslateAPI.
+
+Every operation is a generator that yields the I/O it needs as steps and is
+sent back the outcome; api drives the generators with blocking calls,
+async_api with coroutines. A step is a tuple:
+
+    (REQUEST, method, endpoint, data, headers, raw, timeout)
+        one API request with retries and failover; run it as request()
+    (HTTP, method, url, body, headers, timeout)
+        one HTTP exchange: (status, headers, body bytes). Raises
+        urllib.error.HTTPError for HTTP errors and OSError (or
+        http.client.HTTPException) when the connection fails
+    (WAIT,)
+        wait for the rate limiter
+    (CALL, function, *args)
+        function(*args): blocking local work such as SQLite, kept off the
+        event loop by the asyncio client
+    (PARALLEL, [generator, ...])
+        run the generators concurrently: [result, ...]
+
+Errors of a step are thrown into the generator at its yield.
+"""
+
+import http.client
+import json
+import time
+from email.utils import parsedate_to_datetime
+from urllib import error
+
+from libretranslate_gui import metrics
+from libretranslate_gui.languages import LanguageIndex, UnsupportedPairError, DetectionError, AUTO_DETECT
+from libretranslate_gui.placeholders import mask, check, PlaceholderError
+
+REQUEST = "request"
+HTTP = "http"
+WAIT = "wait"
+CALL = "call"
+PARALLEL = "parallel"
+
+# How often a request is retried after HTTP 429 Too Many Requests.
+MAX_RETRIES = 3
+DEFAULT_RETRY_AFTER = 5.0
+
+# Limits for one batched /translate request (q as a list of strings).
+BATCH_MAX_ITEMS = 50
+BATCH_MAX_CHARS = 5000
+
+# Errors of an HTTP step that mean the server could not be reached.
+TRANSPORT_ERRORS = (http.client.HTTPException, OSError)
+
+
+def chunk_indices(texts, max_items=BATCH_MAX_ITEMS, max_chars=BATCH_MAX_CHARS):
+    """Yield lists of indices into texts, capped by item count and total characters."""
+    chunk, chars = [], 0
+    for i, text in enumerate(texts):
+        n = len(text)
+        if chunk and (len(chunk) >= max_items or chars + n > max_chars):
+            yield chunk
+            chunk, chars = [], 0
+        chunk.append(i)
+        chars += n
+    if chunk:
+        yield chunk
+
+
+def encode_payload(data, api_key):
+    """JSON request body for one server: data with that server's api_key, if any."""
+    payload = {k: v for k, v in data.items() if k != "api_key"}
+    if api_key:
+        payload["api_key"] = api_key
+    return json.dumps(payload).encode("utf-8")
+
+
+def conditional_headers(entry):
+    """Revalidation headers for a cached /languages response."""
+    headers = {}
+    if entry and entry.get("etag"):
+        headers["If-None-Match"] = entry["etag"]
+    if entry and entry.get("last_modified"):
+        headers["If-Modified-Since"] = entry["last_modified"]
+    return headers
+
+
+def restore_chunk(masked, result):
+    """Restore masked batch results; entries whose placeholders did not survive become None."""
+    restored = []
+    for m, r in zip(masked, result):
+        try:
+            restored.append(m.restore(r))
+        except PlaceholderError:
+            restored.append(None)
+    return restored
+
+
+def best_language(candidates):
+    """Return the most confident language of a /detect result for one text, or None."""
+    if not isinstance(candidates, list) or not candidates:
+        return None
+    best = max(candidates, key=lambda c: c.get("confidence", 0))
+    return best.get("language") or None
+
+
+def batch_detections(result, count):
+    """Per-text candidate lists of a batched /detect response, or None if the server did not batch."""
+    if isinstance(result, list) and len(result) == count and all(isinstance(r, list) for r in result):
+        return result
+    return None
+
+
+def group_by_language(texts, languages, target, index, results, on_result):
+    """Group indices of texts by detected source language: {source: [index]}.
+
+    Texts already in target are their own translation, and texts whose
+    language is unknown or cannot be translated into target fail; both are
+    reported to on_result right away and left out of the groups.
+    """
+    groups = {}
+    for i, language in enumerate(languages):
+        err = None
+        if language == target:
+            results[i] = texts[i]
+        elif language is None:
+            err = DetectionError("Could not detect the language")
+        elif index is not None and not index.supports(language, target):
+            err = UnsupportedPairError(f"{language} → {target} is not supported by this server")
+        else:
+            groups.setdefault(language, []).append(i)
+            continue
+        if on_result:
+            on_result(i, results[i], err)
+    return groups
+
+
+def record(endpoint, status, seconds, sent, received):
+    """Report one HTTP exchange to metrics."""
+    if not metrics.ENABLED:
+        return
+    metrics.observe("api_request_seconds", seconds, endpoint=endpoint)
+    metrics.inc("api_requests_total", endpoint=endpoint, status=status)
+    metrics.inc("api_bytes_sent_total", sent)
+    metrics.inc("api_bytes_received_total", received)
+
+
+def retry_after(value):
+    """Parse a Retry-After header (seconds or HTTP date) into seconds."""
+    if not value:
+        return DEFAULT_RETRY_AFTER
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return DEFAULT_RETRY_AFTER
+
+
+def follow_quota(bucket, headers):
+    """Adopt the server's per-minute quota when it advertises one."""
+    limit = headers.get("X-RateLimit-Limit")
+    if limit and limit.isdigit() and int(limit) != bucket.rate:
+        bucket.set_rate(int(limit))
+
+
+def check_pair(api, source, target):
+    """Raise UnsupportedPairError if api's known language list rules the pair out."""
+    if api.language_index is not None:
+        api.language_index.check(source, target)
+
+
+def request(api, method, endpoint, data=None, headers=None, raw=False, timeout=30):
+    """Send a request through api's rate limiter and server pool.
+
+    HTTP 429 pauses the rate limiter and retries; connection errors and 5xx
+    responses are retried once on every other configured server. data is
+    sent as JSON with the chosen server's API key added. Returns the decoded
+    JSON, or (status, headers, body bytes) when raw is set.
+    """
+    extra_headers = headers or {}
+    tried = set()
+    rate_limited = 0
+    retry = None
+    last_error = None
+    while True:
+        node = api.servers.acquire(exclude=tried)
+        if node is None:
+            raise last_error
+        if retry:
+            metrics.inc("api_retries_total", reason=retry)
+        body = None
+        headers = dict(extra_headers)
+        if data is not None:
+            body = encode_payload(data, node.api_key)
+            headers["Content-Type"] = "application/json"
+        try:
+            yield (WAIT,)
+            api.count_request(endpoint)
+            started = time.monotonic()
+            status, resp_headers, payload = yield (HTTP, method, f"{node.url}{endpoint}", body, headers, timeout)
+        except error.HTTPError as e:
+            record(endpoint, str(e.code), time.monotonic() - started, len(body or b""), 0)
+            if e.code == 429 and rate_limited < MAX_RETRIES:
+                api.servers.release(node)
+                retry = "rate_limited"
+                rate_limited += 1
+                api.scheduler.bucket.pause(retry_after(e.headers.get("Retry-After")))
+                continue
+            server_fault = e.code >= 500
+            api.servers.release(node, failed=server_fault, reason=f"HTTP {e.code}")
+            if not server_fault:
+                raise
+            tried.add(node)
+            last_error = e
+            retry = "failover"
+            continue
+        except TRANSPORT_ERRORS as e:
+            record(endpoint, "error", time.monotonic() - started, len(body or b""), 0)
+            api.servers.release(node, failed=True, reason=str(e) or type(e).__name__)
+            tried.add(node)
+            last_error = e
+            retry = "failover"
+            continue
+        except BaseException:
+            # Cancelled: the server is not at fault.
+            api.servers.release(node)
+            raise
+        elapsed = time.monotonic() - started
+        api.servers.release(node, latency=elapsed)
+        record(endpoint, str(status), elapsed, len(body or b""), len(payload))
+        follow_quota(api.scheduler.bucket, resp_headers)
+        if raw:
+            return status, resp_headers, payload
+        return json.loads(payload.decode("utf-8"))
+
+
+def get_languages(api, refresh=False):
+    """Language list of api.server_url, through api.language_cache; see LibreTranslateAPI.get_languages()."""
+    server = api.server_url
+    cache = api.language_cache
+    entry = cache.get(server) if cache else None
+    if entry and not refresh and cache.is_fresh(server):
+        languages = entry["languages"]
+    else:
+        status, headers, payload = yield (REQUEST, "GET", "/languages", None, conditional_headers(entry),
+                                          True, 15)
+        if status == 304 and entry:
+            yield (CALL, cache.touch, server)
+            languages = entry["languages"]
+        else:
+            languages = json.loads(payload.decode("utf-8"))
+            if cache:
+                yield (CALL, cache.put, server, languages, headers.get("ETag"), headers.get("Last-Modified"))
+    api.language_index = LanguageIndex(languages)
+    return languages
+
+
+def detect(q):
+    """LibreTranslate's /detect result for a string or a list of strings."""
+    return (yield (REQUEST, "POST", "/detect", {"q": q}, None, False, 30))
+
+
+def detect_one(text):
+    """/detect result for one text, or None if the server rejects it with HTTP 400."""
+    try:
+        return (yield from detect(text))
+    except error.HTTPError as e:
+        if e.code != 400:
+            raise
+        return None
+
+
+def detect_chunk(texts):
+    """Detected language of each text, from one request when the server accepts a list.
+
+    A server that answers a list with HTTP 400 or with a single result gets
+    one request per text. Connection and other HTTP errors are raised, not
+    retried per text.
+    """
+    try:
+        result = batch_detections((yield from detect(texts)), len(texts))
+    except error.HTTPError as e:
+        if e.code != 400:
+            raise
+        result = None
+    if result is None:
+        # Older servers only take a single string.
+        result = yield (PARALLEL, [detect_one(text) for text in texts])
+    return [best_language(r) for r in result]
+
+
+def detect_languages(api, texts):
+    """Detected language code of each text (None if unknown).
+
+    Detections cached in api.detections are reused; the remaining unique
+    texts are sent in /detect requests of up to BATCH_MAX_ITEMS strings, in
+    parallel.
+    """
+    texts = list(texts)
+    found = api.detections.get_many(texts)
+    missing = [t for t in dict.fromkeys(texts) if t not in found]
+    parts = [[missing[i] for i in part] for part in chunk_indices(missing)]
+    detected = yield (PARALLEL, [detect_chunk(part) for part in parts])
+    for part, languages in zip(parts, detected):
+        for text, language in zip(part, languages):
+            if language:
+                api.detections.put(text, language)
+                found[text] = language
+    return [found.get(t) for t in texts]
+
+
+def send_translate(q, source, target):
+    """translatedText for a string or a list of strings."""
+    data = {"q": q, "source": source, "target": target, "format": "text"}
+    return (yield (REQUEST, "POST", "/translate", data, None, False, 30)).get("translatedText", "")
+
+
+def translate(api, text, source, target, count=True, accelerators=False):
+    """Translate one text, through api's translation memory and placeholder protection.
+
+    count=False keeps the memory lookup out of its statistics, for texts a
+    batch lookup already counted. accelerators protects the keyboard
+    accelerator of catalog entries; see placeholders.mask().
+    """
+    if source == AUTO_DETECT:
+        check_pair(api, AUTO_DETECT, target)
+        source = (yield from detect_languages(api, [text]))[0]
+        if source is None:
+            raise DetectionError("Could not detect the language")
+        if source == target:
+            return text
+    check_pair(api, source, target)
+    memory = api.memory
+    if memory:
+        cached = yield (CALL, memory.get, api.server_url, source, target, text, count)
+        if cached is not None:
+            return cached
+    if api.protect_placeholders:
+        masked = mask(text, accelerators)
+        try:
+            result = masked.restore((yield from send_translate(masked.text, source, target)))
+        except PlaceholderError:
+            if not masked.tokens and not masked.accel:
+                raise
+            # The server mangled the sentinels; try once more unmasked.
+            result = yield from send_translate(text, source, target)
+            check(text, result)
+    else:
+        result = yield from send_translate(text, source, target)
+    if memory:
+        yield (CALL, memory.put, api.server_url, source, target, text, result)
+    return result
+
+
+def translate_entry(api, texts, i, source, target, results, on_result, accelerators=False):
+    """Translate texts[i] on its own into results[i]; failures go to on_result only."""
+    err = None
+    try:
+        results[i] = yield from translate(api, texts[i], source, target, False, accelerators)
+    except Exception as e:
+        err = e
+    if on_result:
+        on_result(i, results[i], err)
+
+
+def translate_chunk(api, texts, chunk, source, target, results, on_result, accelerators=False):
+    """Translate the texts at the indices in chunk with one request.
+
+    Falls back to one request per entry when the server rejects the batch
+    (HTTP 400) or answers with something other than one result per text, so
+    a single bad string does not fail the whole chunk; entries whose
+    placeholders did not survive are re-sent on their own. Connection
+    errors and other HTTP errors are raised as they are.
+    """
+    masked = [mask(texts[i], accelerators) for i in chunk] if api.protect_placeholders else None
+    try:
+        translated = yield from send_translate(
+            [m.text for m in masked] if masked else [texts[i] for i in chunk], source, target)
+    except error.HTTPError as e:
+        if e.code != 400:
+            raise
+        translated = None
+    if not isinstance(translated, list) or len(translated) != len(chunk):
+        yield (PARALLEL, [translate_entry(api, texts, i, source, target, results, on_result, accelerators)
+                          for i in chunk])
+        return
+    if masked:
+        translated = restore_chunk(masked, translated)
+    if api.memory:
+        yield (CALL, api.memory.put_many, api.server_url, source, target,
+               [(texts[i], r) for i, r in zip(chunk, translated) if r is not None])
+    retry = []
+    for i, result in zip(chunk, translated):
+        if result is None:
+            # Placeholder check failed: re-queue just this entry.
+            retry.append(i)
+            continue
+        results[i] = result
+        if on_result:
+            on_result(i, result, None)
+    if retry:
+        yield (PARALLEL, [translate_entry(api, texts, i, source, target, results, on_result, accelerators)
+                          for i in retry])
+
+
+def plan_batch(api, texts, source, target, on_result, accelerators=False):
+    """Prepare translating a list: (results, [chunk generator, ...]).
+
+    Translations found in the translation memory are filled in (and passed
+    to on_result) right away; the returned translate_chunk() generators
+    translate the rest into results when run. With source "auto", texts are
+    grouped by detected language first and each group is batched on its own.
+    """
+    texts = list(texts)
+    results = [None] * len(texts)
+    if source == AUTO_DETECT:
+        check_pair(api, AUTO_DETECT, target)
+        languages = yield from detect_languages(api, texts)
+        groups = group_by_language(texts, languages, target, api.language_index, results, on_result)
+        chunks = []
+        for group_source, indices in groups.items():
+            def _on_group_result(j, result, err, indices=indices):
+                results[indices[j]] = result
+                if on_result:
+                    on_result(indices[j], result, err)
+
+            chunks += (yield from plan_batch(api, [texts[i] for i in indices], group_source, target,
+                                             _on_group_result, accelerators))[1]
+        return results, chunks
+    check_pair(api, source, target)
+    pending = list(range(len(texts)))
+    if api.memory:
+        cached = yield (CALL, api.memory.get_many, api.server_url, source, target, texts)
+        pending = []
+        for i, text in enumerate(texts):
+            if text in cached:
+                results[i] = cached[text]
+                if on_result:
+                    on_result(i, results[i], None)
+            else:
+                pending.append(i)
+    chunks = [translate_chunk(api, texts, [pending[j] for j in part], source, target, results, on_result,
+                              accelerators)
+              for part in chunk_indices([texts[i] for i in pending])]
+    return results, chunks
+
+
+def translate_batch(api, texts, source, target, on_result=None, accelerators=False):
+    """Translate a list with one request per chunk; see LibreTranslateAPI.translate_batch()."""
+    results, chunks = yield from plan_batch(api, texts, source, target, on_result, accelerators)
+    yield (PARALLEL, chunks)
+    return results
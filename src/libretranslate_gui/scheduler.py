@@ -0,0 +1,95 @@
+"""Bounded worker pool and token-bucket rate limiting for API requests."""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_WORKERS = 4
+
+
+class TokenBucket:
+    """Token bucket refilled at requests_per_minute; 0 means unlimited."""
+
+    def __init__(self, requests_per_minute=0):
+        self._lock = threading.Lock()
+        self._blocked_until = 0.0
+        self.set_rate(requests_per_minute)
+
+    def set_rate(self, requests_per_minute):
+        with self._lock:
+            self.rate = max(0, int(requests_per_minute or 0))
+            # Allow a burst of up to one second's worth (at least one request).
+            self.capacity = max(1.0, self.rate / 60.0)
+            self.tokens = self.capacity
+            self.updated = time.monotonic()
+
+    def pause(self, seconds):
+        """Block all acquirers for the given number of seconds (e.g. after HTTP 429)."""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+            self.tokens = 0.0
+
+    def _reserve(self):
+        """Take a token and return 0, or return the seconds to wait before trying again."""
+        with self._lock:
+            now = time.monotonic()
+            wait = self._blocked_until - now
+            if wait > 0:
+                return wait
+            if not self.rate:
+                return 0
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate / 60.0)
+            self.updated = now
+            if self.tokens >= 1.0:
+                self.tokens -= 1.0
+                return 0
+            return (1.0 - self.tokens) * 60.0 / self.rate
+
+    def acquire(self):
+        """Wait until a request may be sent."""
+        while (wait := self._reserve()) > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self):
+        """acquire() for event-loop code: waits without blocking the loop."""
+        import asyncio
+        while (wait := self._reserve()) > 0:
+            await asyncio.sleep(wait)
+
+
+class RequestScheduler:
+    """Runs API calls on a fixed-size thread pool behind a shared rate limit."""
+
+    def __init__(self, max_workers=DEFAULT_WORKERS, requests_per_minute=0):
+        self.bucket = TokenBucket(requests_per_minute)
+        self.max_workers = max(1, int(max_workers or DEFAULT_WORKERS))
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="libretranslate")
+            return self._executor
+
+    def submit(self, fn, *args, **kwargs):
+        """Schedule fn(*args, **kwargs) and return a concurrent.futures.Future."""
+        return self._get_executor().submit(fn, *args, **kwargs)
+
+    def configure(self, max_workers=None, requests_per_minute=None):
+        """Change pool size and/or rate; running tasks finish on the old pool."""
+        if requests_per_minute is not None:
+            self.bucket.set_rate(requests_per_minute)
+        if max_workers is not None and int(max_workers) != self.max_workers:
+            with self._lock:
+                self.max_workers = max(1, int(max_workers))
+                old, self._executor = self._executor, None
+            if old is not None:
+                old.shutdown(wait=False)
+
+    def shutdown(self, wait=True):
+        with self._lock:
+            old, self._executor = self._executor, None
+        if old is not None:
+            old.shutdown(wait=wait)
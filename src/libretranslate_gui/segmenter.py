@@ -0,0 +1,82 @@
+"""Split source text into segments for incremental translation."""
+
+import re
+from collections import OrderedDict
+
+# Paragraphs longer than this are split further into sentences.
+SEGMENT_MAX_CHARS = 1000
+
+# Paragraph separators: a line break followed by one or more blank lines.
+_PARAGRAPH_SPLIT_RE = re.compile(r"(\n[ \t]*\n\s*)")
+# Whitespace after sentence-ending punctuation (optionally followed by a quote or bracket).
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?…。！？][\"'”’)\]])(\s+)|(?<=[.!?…。！？])(\s+)")
+_EDGE_SPACE_RE = re.compile(r"^(\s*)(.*?)(\s*)$", re.S)
+
+
+def split_paragraphs(text):
+    """Split text into a list of (chunk, translatable) pairs.
+
+    Joining all chunks gives back the original text exactly; separators and
+    whitespace-only chunks are marked as not translatable.
+    """
+    parts = []
+    for chunk in _PARAGRAPH_SPLIT_RE.split(text):
+        if chunk:
+            parts.append((chunk, bool(chunk.strip())))
+    return parts
+
+
+def _split_sentences(paragraph):
+    chunks = []
+    for i, chunk in enumerate(_SENTENCE_SPLIT_RE.split(paragraph)):
+        if chunk:
+            # split() returns text, then the two separator groups, in turn.
+            chunks.append((chunk, i % 3 == 0))
+    return chunks
+
+
+def split_segments(text, max_chars=SEGMENT_MAX_CHARS):
+    """Split text into paragraph- or sentence-sized (chunk, translatable) pairs.
+
+    Like split_paragraphs(), but long paragraphs are cut at sentence
+    boundaries and leading/trailing whitespace of every segment is kept
+    as a separate, untranslated chunk, so whitespace and line layout are
+    preserved exactly when the translated chunks are joined.
+    """
+    segments = []
+    for chunk, translatable in split_paragraphs(text):
+        if not translatable:
+            segments.append((chunk, False))
+            continue
+        lead, body, trail = _EDGE_SPACE_RE.match(chunk).groups()
+        if lead:
+            segments.append((lead, False))
+        if len(body) > max_chars:
+            segments.extend((c, t and bool(c.strip())) for c, t in _split_sentences(body))
+        else:
+            segments.append((body, True))
+        if trail:
+            segments.append((trail, False))
+    return segments
+
+
+class SegmentCache:
+    """Small in-memory LRU of segment translations keyed by (source, target, text)."""
+
+    def __init__(self, max_entries=2000):
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+
+    def get(self, source, target, text):
+        key = (source, target, text)
+        value = self._data.get(key)
+        if value is not None:
+            self._data.move_to_end(key)
+        return value
+
+    def put(self, source, target, text, translation):
+        key = (source, target, text)
+        self._data[key] = translation
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
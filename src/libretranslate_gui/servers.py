@@ -0,0 +1,141 @@
+"""Routing, health tracking and failover across several LibreTranslate servers."""
+
+import threading
+import time
+
+# Consecutive failures after which a server's circuit opens.
+FAILURE_THRESHOLD = 3
+# Seconds an open circuit waits before the server is probed again; doubles
+# after every failed probe up to MAX_COOLDOWN.
+COOLDOWN = 15.0
+MAX_COOLDOWN = 300.0
+# Assumed latency of a server that has not answered yet.
+INITIAL_LATENCY = 0.5
+# Weight of the newest sample in the moving latency average.
+LATENCY_ALPHA = 0.3
+
+STATE_HEALTHY = "healthy"
+STATE_OPEN = "open"
+STATE_PROBING = "probing"
+
+
+class Node:
+    """One LibreTranslate server with its own API key and health state."""
+
+    def __init__(self, url, api_key=""):
+        self.url = url.rstrip("/")
+        self.api_key = api_key or ""
+        self.state = STATE_HEALTHY
+        self.outstanding = 0
+        self.latency = INITIAL_LATENCY
+        self.requests = 0
+        self.errors = 0
+        self.failures = 0
+        self.cooldown = COOLDOWN
+        self.open_until = 0.0
+        self.last_error = None
+
+    def score(self):
+        """Expected wait for one more request: queue length times latency."""
+        return (self.outstanding + 1) * self.latency
+
+    def as_dict(self):
+        return {
+            "url": self.url,
+            "state": self.state,
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "errors": self.errors,
+            "latency_ms": round(self.latency * 1000),
+            "last_error": self.last_error,
+        }
+
+
+class ServerPool:
+    """Pick the least loaded healthy server and track failures per server.
+
+    After FAILURE_THRESHOLD consecutive failures a server's circuit opens and
+    it receives no traffic. Once the cooldown has passed, probe(node) is run
+    on a background thread (the API client uses GET /languages); the circuit
+    closes when the probe succeeds and stays open for twice as long when it
+    fails. If every server is open, the one that failed longest ago is still
+    tried so a single-server setup never refuses to send.
+    """
+
+    def __init__(self, servers, probe=None):
+        self._lock = threading.Lock()
+        self.probe = probe
+        self.set_servers(servers)
+
+    def set_servers(self, servers):
+        """Replace the server list with (url, api_key) pairs; keeps stats of unchanged URLs."""
+        with self._lock:
+            old = {n.url: n for n in getattr(self, "nodes", [])}
+            nodes = []
+            for url, api_key in servers:
+                url = url.rstrip("/")
+                node = old.get(url) or Node(url, api_key)
+                node.api_key = api_key or ""
+                if node not in nodes:
+                    nodes.append(node)
+            self.nodes = nodes
+
+    def acquire(self, exclude=()):
+        """Return the best server not in exclude (or None) and count it as busy."""
+        now = time.monotonic()
+        with self._lock:
+            candidates = [n for n in self.nodes if n not in exclude]
+            if not candidates:
+                return None
+            for node in candidates:
+                if node.state == STATE_OPEN and now >= node.open_until and self.probe:
+                    node.state = STATE_PROBING
+                    threading.Thread(target=self._run_probe, args=(node,), daemon=True).start()
+            healthy = [n for n in candidates if n.state == STATE_HEALTHY]
+            if healthy:
+                node = min(healthy, key=Node.score)
+            else:
+                node = min(candidates, key=lambda n: n.open_until)
+            node.outstanding += 1
+            node.requests += 1
+            return node
+
+    def release(self, node, latency=None, failed=False, reason=None):
+        """Finish a request started with acquire()."""
+        with self._lock:
+            node.outstanding -= 1
+            if failed:
+                node.errors += 1
+                node.failures += 1
+                node.last_error = reason
+                if node.failures >= FAILURE_THRESHOLD and node.state == STATE_HEALTHY:
+                    self._open(node)
+            else:
+                node.failures = 0
+                if latency is not None:
+                    node.latency += LATENCY_ALPHA * (latency - node.latency)
+
+    def _open(self, node):
+        node.state = STATE_OPEN
+        node.open_until = time.monotonic() + node.cooldown
+
+    def _run_probe(self, node):
+        started = time.monotonic()
+        try:
+            self.probe(node)
+        except Exception as e:
+            with self._lock:
+                node.last_error = str(e)
+                node.cooldown = min(node.cooldown * 2, MAX_COOLDOWN)
+                self._open(node)
+            return
+        with self._lock:
+            node.state = STATE_HEALTHY
+            node.failures = 0
+            node.cooldown = COOLDOWN
+            node.latency = time.monotonic() - started
+
+    def stats(self):
+        """Per-server counters, in configuration order."""
+        with self._lock:
+            return [n.as_dict() for n in self.nodes]
@@ -0,0 +1,53 @@
+"""Startup timing probe.
+
+main.py calls begin() before anything heavy is imported; mark(name) records
+the time since then. finish() is called when the window's first frame has
+been painted: it records the total as the startup_seconds metric and, with
+LIBRETRANSLATE_GUI_STARTUP_PROFILE=1, prints every phase to stderr.
+Interpreter start-up before main.py is not included.
+"""
+
+import os
+import sys
+import time
+
+from libretranslate_gui import metrics
+
+ENABLED = os.environ.get("LIBRETRANSLATE_GUI_STARTUP_PROFILE", "") not in ("", "0")
+
+_started = None
+_marks = []
+
+
+def begin():
+    global _started
+    _started = time.perf_counter()
+    _marks.clear()
+
+
+def mark(name):
+    """Record that a start-up phase ended."""
+    if _started is not None:
+        _marks.append((name, time.perf_counter() - _started))
+
+
+def marks():
+    """Return [(phase, seconds since begin())]."""
+    return list(_marks)
+
+
+def finish():
+    """Record time-to-first-frame; later calls do nothing."""
+    global _started
+    if _started is None:
+        return
+    mark("first frame")
+    _started = None
+    total = _marks[-1][1]
+    metrics.observe("startup_seconds", total)
+    if ENABLED:
+        previous = 0.0
+        for name, seconds in _marks:
+            print(f"startup: {name:<12} {seconds * 1000:8.1f} ms (+{(seconds - previous) * 1000:.1f})",
+                  file=sys.stderr)
+            previous = seconds
@@ -0,0 +1,220 @@
+"""On-disk translation memory (exact-match cache) backed by SQLite."""
+
+import sqlite3
+import threading
+import time
+
+from libretranslate_gui import metrics
+from libretranslate_gui.fuzzy import FuzzyIndex, DEFAULT_LIMIT
+from libretranslate_gui.history import data_dir
+
+DEFAULT_MAX_ENTRIES = 200000
+
+
+def _memory_path():
+    return data_dir() / "memory.sqlite3"
+
+
+class TranslationMemory:
+    """Cache of translations keyed by (server, source, target, text).
+
+    Least recently used entries are evicted once more than max_entries are
+    stored. Safe to use from several threads.
+    """
+
+    def __init__(self, path=None, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = str(path or _memory_path())
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._fuzzy = {}
+        # (source, target) -> changes made while that fuzzy index is built.
+        self._building = {}
+        self._db = sqlite3.connect(self.path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS tm ("
+            " server TEXT NOT NULL, source TEXT NOT NULL, target TEXT NOT NULL,"
+            " text TEXT NOT NULL, translation TEXT NOT NULL, last_used REAL NOT NULL,"
+            " PRIMARY KEY (server, source, target, text))")
+        self._db.execute("CREATE INDEX IF NOT EXISTS tm_last_used ON tm(last_used)")
+        self._db.commit()
+        self._count = self._db.execute("SELECT COUNT(*) FROM tm").fetchone()[0]
+
+    def get(self, server, source, target, text, count=True):
+        """Return the cached translation or None."""
+        return self.get_many(server, source, target, [text], count).get(text)
+
+    def get_many(self, server, source, target, texts, count=True):
+        """Return {text: translation} for the texts found in memory.
+
+        With count=False the lookup is left out of the hit/miss statistics,
+        for repeated lookups of texts that were already counted.
+        """
+        found = {}
+        unique = list(dict.fromkeys(texts))
+        with self._lock:
+            # Stay below SQLite's default limit on bound parameters.
+            for start in range(0, len(unique), 500):
+                part = unique[start:start + 500]
+                marks = ",".join("?" * len(part))
+                rows = self._db.execute(
+                    f"SELECT text, translation FROM tm WHERE server=? AND source=? AND target=?"
+                    f" AND text IN ({marks})", (server, source, target, *part))
+                found.update(rows)
+            if found:
+                now = time.time()
+                self._db.executemany(
+                    "UPDATE tm SET last_used=? WHERE server=? AND source=? AND target=? AND text=?",
+                    [(now, server, source, target, t) for t in found])
+                self._db.commit()
+            if not count:
+                return found
+            hits = sum(1 for t in texts if t in found)
+            self.hits += hits
+            self.misses += len(texts) - hits
+        metrics.inc("memory_lookups_total", hits, result="hit")
+        metrics.inc("memory_lookups_total", len(texts) - hits, result="miss")
+        return found
+
+    def put(self, server, source, target, text, translation):
+        self.put_many(server, source, target, [(text, translation)])
+
+    def put_many(self, server, source, target, pairs):
+        """Store (text, translation) pairs, evicting old entries if needed."""
+        now = time.time()
+        rows = [(server, source, target, t, tr, now) for t, tr in pairs if t and tr is not None]
+        if not rows:
+            return
+        added = [(t, tr) for _s, _src, _tgt, t, tr, _now in rows]
+        with self._lock:
+            cur = self._db.executemany("INSERT OR REPLACE INTO tm VALUES (?, ?, ?, ?, ?, ?)", rows)
+            # REPLACE counts as a change too, so this over-estimates; _evict recounts.
+            self._count += cur.rowcount
+            evicted = self._evict() if self._count > self.max_entries else {}
+            self._db.commit()
+            changes = self._index_changes({(source, target): added}, evicted)
+        for index, added, removed in changes:
+            index.add_many(added)
+            index.remove_many(removed)
+
+    def _evict(self):
+        """Delete the least recently used rows; return {(source, target): texts no longer stored}."""
+        self._count = self._db.execute("SELECT COUNT(*) FROM tm").fetchone()[0]
+        excess = self._count - self.max_entries
+        if excess <= 0:
+            return {}
+        # Trim a little extra so we do not evict on every insert.
+        excess += self.max_entries // 10
+        rows = self._db.execute(
+            "SELECT source, target, text FROM tm ORDER BY last_used LIMIT ?", (excess,)).fetchall()
+        self._db.execute(
+            "DELETE FROM tm WHERE rowid IN (SELECT rowid FROM tm ORDER BY last_used LIMIT ?)", (excess,))
+        self._count = max(0, self._count - len(rows))
+        evicted = {}
+        for source, target, text in rows:
+            if (source, target) in self._fuzzy or (source, target) in self._building:
+                evicted.setdefault((source, target), set()).add(text)
+        if evicted:
+            # The same text may still be stored for another server.
+            servers = [r[0] for r in self._db.execute("SELECT DISTINCT server FROM tm")]
+            for (source, target), texts in evicted.items():
+                candidates = list(texts)
+                for server in servers:
+                    for start in range(0, len(candidates), 500):
+                        part = candidates[start:start + 500]
+                        marks = ",".join("?" * len(part))
+                        kept = self._db.execute(
+                            f"SELECT text FROM tm WHERE server=? AND source=? AND target=? AND text IN ({marks})",
+                            (server, source, target, *part)).fetchall()
+                        texts.difference_update(t for (t,) in kept)
+        return evicted
+
+    def _index_changes(self, added, removed):
+        """Route changes to built fuzzy indexes and queue them for ones being built.
+
+        Called with the lock held; returns [(index, added, removed)] to apply after releasing it.
+        """
+        changes = []
+        for pair in set(added) | set(removed):
+            adds, removes = added.get(pair, []), removed.get(pair, ())
+            if pair in self._building:
+                self._building[pair]["changes"].append((adds, removes))
+            elif pair in self._fuzzy:
+                changes.append((self._fuzzy[pair], adds, removes))
+        return changes
+
+    def invalidate(self, server=None):
+        """Drop entries for one server URL, or everything when server is None."""
+        with self._lock:
+            if server is None:
+                self._db.execute("DELETE FROM tm")
+            else:
+                self._db.execute("DELETE FROM tm WHERE server=?", (server,))
+            self._db.commit()
+            self._count = self._db.execute("SELECT COUNT(*) FROM tm").fetchone()[0]
+            self._fuzzy.clear()
+            for building in self._building.values():
+                building["stale"] = True
+
+    def fuzzy_index(self, source, target):
+        """Return a FuzzyIndex over all stored pairs for a language pair.
+
+        The index is built on first use, from a snapshot read on its own
+        connection and without holding the memory's lock, so get() and put()
+        are not blocked meanwhile; changes made during the build are applied
+        afterwards. put_many() keeps it up to date.
+        """
+        pair = (source, target)
+        with self._lock:
+            index = self._fuzzy.get(pair)
+            if index is not None:
+                return index
+            building = self._building.get(pair)
+            owner = building is None
+            if owner:
+                building = self._building[pair] = {"changes": [], "stale": False, "done": threading.Event()}
+        if not owner:
+            building["done"].wait()
+            return self.fuzzy_index(source, target)
+        try:
+            index = FuzzyIndex(self._snapshot(source, target))
+            with self._lock:
+                for added, removed in building["changes"]:
+                    index.add_many(added)
+                    index.remove_many(removed)
+                if not building["stale"]:
+                    self._fuzzy[pair] = index
+        finally:
+            with self._lock:
+                del self._building[pair]
+            building["done"].set()
+        return index
+
+    def _snapshot(self, source, target):
+        query = "SELECT text, translation FROM tm WHERE source=? AND target=? ORDER BY last_used"
+        if self.path == ":memory:":
+            with self._lock:
+                return self._db.execute(query, (source, target)).fetchall()
+        db = sqlite3.connect(self.path, timeout=10)
+        try:
+            return db.execute(query, (source, target)).fetchall()
+        finally:
+            db.close()
+
+    def suggest(self, source, target, text, limit=DEFAULT_LIMIT):
+        """Return up to limit (score, source text, translation) near matches."""
+        return self.fuzzy_index(source, target).lookup(text, limit)
+
+    def stats(self):
+        """Return hit/miss counters, hit rate and number of stored entries."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {"hits": self.hits, "misses": self.misses, "entries": self._count,
+                    "hit_rate": self.hits / total if total else 0.0}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
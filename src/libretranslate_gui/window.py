@@ -6,17 +6,27 @@ gi.require_version("Adw", "1")
 from gi.repository import Gtk, Adw, Gdk, Gio, GLib, Pango
 
 from libretranslate_gui.api import LibreTranslateAPI, DEFAULT_URL
+from libretranslate_gui.scheduler import DEFAULT_WORKERS
+from libretranslate_gui.segmenter import split_segments, SegmentCache
+from libretranslate_gui.translation_memory import TranslationMemory, DEFAULT_MAX_ENTRIES
+from libretranslate_gui.languages import LanguageCache, AUTO_DETECT
+from libretranslate_gui import metrics, startup
 from datetime import datetime as _dt_now
-from libretranslate_gui.history import load_history, save_entry, clear_history
-from libretranslate_gui.po_parser import parse_file
+from libretranslate_gui.history import save_entry, set_max_history, MAX_HISTORY
+# The asyncio client, catalog parsing and writing, projects, jobs and the
+# list models are imported where they are first used, to keep start-up short.
 
 import gettext
 import os
 import json
+import time
+from concurrent.futures import CancelledError
 from pathlib import Path
 
 _ = gettext.gettext
 
+LIVE_DELAY_MS = 400
+
 SETTINGS_PATH = Path(os.environ.get("XDG_CONFIG_HOME", Path.home() / ".config")) / "libretranslate-gui" / "settings.json"
 
 
@@ -34,6 +44,26 @@ def _save_settings(data):
     SETTINGS_PATH.write_text(json.dumps(data, ensure_ascii=False, indent=2), "utf-8")
 
 
+def _format_duration(seconds):
+    seconds = int(seconds)
+    if seconds >= 3600:
+        return "%d:%02d:%02d" % (seconds // 3600, seconds // 60 % 60, seconds % 60)
+    return "%d:%02d" % (seconds // 60, seconds % 60)
+
+
+def _bucket_ms(seconds):
+    """Format a histogram bucket bound in milliseconds."""
+    if seconds is None:
+        return "–"
+    return "∞" if seconds == float("inf") else f"{seconds * 1000:g}"
+
+
+def _update_setting(key, value):
+    settings = _load_settings()
+    settings[key] = value
+    _save_settings(settings)
+
+
 class LibreTranslateWindow(Adw.ApplicationWindow):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
@@ -41,19 +71,95 @@ class LibreTranslateWindow(Adw.ApplicationWindow):
         self.set_default_size(900, 700)
 
         settings = _load_settings()
+        if settings.get("metrics_enabled"):
+            metrics.enable()
+        set_max_history(settings.get("max_history", MAX_HISTORY))
+        self._jobs = None
+        self._jobs_opened = False
+        try:
+            memory = TranslationMemory(max_entries=settings.get("memory_max_entries", DEFAULT_MAX_ENTRIES))
+        except Exception:
+            memory = None
         self.api = LibreTranslateAPI(
             server_url=settings.get("server_url", DEFAULT_URL),
             api_key=settings.get("api_key", ""),
+            max_workers=settings.get("max_workers", DEFAULT_WORKERS),
+            requests_per_minute=settings.get("requests_per_minute", 0),
+            use_gzip=settings.get("use_gzip", False),
+            memory=memory,
+            protect_placeholders=settings.get("protect_placeholders", True),
+            mirrors=[(m["url"], m.get("api_key", "")) for m in settings.get("mirrors", [])],
+            language_cache=LanguageCache(),
         )
+        self._aio = None
         self.languages = []
         self.source_lang = settings.get("source_lang", "en")
         self.target_lang = settings.get("target_lang", "sv")
 
+        # Live translation state
+        self.live_mode = settings.get("live_translate", False)
+        self.live_delay = settings.get("live_delay_ms", LIVE_DELAY_MS)
+        self._live_timer = 0
+        self._live_generation = 0
+        self._live_futures = []
+        self._segment_cache = SegmentCache()
+
         # Build UI
         self._build_ui()
+        self._map_handler = self.connect("map", self._on_first_map)
+
+    @property
+    def aio(self):
+        """The asyncio client, started on first use."""
+        if self._aio is None:
+            from libretranslate_gui.async_api import AsyncLibreTranslateAPI
+            # Interactive requests run on one event loop; results arrive on the GTK main loop.
+            self._aio = AsyncLibreTranslateAPI(self.api, dispatch=GLib.idle_add)
+        return self._aio
+
+    @property
+    def jobs(self):
+        """The job queue, opened on first use.
+
+        When the database in the data directory cannot be opened (read-only
+        or full disk), jobs are kept in memory: Translate All still works,
+        but an interrupted run cannot be resumed after a restart.
+        """
+        if not self._jobs_opened:
+            self._jobs_opened = True
+            from libretranslate_gui.jobs import JobQueue
+            try:
+                self._jobs = JobQueue()
+            except Exception:
+                self._jobs = JobQueue(":memory:")
+        return self._jobs
+
+    def _on_first_map(self, _widget):
+        self.disconnect(self._map_handler)
+        clock = self.get_frame_clock()
+        if clock is None:
+            self._on_first_frame(None)
+            return
+        handler = None
 
-        # Fetch languages
-        self.api.get_languages_async(self._on_languages_loaded)
+        def _after_paint(clock):
+            clock.disconnect(handler)
+            self._on_first_frame(clock)
+
+        handler = clock.connect("after-paint", _after_paint)
+
+    def _on_first_frame(self, _clock):
+        startup.finish()
+        GLib.idle_add(self._load_languages)
+
+    def _load_languages(self):
+        """Fill the combos from the cache, then revalidate in the background."""
+        cached = self.api.cached_languages()
+        if cached:
+            self._update_language_combos(cached, None)
+        if cached is None or self.api.needs_language_refresh():
+            self.aio.submit(self.aio.get_languages(), self._on_languages_loaded)
+        return False
 
     def _build_ui(self):
         # Header bar
@@ -63,8 +169,12 @@ class LibreTranslateWindow(Adw.ApplicationWindow):
         # App menu
         app_menu = Gio.Menu()
         about_section = Gio.Menu()
+        about_section.append(_("Performance"), "win.performance")
         about_section.append(_("About"), "app.about")
         app_menu.append_section(None, about_section)
+        perf_action = Gio.SimpleAction.new("performance", None)
+        perf_action.connect("activate", self._on_performance)
+        self.add_action(perf_action)
         menu_btn = Gtk.MenuButton(icon_name="open-menu-symbolic", menu_model=app_menu)
         header.pack_end(menu_btn)
 
@@ -88,6 +198,10 @@ class LibreTranslateWindow(Adw.ApplicationWindow):
         open_btn.connect("clicked", self._on_open_file)
         header.pack_start(open_btn)
 
+        project_btn = Gtk.Button(icon_name="folder-open-symbolic", tooltip_text=_("Translate project folder"))
+        project_btn.connect("clicked", self._on_open_project)
+        header.pack_start(project_btn)
+
         # Main layout
         main_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
         main_box.append(header)
@@ -107,6 +221,9 @@ class LibreTranslateWindow(Adw.ApplicationWindow):
         self.source_combo.set_tooltip_text(_("Source language"))
         self.target_combo.set_tooltip_text(_("Target language"))
 
+        for combo in (self.source_combo, self.target_combo):
+            combo.connect("notify::selected", lambda *_args: self._on_source_changed(None))
+
         swap_btn = Gtk.Button(icon_name="object-flip-horizontal-symbolic", tooltip_text=_("Swap languages"))
         swap_btn.connect("clicked", self._on_swap_languages)
 
@@ -152,6 +269,7 @@ class LibreTranslateWindow(Adw.ApplicationWindow):
         self.source_view.set_bottom_margin(8)
         self.source_view.set_left_margin(8)
         self.source_view.set_right_margin(8)
+        self.source_view.get_buffer().connect("changed", self._on_source_changed)
         source_scroll.set_child(self.source_view)
         source_box.append(source_scroll)
         source_frame.set_child(source_box)
@@ -206,6 +324,14 @@ class LibreTranslateWindow(Adw.ApplicationWindow):
         self.spinner = Gtk.Spinner()
         btn_row.append(self.spinner)
 
+        live_label = Gtk.Label(label=_("Live"))
+        live_label.set_margin_start(12)
+        btn_row.append(live_label)
+        self.live_switch = Gtk.Switch(valign=Gtk.Align.CENTER, active=self.live_mode,
+                                      tooltip_text=_("Translate while typing"))
+        self.live_switch.connect("notify::active", self._on_live_toggled)
+        btn_row.append(self.live_switch)
+
         content.append(btn_row)
 
         # Status bar
@@ -233,17 +359,26 @@ class LibreTranslateWindow(Adw.ApplicationWindow):
         if err:
             self.status_label.set_text(_("Could not load languages: %s") % str(err))
             return
-        self.languages = sorted(langs, key=lambda l: l.get("name", ""))
+        langs = sorted(langs, key=lambda l: l.get("name", ""))
+        if langs == self.languages:
+            return
+        if self.languages:
+            # Keep the user's current choice when a revalidated list arrives.
+            self.source_lang = self._get_selected_lang(self.source_combo)
+            self.target_lang = self._get_selected_lang(self.target_combo)
+        self.languages = langs
         names = [f"{l['name']} ({l['code']})" for l in self.languages]
         codes = [l["code"] for l in self.languages]
 
-        model = Gtk.StringList.new(names)
-        self.source_combo.set_model(model)
-        self.target_combo.set_model(model.copy() if hasattr(model, 'copy') else Gtk.StringList.new(names))
+        # The source list starts with "Detect language" (AUTO_DETECT).
+        self.source_combo.set_model(Gtk.StringList.new([_("Detect language")] + names))
+        self.target_combo.set_model(Gtk.StringList.new(names))
 
         # Set defaults
-        if self.source_lang in codes:
-            self.source_combo.set_selected(codes.index(self.source_lang))
+        if self.source_lang == AUTO_DETECT:
+            self.source_combo.set_selected(0)
+        elif self.source_lang in codes:
+            self.source_combo.set_selected(codes.index(self.source_lang) + 1)
         if self.target_lang in codes:
             self.target_combo.set_selected(codes.index(self.target_lang))
 
@@ -251,6 +386,10 @@ class LibreTranslateWindow(Adw.ApplicationWindow):
 
     def _get_selected_lang(self, combo):
         idx = combo.get_selected()
+        if combo is self.source_combo and self.languages:
+            if idx == 0:
+                return AUTO_DETECT
+            idx -= 1
         if self.languages and 0 <= idx < len(self.languages):
             return self.languages[idx]["code"]
         return "en"
@@ -264,22 +403,124 @@ class LibreTranslateWindow(Adw.ApplicationWindow):
             return
         src = self._get_selected_lang(self.source_combo)
         tgt = self._get_selected_lang(self.target_combo)
-
-        self.translate_btn.set_sensitive(False)
+        self._translate_segments(text, src, tgt, save=True)
+
+    def _translate_segments(self, text, src, tgt, save=False):
+        """Translate text segment by segment, showing each result as it arrives.
+
+        Segments already in the segment cache are not sent again. Each call
+        gets a new generation number; results of older calls are cached but
+        never shown.
+        """
+        self._live_generation += 1
+        gen = self._live_generation
+        # Queued chunks of an older request are no longer needed.
+        for f in self._live_futures:
+            f.cancel()
+        self._live_futures = []
+
+        parts = split_segments(text)
+        missing = list(dict.fromkeys(
+            chunk for chunk, translatable in parts
+            if translatable and self._segment_cache.get(src, tgt, chunk) is None))
+        job = {"text": text, "parts": parts, "total": len(missing), "done": 0,
+               "retried": False, "render_pending": False}
+        if not missing:
+            self._finish_segments(job, [], src, tgt, save)
+            return
         self.spinner.start()
         self.status_label.set_text(_("Translating…"))
+        self._submit_segments(gen, job, missing, src, tgt, save)
+
+    def _submit_segments(self, gen, job, texts, src, tgt, save):
+        results = [None] * len(texts)
 
-        self.api.translate_async(text, src, tgt, lambda r, e: GLib.idle_add(self._on_translated, r, e, src, tgt, text))
+        def _on_result(i, result, err):
+            results[i] = result
+            if result is not None:
+                GLib.idle_add(self._on_segment_translated, gen, job, texts[i], result, src, tgt)
 
-    def _on_translated(self, result, err, src, tgt, original):
-        self.translate_btn.set_sensitive(True)
+        # Cancelling the future (newer input) aborts requests already on the wire.
+        self._live_futures = [self.aio.submit(
+            self.aio.translate_batch(texts, src, tgt, on_result=_on_result),
+            lambda _results, err: self._on_segments_finished(gen, job, texts, results, err, src, tgt, save))]
+
+    def _on_segment_translated(self, gen, job, chunk, result, src, tgt):
+        self._segment_cache.put(src, tgt, chunk, result)
+        if gen != self._live_generation:
+            return
+        job["done"] += 1
+        self.status_label.set_text(_("Translating… %d/%d segments") % (job["done"], job["total"]))
+        if not job["render_pending"]:
+            # Coalesce redraws when many segments arrive at once.
+            job["render_pending"] = True
+            GLib.idle_add(self._render_segments, gen, job, src, tgt)
+
+    def _render_segments(self, gen, job, src, tgt):
+        job["render_pending"] = False
+        if gen == self._live_generation:
+            self._show_segments(job["parts"], src, tgt)
+        return GLib.SOURCE_REMOVE
+
+    def _on_segments_finished(self, gen, job, texts, results, err, src, tgt, save):
+        if gen != self._live_generation:
+            return
+        failed = [t for t, r in zip(texts, results) if r is None]
+        if failed and not job["retried"] and not isinstance(err, CancelledError):
+            # Retry only the failed segments, once.
+            job["retried"] = True
+            self._submit_segments(gen, job, failed, src, tgt, save)
+            return
+        self._live_futures = []
+        self._finish_segments(job, failed, src, tgt, save, err)
+
+    def _finish_segments(self, job, failed, src, tgt, save, err=None):
         self.spinner.stop()
-        if err:
-            self.status_label.set_text(_("Error: %s") % str(err))
+        result = self._show_segments(job["parts"], src, tgt)
+        if failed:
+            self.status_label.set_text(_("Error: %s") % (
+                str(err) if err else _("%d segments could not be translated") % len(failed)))
+            return
+        shown = src
+        if src == AUTO_DETECT:
+            detected = self.api.detections.get_many([chunk for chunk, translatable in job["parts"] if translatable])
+            shown = ", ".join(sorted(set(detected.values()))) or src
+        self.status_label.set_text(_("Done – %s → %s") % (shown, tgt))
+        self._update_status_bar()
+        if save:
+            save_entry(src, tgt, job["text"], result)
+
+    # --- Live translation ---
+
+    def _on_live_toggled(self, switch, _pspec):
+        self.live_mode = switch.get_active()
+        _update_setting("live_translate", self.live_mode)
+        if self.live_mode:
+            self._on_source_changed(self.source_view.get_buffer())
+
+    def _on_source_changed(self, buf):
+        if not self.live_mode:
             return
-        self.target_view.get_buffer().set_text(result)
-        self.status_label.set_text(_("Done – %s → %s") % (src, tgt))
-        save_entry(src, tgt, original, result)
+        if self._live_timer:
+            GLib.source_remove(self._live_timer)
+        self._live_timer = GLib.timeout_add(self.live_delay, self._on_live_timeout)
+
+    def _on_live_timeout(self):
+        self._live_timer = 0
+        buf = self.source_view.get_buffer()
+        text = buf.get_text(buf.get_start_iter(), buf.get_end_iter(), False)
+        self._translate_segments(text, self._get_selected_lang(self.source_combo),
+                                 self._get_selected_lang(self.target_combo))
+        return GLib.SOURCE_REMOVE
+
+    def _show_segments(self, parts, src, tgt):
+        """Fill the target view from the segment cache; untranslated segments show the source."""
+        out = []
+        for chunk, translatable in parts:
+            out.append(self._segment_cache.get(src, tgt, chunk) or chunk if translatable else chunk)
+        text = "".join(out)
+        self.target_view.get_buffer().set_text(text)
+        return text
 
     def _on_copy(self, btn):
         buf = self.target_view.get_buffer()
@@ -292,8 +533,11 @@ class LibreTranslateWindow(Adw.ApplicationWindow):
     def _on_swap_languages(self, btn):
         si = self.source_combo.get_selected()
         ti = self.target_combo.get_selected()
-        self.source_combo.set_selected(ti)
-        self.target_combo.set_selected(si)
+        if not self.languages or si == 0:
+            # Nothing loaded yet, or "Detect language" cannot become the target.
+            return
+        self.source_combo.set_selected(ti + 1)
+        self.target_combo.set_selected(si - 1)
 
     # --- Settings dialog ---
 
@@ -312,27 +556,202 @@ class LibreTranslateWindow(Adw.ApplicationWindow):
         key_row.set_text(self.api.api_key)
         group.add(key_row)
 
+        mirrors_row = Adw.EntryRow(title=_("Mirror servers (URL [API key], …)"))
+        mirrors_row.set_text(", ".join(f"{url} {key}".strip() for url, key in self.api.mirrors))
+        group.add(mirrors_row)
+
         page.add(group)
+
+        if self.api.mirrors:
+            nodes_group = Adw.PreferencesGroup(title=_("Server Status"))
+            states = {"healthy": _("healthy"), "open": _("unavailable"), "probing": _("checking")}
+            for node in self.api.servers.stats():
+                node_row = Adw.ActionRow(title=node["url"])
+                node["state"] = states.get(node["state"], node["state"])
+                node_row.set_subtitle(
+                    _("%(state)s · %(requests)d requests · %(errors)d errors · %(latency_ms)d ms") % node)
+                if node["last_error"]:
+                    node_row.set_tooltip_text(node["last_error"])
+                nodes_group.add(node_row)
+            page.add(nodes_group)
+
+        perf_group = Adw.PreferencesGroup(title=_("Requests"))
+        workers_row = Adw.SpinRow.new_with_range(1, 32, 1)
+        workers_row.set_title(_("Parallel requests"))
+        workers_row.set_value(self.api.scheduler.max_workers)
+        perf_group.add(workers_row)
+
+        rate_row = Adw.SpinRow.new_with_range(0, 10000, 10)
+        rate_row.set_title(_("Requests per minute"))
+        rate_row.set_subtitle(_("0 = unlimited"))
+        rate_row.set_value(self.api.scheduler.bucket.rate)
+        perf_group.add(rate_row)
+
+        gzip_row = Adw.SwitchRow(title=_("Compress requests (gzip)"))
+        gzip_row.set_active(self.api.pool.use_gzip)
+        perf_group.add(gzip_row)
+
+        protect_row = Adw.SwitchRow(title=_("Protect placeholders and markup"))
+        protect_row.set_subtitle(_("Keep %s, {0}, <b> and accelerators out of the translation"))
+        protect_row.set_active(self.api.protect_placeholders)
+        protect_row.connect("notify::active", self._on_protect_toggled)
+        perf_group.add(protect_row)
+
+        stats = self.api.pool.stats()
+        pool_row = Adw.ActionRow(title=_("Connection pool"))
+        pool_row.set_subtitle(_("%(hits)d reused, %(misses)d opened, %(reconnects)d reconnected") % stats)
+        perf_group.add(pool_row)
+        page.add(perf_group)
+
+        live_group = Adw.PreferencesGroup(title=_("Live Translation"))
+        delay_row = Adw.SpinRow.new_with_range(100, 5000, 50)
+        delay_row.set_title(_("Delay after typing (ms)"))
+        delay_row.set_value(self.live_delay)
+        delay_row.connect("notify::value", self._on_live_delay_changed)
+        live_group.add(delay_row)
+        page.add(live_group)
+
+        if self.api.memory:
+            tm_group = Adw.PreferencesGroup(title=_("Translation Memory"))
+            tm_stats = self.api.memory.stats()
+            tm_row = Adw.ActionRow(title=_("Cached translations"))
+            tm_row.set_subtitle(_("%d entries") % tm_stats["entries"])
+            tm_clear_btn = Gtk.Button(label=_("Clear for this server"), valign=Gtk.Align.CENTER)
+            tm_clear_btn.connect("clicked", self._on_clear_memory, tm_row)
+            tm_row.add_suffix(tm_clear_btn)
+            tm_group.add(tm_row)
+            page.add(tm_group)
         dialog.add(page)
 
-        dialog.connect("close-request", lambda d: self._save_server_settings(url_row.get_text(), key_row.get_text()))
+        dialog.connect("close-request", lambda d: self._save_server_settings(
+            url_row.get_text(), key_row.get_text(), mirrors_row.get_text(),
+            int(workers_row.get_value()), int(rate_row.get_value()), gzip_row.get_active()))
         dialog.present()
 
-    def _save_server_settings(self, url, key):
-        self.api.server_url = url.rstrip("/") if url else DEFAULT_URL
-        self.api.api_key = key
+    def _save_server_settings(self, url, key, mirrors_text, max_workers, requests_per_minute, use_gzip):
+        mirrors = []
+        for part in mirrors_text.split(","):
+            fields = part.split()
+            if fields:
+                mirrors.append((fields[0].rstrip("/"), fields[1] if len(fields) > 1 else ""))
+        self.api.set_servers(url.rstrip("/") if url else DEFAULT_URL, key, mirrors)
+        self.api.scheduler.configure(max_workers, requests_per_minute)
+        self.api.pool.use_gzip = use_gzip
         settings = _load_settings()
         settings["server_url"] = self.api.server_url
         settings["api_key"] = key
+        settings["mirrors"] = [{"url": u, "api_key": k} for u, k in mirrors]
+        settings["max_workers"] = max_workers
+        settings["requests_per_minute"] = requests_per_minute
+        settings["use_gzip"] = use_gzip
         settings["source_lang"] = self._get_selected_lang(self.source_combo)
         settings["target_lang"] = self._get_selected_lang(self.target_combo)
         _save_settings(settings)
         # Reload languages from new server
-        self.api.get_languages_async(self._on_languages_loaded)
+        self.aio.submit(self.aio.get_languages(), self._on_languages_loaded)
+
+    def _on_protect_toggled(self, row, _pspec):
+        self.api.protect_placeholders = row.get_active()
+        _update_setting("protect_placeholders", self.api.protect_placeholders)
+
+    def _on_live_delay_changed(self, row, _pspec):
+        self.live_delay = int(row.get_value())
+        _update_setting("live_delay_ms", self.live_delay)
+
+    # --- Performance panel ---
+
+    def _on_performance(self, _action, _param):
+        dialog = Adw.PreferencesWindow(transient_for=self)
+        dialog.set_title(_("Performance"))
+        page = Adw.PreferencesPage()
+
+        group = Adw.PreferencesGroup(title=_("Collection"))
+        enable_row = Adw.SwitchRow(title=_("Collect performance metrics"))
+        enable_row.set_subtitle(_("Request latency, transfer sizes, cache hits and parse times"))
+        enable_row.set_active(metrics.ENABLED)
+        enable_row.connect("notify::active", self._on_metrics_toggled)
+        group.add(enable_row)
+        export_row = Adw.ActionRow(title=_("Copy to clipboard"))
+        for label, dump in ((_("Prometheus"), metrics.to_prometheus), (_("JSON"), metrics.to_json)):
+            btn = Gtk.Button(label=label, valign=Gtk.Align.CENTER)
+            btn.connect("clicked", lambda _b, dump=dump: self.get_clipboard().set(dump()))
+            export_row.add_suffix(btn)
+        reset_btn = Gtk.Button(label=_("Reset"), valign=Gtk.Align.CENTER)
+        reset_btn.add_css_class("destructive-action")
+        reset_btn.connect("clicked", lambda _b: (metrics.reset(), dialog.close()))
+        export_row.add_suffix(reset_btn)
+        group.add(export_row)
+        page.add(group)
+
+        snap = metrics.snapshot()
+        counters = {}
+        for c in snap["counters"]:
+            key = (c["name"],) + tuple(sorted(c["labels"].items()))
+            counters[key] = c["value"]
+
+        def _count(name, **labels):
+            return counters.get((name,) + tuple(sorted(labels.items())), 0)
+
+        def _timing_rows(group, name, label_key, unit_counter=None, title=None):
+            for h in snap["histograms"]:
+                if h["name"] != name:
+                    continue
+                label = h["labels"].get(label_key, name) if label_key else title
+                row = Adw.ActionRow(title=label)
+                subtitle = _("%(count)d × · mean %(mean).1f ms · p50 ≤ %(p50)s ms · p95 ≤ %(p95)s ms") % {
+                    "count": h["count"], "mean": h["mean"] * 1000,
+                    "p50": _bucket_ms(h["p50"]), "p95": _bucket_ms(h["p95"])}
+                if unit_counter:
+                    entries = _count(unit_counter, **h["labels"])
+                    subtitle += _(" · %.0f entries/s") % (entries / h["sum"] if h["sum"] else 0)
+                row.set_subtitle(subtitle)
+                group.add(row)
+
+        api_group = Adw.PreferencesGroup(title=_("API Requests"))
+        _timing_rows(api_group, "api_request_seconds", "endpoint")
+        transfer_row = Adw.ActionRow(title=_("Transferred"))
+        transfer_row.set_subtitle(_("%(sent).1f KiB sent · %(received).1f KiB received") % {
+            "sent": _count("api_bytes_sent_total") / 1024, "received": _count("api_bytes_received_total") / 1024})
+        api_group.add(transfer_row)
+        retry_row = Adw.ActionRow(title=_("Retries"))
+        retry_row.set_subtitle(_("%(rate)d after HTTP 429 · %(failover)d on another server") % {
+            "rate": _count("api_retries_total", reason="rate_limited"),
+            "failover": _count("api_retries_total", reason="failover")})
+        api_group.add(retry_row)
+        hits, misses = _count("memory_lookups_total", result="hit"), _count("memory_lookups_total", result="miss")
+        cache_row = Adw.ActionRow(title=_("Translation memory"))
+        cache_row.set_subtitle(_("%(hits)d hits · %(misses)d misses") % {"hits": hits, "misses": misses})
+        api_group.add(cache_row)
+        page.add(api_group)
+
+        parse_group = Adw.PreferencesGroup(title=_("Parsing and Files"))
+        _timing_rows(parse_group, "parse_seconds", "format", "parse_entries_total")
+        _timing_rows(parse_group, "po_translate_seconds", None, "po_translate_entries_total",
+                     title=_("Translate catalog"))
+        page.add(parse_group)
+
+        history_group = Adw.PreferencesGroup(title=_("History"))
+        _timing_rows(history_group, "history_seconds", "op")
+        page.add(history_group)
+
+        dialog.add(page)
+        dialog.present()
+
+    def _on_metrics_toggled(self, row, _pspec):
+        metrics.enable(row.get_active())
+        _update_setting("metrics_enabled", metrics.ENABLED)
+
+    def _on_clear_memory(self, btn, row):
+        self.api.memory.invalidate(self.api.server_url)
+        row.set_subtitle(_("%d entries") % self.api.memory.stats()["entries"])
+        self._update_status_bar()
 
     # --- History ---
 
     def _on_history(self, btn):
+        from libretranslate_gui.history import (load_history, clear_history, search_history,
+                                                get_store as get_history_store)
+        from libretranslate_gui.models import EntryItem, make_list_view
         history = load_history()
         if not history:
             self.status_label.set_text(_("No history yet"))
@@ -352,29 +771,69 @@ class LibreTranslateWindow(Adw.ApplicationWindow):
         vbox = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
         vbox.append(tb)
 
+        filter_row = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=8)
+        filter_row.set_margin_start(12)
+        filter_row.set_margin_end(12)
+        filter_row.set_margin_bottom(6)
+        search = Gtk.SearchEntry(placeholder_text=_("Search history"), hexpand=True)
+        filter_row.append(search)
+        pairs = [None] + get_history_store().language_pairs()
+        pair_combo = Gtk.DropDown.new_from_strings(
+            [_("All languages")] + [f"{s_}→{t_}" for s_, t_ in pairs[1:]])
+        filter_row.append(pair_combo)
+        periods = [None, 1, 7, 30]
+        period_combo = Gtk.DropDown.new_from_strings(
+            [_("Any time"), _("Last day"), _("Last 7 days"), _("Last 30 days")])
+        filter_row.append(period_combo)
+        vbox.append(filter_row)
+
+        def _make_items(records):
+            return [EntryItem(entry, entry.get("source", ""), entry.get("translation", ""),
+                              suffix=f"{entry.get('source_lang','?')}→{entry.get('target_lang','?')}")
+                    for entry in records]
+
+        store = Gio.ListStore.new(EntryItem)
+        store.splice(0, 0, _make_items(history))
+        view, _item_filter = make_list_view(store, lambda item: True)
+        pending = {"source": 0}
+
+        def _run_search():
+            pending["source"] = 0
+            text = search.get_text().strip()
+            pair = pairs[pair_combo.get_selected()]
+            days = periods[period_combo.get_selected()]
+            if not text and pair is None and days is None:
+                records = load_history()
+            else:
+                records = search_history(
+                    text, *(pair or (None, None)),
+                    since=time.time() - days * 86400 if days else None)
+            store.splice(0, store.get_n_items(), _make_items(records))
+            return GLib.SOURCE_REMOVE
+
+        def _on_search_changed(*_args):
+            # Debounce: query once typing pauses.
+            if pending["source"]:
+                GLib.source_remove(pending["source"])
+            pending["source"] = GLib.timeout_add(150, _run_search)
+        search.connect("search-changed", _on_search_changed)
+        pair_combo.connect("notify::selected", _on_search_changed)
+        period_combo.connect("notify::selected", _on_search_changed)
+
+        # Click to load
+        view.set_single_click_activate(True)
+        view.connect("activate", lambda v, pos: self._on_history_row_activated(
+            v.get_model().get_item(pos), dialog))
+
         scroll = Gtk.ScrolledWindow()
         scroll.set_vexpand(True)
-        listbox = Gtk.ListBox()
-        listbox.set_selection_mode(Gtk.SelectionMode.NONE)
-        listbox.add_css_class("boxed-list")
-
-        for entry in history[:50]:
-            row = Adw.ActionRow(
-                title=GLib.markup_escape_text(entry.get("source", "")[:80]),
-                subtitle=GLib.markup_escape_text(entry.get("translation", "")[:80]),
-            )
-            row.add_suffix(Gtk.Label(label=f"{entry.get('source_lang','?')}→{entry.get('target_lang','?')}"))
-            # Click to load
-            row.set_activatable(True)
-            row.connect("activated", self._on_history_row_activated, entry, dialog)
-            listbox.append(row)
-
-        scroll.set_child(listbox)
+        scroll.set_child(view)
         vbox.append(scroll)
         dialog.set_content(vbox)
         dialog.present()
 
-    def _on_history_row_activated(self, row, entry, dialog):
+    def _on_history_row_activated(self, item, dialog):
+        entry = item.data
         self.source_view.get_buffer().set_text(entry.get("source", ""))
         self.target_view.get_buffer().set_text(entry.get("translation", ""))
         dialog.close()
@@ -400,18 +859,70 @@ class LibreTranslateWindow(Adw.ApplicationWindow):
         filepath = file.get_path()
         if not filepath:
             return
+        from libretranslate_gui.po_parser import parse_file
         try:
             entries = parse_file(filepath)
         except Exception as e:
             self.status_label.set_text(_("Error parsing file: %s") % str(e))
             return
-        untranslated = [e for e in entries if e["untranslated"]]
-        if not untranslated:
+        if not any(e["untranslated"] for e in entries):
             self.status_label.set_text(_("No untranslated strings found"))
             return
-        self._show_po_window(filepath, untranslated)
+        self._show_po_window(filepath, entries)
+
+    def _on_open_project(self, btn):
+        dialog = Gtk.FileDialog(title=_("Translate all catalogs in a folder"))
+        dialog.select_folder(self, None, self._on_project_selected)
+
+    def _on_project_selected(self, dialog, result):
+        """Translate every .po/.ts file below the folder; each unique string is sent once."""
+        import threading
+        from libretranslate_gui.project import Project, find_catalogs
+        try:
+            folder = dialog.select_folder_finish(result)
+        except Exception:
+            return
+        path = folder.get_path() if folder else None
+        if not path:
+            return
+        src = self._get_selected_lang(self.source_combo)
+        self.spinner.start()
+        self.status_label.set_text(_("Scanning %s…") % path)
+
+        def _progress(target, total):
+            done = [0]
+
+            def _step(*_args):
+                done[0] += 1
+                if done[0] % 50 == 0 or done[0] == total:
+                    GLib.idle_add(self.status_label.set_text,
+                                  _("Translating project → %s: %d/%d unique strings") % (target, done[0], total))
+            return _step
+
+        def _work():
+            try:
+                project = Project(find_catalogs([path]))
+                project.translate(self.api, src, _progress)
+                # After translate(), so requests_deduplicated is the number actually sent.
+                stats = project.stats()
+                files = project.write()
+            except Exception as e:
+                GLib.idle_add(self.status_label.set_text, _("Project translation failed: %s") % str(e))
+            else:
+                failed = sum(f["failed"] for f in files) + sum(1 for f in files if f["error"])
+                text = _("%(files)d files: %(strings)d strings, %(unique_strings)d unique – "
+                         "%(requests_deduplicated)d requests instead of %(requests_per_file)d") % stats
+                if failed:
+                    text += _(" · %d failed") % failed
+                GLib.idle_add(self.status_label.set_text, text)
+            GLib.idle_add(self.spinner.stop)
+            GLib.idle_add(self._update_status_bar)
+        threading.Thread(target=_work, daemon=True).start()
 
     def _show_po_window(self, filepath, entries):
+        from libretranslate_gui.jobs import source_fingerprint
+        from libretranslate_gui.models import (EntryItem, make_list_view, entry_status,
+                                               STATUS_UNTRANSLATED, STATUS_FUZZY, STATUS_TRANSLATED)
         dialog = Adw.Window(transient_for=self)
         dialog.set_title(_("Untranslated strings – %s") % os.path.basename(filepath))
         dialog.set_default_size(700, 500)
@@ -421,48 +932,213 @@ class LibreTranslateWindow(Adw.ApplicationWindow):
         translate_all_btn = Gtk.Button(label=_("Translate All"))
         translate_all_btn.add_css_class("suggested-action")
         tb.pack_end(translate_all_btn)
+        pause_btn = Gtk.Button(label=_("Pause"), visible=False)
+        tb.pack_end(pause_btn)
+        cancel_btn = Gtk.Button(label=_("Cancel"), visible=False)
+        tb.pack_end(cancel_btn)
 
         vbox = Gtk.Box(orientation=Gtk.Orientation.VERTICAL)
         vbox.append(tb)
 
+        filter_row = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=8)
+        filter_row.set_margin_start(12)
+        filter_row.set_margin_end(12)
+        filter_row.set_margin_bottom(6)
+        search = Gtk.SearchEntry(placeholder_text=_("Search strings"), hexpand=True)
+        filter_row.append(search)
+        statuses = [None, STATUS_UNTRANSLATED, STATUS_FUZZY, STATUS_TRANSLATED]
+        status_combo = Gtk.DropDown.new_from_strings(
+            [_("All"), _("Untranslated"), _("Fuzzy"), _("Translated")])
+        status_combo.set_selected(1)
+        filter_row.append(status_combo)
+        vbox.append(filter_row)
+
+        items = [EntryItem(entry, entry["msgid"], entry["msgstr"], entry_status(entry)) for entry in entries]
+        for item in items:
+            if item.data["untranslated"] and not item.props.subtitle:
+                item.set_subtitle(_("Click Translate All to get suggestions"))
+        store = Gio.ListStore.new(EntryItem)
+        store.splice(0, 0, items)
+
+        query = {"text": "", "status": STATUS_UNTRANSLATED}
+
+        def _match(item):
+            if query["status"] and item.props.status != query["status"]:
+                return False
+            return query["text"] in item.search_text
+
+        view, item_filter = make_list_view(store, _match)
+
+        def _on_filter_changed(*_args):
+            query["text"] = search.get_text().strip().lower()
+            query["status"] = statuses[status_combo.get_selected()]
+            item_filter.changed(Gtk.FilterChange.DIFFERENT)
+        search.connect("search-changed", _on_filter_changed)
+        status_combo.connect("notify::selected", _on_filter_changed)
+
         scroll = Gtk.ScrolledWindow()
         scroll.set_vexpand(True)
-        listbox = Gtk.ListBox()
-        listbox.set_selection_mode(Gtk.SelectionMode.NONE)
-        listbox.add_css_class("boxed-list")
-
-        rows_data = []
-        for entry in entries:
-            row = Adw.ActionRow(
-                title=GLib.markup_escape_text(entry["msgid"][:100]),
-                subtitle=_("Click Translate All to get suggestions"),
-            )
-            rows_data.append((row, entry))
-            listbox.append(row)
-
-        scroll.set_child(listbox)
+        scroll.set_child(view)
         vbox.append(scroll)
         dialog.set_content(vbox)
 
+        pending = [item for item in items if item.data["untranslated"]]
         src = self._get_selected_lang(self.source_combo)
         tgt = self._get_selected_lang(self.target_combo)
-        translate_all_btn.connect("clicked", lambda b: self._translate_po_entries(rows_data, src, tgt, b))
+        controls = {"translate": translate_all_btn, "pause": pause_btn, "cancel": cancel_btn, "runner": None,
+                    "fingerprint": source_fingerprint(entries), "generation": 0}
+
+        def _start(*_args):
+            self._translate_po_entries(filepath, pending, src, tgt, controls)
+
+        # A job started on another version of the file is not resumed.
+        job = self.jobs.find_unfinished(filepath, src, tgt, controls["fingerprint"])
+        if job and job["done"]:
+            # An earlier run was interrupted; continue where it stopped.
+            translate_all_btn.set_label(_("Resume (%(done)d/%(total)d)") % job)
+            cancel_btn.set_visible(True)
+        translate_all_btn.connect("clicked", _start)
+        pause_btn.connect("clicked", self._on_job_pause, controls, _start)
+        cancel_btn.connect("clicked", self._on_job_cancel, controls, filepath, src, tgt)
+        # Closing the dialog pauses the job; it can be resumed next time.
+        dialog.connect("close-request", lambda _d: controls["runner"] and controls["runner"].pause())
 
         dialog.present()
+        if self.api.memory:
+            self._suggest_po_entries(pending, src, tgt, controls)
+
+    def _suggest_po_entries(self, items, src, tgt, controls):
+        """Fill rows with translation-memory matches before anything is sent.
+
+        Starting Translate All bumps controls["generation"]; suggestions of
+        an older generation are dropped so they never overwrite its results.
+        """
+        import threading
+        memory = self.api.memory
+        gen = controls["generation"]
 
-    def _translate_po_entries(self, rows_data, src, tgt, btn):
-        btn.set_sensitive(False)
+        def _show(item, subtitle, tooltip):
+            if gen == controls["generation"]:
+                item.set_subtitle(subtitle)
+                if tooltip is not None:
+                    item.set_tooltip(tooltip)
+            return GLib.SOURCE_REMOVE
+
+        def _work():
+            texts = [item.data["msgid"] for item in items]
+            # Translate All counts these texts when it looks them up.
+            exact = memory.get_many(self.api.server_url, src, tgt, texts, count=False)
+            for item, text in zip(items, texts):
+                if gen != controls["generation"]:
+                    return
+                if text in exact:
+                    GLib.idle_add(_show, item, exact[text], None)
+                    continue
+                matches = memory.suggest(src, tgt, text)
+                if not matches:
+                    continue
+                score, _source, translation = matches[0]
+                subtitle = "≈ %d%%: %s" % (round(score * 100), translation)
+                tooltip = "\n".join("%d%%  %s → %s" % (round(sc * 100), s_, t_) for sc, s_, t_ in matches)
+                GLib.idle_add(_show, item, subtitle, tooltip)
+        threading.Thread(target=_work, daemon=True).start()
+
+    def _translate_po_entries(self, filepath, items, src, tgt, controls):
+        """Run (or resume) the persistent job for items; see jobs.JobRunner."""
         import threading
+        from libretranslate_gui.jobs import (JobRunner, STATE_RUNNING, STATE_PAUSED, STATE_DONE,
+                                             STATE_FAILED, STATE_CANCELLED)
+        from libretranslate_gui.models import STATUS_FUZZY
+        from libretranslate_gui.po_writer import entry_key
+        # Drops translation-memory suggestions still on their way.
+        controls["generation"] += 1
+        controls["translate"].set_sensitive(False)
+        controls["pause"].set_label(_("Pause"))
+        controls["pause"].set_visible(True)
+        controls["cancel"].set_visible(True)
+        by_key = {entry_key(item.data["msgid"], item.data.get("msgctxt")): item for item in items}
+        job = self.jobs.find_unfinished(filepath, src, tgt, controls["fingerprint"])
+        job_id = job["id"] if job else self.jobs.create(filepath, src, tgt, [item.data for item in items],
+                                                        self.api.server_url, controls["fingerprint"])
+
+        def _on_result(msgctxt, msgid, result, err):
+            item = by_key.get(entry_key(msgid, msgctxt))
+            if item is None:
+                return
+            if err or result is None:
+                GLib.idle_add(item.set_subtitle, _("Error: %s") % (err or _("no translation")))
+                return
+            # Plural entries show their singular form.
+            GLib.idle_add(item.set_subtitle, result if isinstance(result, str) else result[0])
+            GLib.idle_add(item.set_status, STATUS_FUZZY)
+
+        def _on_progress(progress):
+            text = _("Translated %(done)d/%(total)d") % progress
+            if progress["rate"]:
+                text += _(" · %.0f entries/s") % progress["rate"]
+            if progress["eta"] is not None and progress["state"] == STATE_RUNNING:
+                text += _(" · %s left") % _format_duration(progress["eta"])
+            GLib.idle_add(self.status_label.set_text, text)
+
+        runner = JobRunner(self.api, self.jobs, job_id, _on_result, _on_progress)
+        controls["runner"] = runner
+
         def _work():
-            for row, entry in rows_data:
-                try:
-                    result = self.api.translate(entry["msgid"], src, tgt)
-                    GLib.idle_add(row.set_subtitle, GLib.markup_escape_text(result))
-                except Exception as e:
-                    GLib.idle_add(row.set_subtitle, f"Error: {e}")
-            GLib.idle_add(btn.set_sensitive, True)
+            started = time.perf_counter()
+            try:
+                progress = runner.run()
+            except Exception as e:
+                GLib.idle_add(self.status_label.set_text, _("Translation stopped: %s") % str(e))
+                progress = None
+            elapsed = time.perf_counter() - started
+            metrics.observe("po_translate_seconds", elapsed)
+            if progress:
+                metrics.inc("po_translate_entries_total", progress["done"] + progress["failed"])
+                messages = {
+                    STATE_DONE: _("Saved %(done)d translations to %(file)s"),
+                    STATE_FAILED: _("Saved %(done)d translations to %(file)s, %(failed)d failed"),
+                    STATE_PAUSED: _("Paused at %(done)d/%(total)d – %(file)s"),
+                    STATE_CANCELLED: _("Cancelled – %(done)d translations saved to %(file)s"),
+                }
+                GLib.idle_add(self.status_label.set_text, messages[progress["state"]] % dict(
+                    progress, file=os.path.basename(filepath)))
+            GLib.idle_add(self._on_job_stopped, controls, progress)
+            GLib.idle_add(self._update_status_bar)
         threading.Thread(target=_work, daemon=True).start()
 
+    def _on_job_stopped(self, controls, progress):
+        from libretranslate_gui.jobs import STATE_PAUSED, STATE_CANCELLED
+        controls["runner"] = None
+        controls["pause"].set_sensitive(True)
+        controls["cancel"].set_visible(False)
+        if progress and progress["state"] == STATE_PAUSED:
+            controls["pause"].set_label(_("Resume"))
+        else:
+            controls["pause"].set_visible(False)
+            controls["translate"].set_sensitive(True)
+        if progress and progress["state"] == STATE_CANCELLED:
+            controls["translate"].set_label(_("Translate All"))
+
+    def _on_job_pause(self, btn, controls, start):
+        runner = controls.get("runner")
+        if runner:
+            # Takes effect after the slice in flight; _on_job_stopped re-enables.
+            btn.set_sensitive(False)
+            runner.pause()
+        else:
+            start()
+
+    def _on_job_cancel(self, btn, controls, filepath, src, tgt):
+        from libretranslate_gui.jobs import STATE_CANCELLED
+        runner = controls.get("runner")
+        if runner:
+            runner.cancel()
+        else:
+            job = self.jobs.find_unfinished(filepath, src, tgt, controls["fingerprint"])
+            if job:
+                self.jobs.set_state(job["id"], STATE_CANCELLED)
+            self._on_job_stopped(controls, {"state": STATE_CANCELLED})
+
     def _on_theme_toggle(self, _btn):
         sm = Adw.StyleManager.get_default()
         if sm.get_color_scheme() == Adw.ColorScheme.FORCE_DARK:
@@ -473,4 +1149,16 @@ class LibreTranslateWindow(Adw.ApplicationWindow):
             self._theme_btn.set_icon_name("weather-clear-symbolic")
 
     def _update_status_bar(self):
-        self._status_bar.set_text("Last updated: " + _dt_now.now().strftime("%Y-%m-%d %H:%M"))
+        text = "Last updated: " + _dt_now.now().strftime("%Y-%m-%d %H:%M")
+        if self.api.memory:
+            stats = self.api.memory.stats()
+            if stats["hits"] or stats["misses"]:
+                text += _(" · Memory: %d%% hits (%d/%d)") % (
+                    round(stats["hit_rate"] * 100), stats["hits"], stats["hits"] + stats["misses"])
+        if metrics.ENABLED:
+            requests = [h for h in metrics.snapshot()["histograms"] if h["name"] == "api_request_seconds"]
+            count = sum(h["count"] for h in requests)
+            if count:
+                text += _(" · API: %d requests, %.0f ms average") % (
+                    count, sum(h["sum"] for h in requests) / count * 1000)
+        self._status_bar.set_text(text)